@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from api.response import ApiResponse, Headers
+
+
+
+
+CASSETTE_ENV = "API_CASSETTE"
+CASSETTE_MODE_ENV = "API_CASSETTE_MODE"
+CASSETTE_MISS_ENV = "API_CASSETTE_MISS"
+
+MODES = ("record", "replay")
+MISS_POLICIES = ("error", "fake", "live")
+
+MAGIC = b"OBJCAS1\0"
+COMPRESS_MIN_BYTES = 256
+_FLAG_ZLIB = 1
+_RECORD = struct.Struct(">HBII")  # status, flags, headers length, body length
+_ENTRY = struct.Struct(">16sQ")  # request key, record offset
+_FOOTER = struct.Struct(">QI8s")  # index offset, entry count, MAGIC
+_KEY_SIZE = 16
+
+
+
+
+class CassetteMiss(LookupError):
+   """Replay found no recorded response for a request (miss policy "error")."""
+
+
+
+
+def request_key(verb: str, path: str, body: Any = None) -> bytes:
+   """16-byte key for verb + path (relative to the base URL) + canonical JSON body."""
+   key = hashlib.blake2b(digest_size=_KEY_SIZE)
+   key.update(f"{verb}\0{path}\0".encode())
+   if body is not None:
+       key.update(json.dumps(body, sort_keys=True, separators=(",", ":")).encode())
+   return key.digest()
+
+
+
+
+class Cassette:
+   """
+   Recorded request/response pairs of the live API, in one compact file.
+
+   record: every live call is appended (status, headers, body; bodies of
+           COMPRESS_MIN_BYTES or more are zlib-compressed when that helps).
+           close() appends the index sorted by request key and moves the
+           file into place.
+   replay: the file is memory-mapped and looked up by binary search over the
+           fixed-size index entries. A request recorded several times (e.g.
+           GET before and after a DELETE) replays its responses in recorded
+           order, then keeps repeating the last one.
+
+   on_miss decides what replay does with a request that was never recorded:
+   "error" raises CassetteMiss, "fake" answers from the in-memory fake API,
+   "live" sends it to the real endpoint.
+
+   File layout: MAGIC, records (_RECORD header, headers JSON, body), index
+   (_ENTRY per call), footer (_FOOTER). Record with a single process: xdist
+   workers recording to the same path would overwrite each other.
+   """
+
+
+   def __init__(self, path: str, mode: str = "replay", on_miss: str = "error") -> None:
+       if mode not in MODES:
+           raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+       if on_miss not in MISS_POLICIES:
+           raise ValueError(f"Unknown miss policy {on_miss!r}; expected one of {MISS_POLICIES}")
+       self.path = path
+       self.mode = mode
+       self.on_miss = on_miss
+       self._lock = threading.Lock()
+       self._closed = False
+       if mode == "record":
+           self._open_writer()
+       else:
+           self._open_reader()
+
+
+   @classmethod
+   def from_env(cls) -> Optional["Cassette"]:
+       """API_CASSETTE=<path> [API_CASSETTE_MODE=record|replay] [API_CASSETTE_MISS=error|fake|live]"""
+       path = os.getenv(CASSETTE_ENV)
+       if not path:
+           return None
+       return cls(path, os.getenv(CASSETTE_MODE_ENV) or "replay", os.getenv(CASSETTE_MISS_ENV) or "error")
+
+
+   @property
+   def replaying(self) -> bool:
+       return self.mode == "replay"
+
+
+   def __len__(self) -> int:
+       return len(self._index) if self.mode == "record" else self._count
+
+
+   def __enter__(self) -> "Cassette":
+       return self
+
+
+   def __exit__(self, *exc_info: Any) -> None:
+       self.close()
+
+
+   # ---------------------------
+   # Recording
+   # ---------------------------
+   def _open_writer(self) -> None:
+       folder = os.path.dirname(os.path.abspath(self.path))
+       os.makedirs(folder, exist_ok=True)
+       fd, self._temp_file = tempfile.mkstemp(dir=folder, prefix=".cassette-", suffix=".tmp")
+       self._file = os.fdopen(fd, "wb")
+       self._file.write(MAGIC)
+       self._offset = len(MAGIC)
+       self._index: List[Tuple[bytes, int]] = []
+
+
+   def record(self, verb: str, path: str, body: Any, response: ApiResponse) -> None:
+       content, flags = response.content, 0
+       if len(content) >= COMPRESS_MIN_BYTES:
+           compressed = zlib.compress(content, 6)
+           if len(compressed) < len(content):
+               content, flags = compressed, _FLAG_ZLIB
+       headers = json.dumps(dict(response.headers), separators=(",", ":")).encode()
+       key = request_key(verb, path, body)
+       with self._lock:
+           if self._closed:
+               return
+           self._file.write(_RECORD.pack(response.status_code, flags, len(headers), len(content)))
+           self._file.write(headers)
+           self._file.write(content)
+           self._index.append((key, self._offset))
+           self._offset += _RECORD.size + len(headers) + len(content)
+
+
+   def _finish(self) -> None:
+       # stable sort: calls with the same key keep their recorded order
+       self._index.sort(key=lambda entry: entry[0])
+       self._file.write(b"".join(_ENTRY.pack(key, offset) for key, offset in self._index))
+       self._file.write(_FOOTER.pack(self._offset, len(self._index), MAGIC))
+       self._file.close()
+       os.replace(self._temp_file, self.path)
+
+
+   # ---------------------------
+   # Replay
+   # ---------------------------
+   def _open_reader(self) -> None:
+       with open(self.path, "rb") as f:
+           self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+       mm = self._mm
+       if len(mm) < len(MAGIC) + _FOOTER.size or mm[:len(MAGIC)] != MAGIC:
+           mm.close()
+           raise ValueError(f"Not a cassette file: {self.path}")
+       self._index_offset, self._count, magic = _FOOTER.unpack_from(mm, len(mm) - _FOOTER.size)
+       if magic != MAGIC:
+           mm.close()
+           raise ValueError(f"Truncated cassette file: {self.path}")
+       self._slots: Dict[bytes, Tuple[int, int]] = {}  # key -> (first entry, entries)
+       self._plays: Dict[bytes, Any] = {}  # key -> itertools.count of replays so far
+       self._headers: Dict[bytes, Headers] = {}  # headers JSON -> decoded (most calls share a few)
+
+
+   def _find(self, key: bytes) -> Tuple[int, int]:
+       slot = self._slots.get(key)
+       if slot is None:
+           mm, base, size = self._mm, self._index_offset, _ENTRY.size
+           lo, hi = 0, self._count
+           while lo < hi:
+               mid = (lo + hi) // 2
+               start = base + mid * size
+               if mm[start:start + _KEY_SIZE] < key:
+                   lo = mid + 1
+               else:
+                   hi = mid
+           end = lo
+           while end < self._count and mm[base + end * size:base + end * size + _KEY_SIZE] == key:
+               end += 1
+           slot = self._slots[key] = (lo, end - lo)
+       return slot
+
+
+   def play(self, verb: str, path: str, body: Any = None) -> Optional[ApiResponse]:
+       """The recorded response for this call, or None if it was never recorded."""
+       key = request_key(verb, path, body)
+       first, entries = self._find(key)
+       if not entries:
+           return None
+       plays = self._plays.get(key)
+       if plays is None:
+           plays = self._plays.setdefault(key, itertools.count())
+       entry = first + min(next(plays), entries - 1)
+       _, offset = _ENTRY.unpack_from(self._mm, self._index_offset + entry * _ENTRY.size)
+       status, flags, headers_length, body_length = _RECORD.unpack_from(self._mm, offset)
+       start = offset + _RECORD.size + headers_length
+       raw_headers = self._mm[offset + _RECORD.size:start]
+       headers = self._headers.get(raw_headers)
+       if headers is None:
+           headers = self._headers[raw_headers] = Headers(json.loads(raw_headers))
+       content = self._mm[start:start + body_length]
+       if flags & _FLAG_ZLIB:
+           content = zlib.decompress(content)
+       return ApiResponse(status, content, headers)
+
+
+   def close(self) -> None:
+       with self._lock:
+           if self._closed:
+               return
+           self._closed = True
+       if self.mode == "record":
+           self._finish()
+       else:
+           self._mm.close()
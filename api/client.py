@@ -2,24 +2,39 @@ from __future__ import annotations
 
 
 import os
+import threading
+import time
 import uuid
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
 
 
-import requests
+from api.cassette import Cassette, CassetteMiss
+from api.indexes import matches, parse_conditions, parse_query
+from api.metrics import LatencyRecorder, default_recorder, reset_connect_time, take_connect_time
+from api.resilience import CircuitBreaker, RetryPolicy, TokenBucket, parse_retry_after
+from api.response import ApiResponse, SimpleResponse
+from api.store import ShardedStore, default_store
+from api.teardown import DEFAULT_TEARDOWN_ROUNDS, CreatedObjects, reclaim_leftovers
 
 
+if TYPE_CHECKING:
+   import requests
 
 
-@dataclass
-class SimpleResponse:
-   status_code: int
-   _json_data: Dict[str, Any]
 
 
-   def json(self) -> Dict[str, Any]:
-       return self._json_data
+DEFAULT_TIMEOUT = 15  # read timeout of one attempt
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_DEADLINE = 30  # no retry is started that would end after this (seconds since the call began)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+DEFAULT_BULK_BATCH_SIZE = 100
+DEFAULT_PAGE_SIZE = 100
 
 
 
@@ -28,11 +43,13 @@ class FakeObjectApi:
    """
    Minimal in-memory API to make BDD tests deterministic and offline-friendly.
    Mirrors the behaviors asserted in the feature files (200/404/4xx).
+   Safe to call from many threads; pass a shared store proxy to let several
+   processes hit the same backend.
    """
 
 
-   def __init__(self) -> None:
-       self._store: Dict[str, Dict[str, Any]] = {}
+   def __init__(self, store=None) -> None:
+       self._store = store if store is not None else ShardedStore()
 
 
    def post(self, payload: Dict[str, Any]) -> SimpleResponse:
@@ -43,7 +60,7 @@ class FakeObjectApi:
 
        object_id = uuid.uuid4().hex
        obj = {"id": object_id, **payload}
-       self._store[object_id] = obj
+       self._store.set(object_id, obj)
        return SimpleResponse(200, obj)
 
 
@@ -55,68 +72,429 @@ class FakeObjectApi:
 
 
    def put(self, object_id: str, payload: Dict[str, Any]) -> SimpleResponse:
-       if object_id not in self._store:
-           return SimpleResponse(404, {"error": "not found"})
        obj = {"id": object_id, **payload}
-       self._store[object_id] = obj
+       if not self._store.replace(object_id, obj):
+           return SimpleResponse(404, {"error": "not found"})
        return SimpleResponse(200, obj)
 
 
    def delete(self, object_id: str) -> SimpleResponse:
-       if object_id not in self._store:
+       if self._store.pop(object_id) is None:
            return SimpleResponse(404, {"error": "not found"})
-       del self._store[object_id]
        return SimpleResponse(200, {"deleted": True})
 
 
+   # Bulk variants: one pass over the input, one response per item, streamed
+   def bulk_create(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[SimpleResponse]:
+       return map(self.post, payloads)
+
+
+   def bulk_get(self, object_ids: Iterable[str]) -> Iterator[SimpleResponse]:
+       return map(self.get, object_ids)
+
+
+   def bulk_update(self, updates: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[SimpleResponse]:
+       return (self.put(object_id, payload) for object_id, payload in updates)
+
+
+   def bulk_delete(self, object_ids: Iterable[str]) -> Iterator[SimpleResponse]:
+       return map(self.delete, object_ids)
+
+
+   # Collection reads (GET /objects, GET /objects?id=..&id=..), answered from the store's indexes.
+   # conditions: name="X", price__lt=500, color="Red", ... (see api/indexes.py)
+   def list(self, **conditions: Any) -> SimpleResponse:
+       try:
+           return SimpleResponse(200, list(self._store.select(conditions)))
+       except ValueError as e:
+           return SimpleResponse(400, {"error": str(e)})
+
+
+   def get_many(self, object_ids: Iterable[str]) -> SimpleResponse:
+       return SimpleResponse(200, self._store.get_many(list(object_ids)))
+
+
+   def iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, **conditions: Any) -> Iterator[SimpleResponse]:
+       """One response per page of up to page_size objects, each computed only when it's asked for."""
+       try:
+           objects = self._store.select(conditions)
+           page = list(islice(objects, page_size))
+       except ValueError as e:
+           yield SimpleResponse(400, {"error": str(e)})
+           return
+       while page:
+           yield SimpleResponse(200, page)
+           page = list(islice(objects, page_size))
+
+
+
+
+def build_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+   """
+   Keep-alive session with a bounded connection pool. The transport itself
+   never retries: ObjectApi retries, so every attempt passes its rate limit
+   and circuit breaker.
+   """
+   # requests/urllib3 are only needed on the live path; importing them costs more than the fake run
+   import requests
+
+   from api.transport import TimedHTTPAdapter
+
+   adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+   session = requests.Session()
+   session.mount("http://", adapter)
+   session.mount("https://", adapter)
+   return session
+
+
 
 
 class ObjectApi:
    """
    Backend selector.
    - Default: fake in-memory API (no network)
-   - Set LIVE_API=1 to hit the public endpoint
+   - Set LIVE_API=1 (or pass live=True) to hit the endpoint at base_url
+
+   Live calls share one pooled keep-alive session. It is created lazily, is safe
+   to use from several threads, and is rebuilt after a fork so xdist workers
+   never share sockets. Call close() (or use as a context manager) at the end.
+
+   Every call is timed into `latency` (the run-wide recorder by default).
+
+   Live calls go through a resilience layer (api/resilience.py):
+   - rate_limit: client-side token bucket, calls per second (default: API_RATE_LIMIT, else unlimited);
+     a 429's Retry-After pauses it for every thread
+   - retries: jittered exponential backoff, or the server's Retry-After, for
+     idempotent verbs on connection errors/timeouts and 429/502/503/504 (POST: 429 only),
+     never past `deadline` seconds into the call
+   - breaker: after consecutive failed attempts, calls fail at once with CircuitOpenError
+     instead of each waiting out its timeouts and retries
+
+   With a cassette (see api/cassette.py), live calls are recorded into it, or
+   in replay mode served from it without any network - replay implies live.
+
+   Live objects created and not (yet) deleted are tracked in `created`;
+   delete_leftovers() removes them at the end of a run (see api/teardown.py).
    """
 
 
-   def __init__(self, base_url: str) -> None:
+   def __init__(
+       self,
+       base_url: str,
+       pool_size: int = DEFAULT_POOL_SIZE,
+       retries: int = DEFAULT_RETRIES,
+       backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+       timeout: float = DEFAULT_TIMEOUT,
+       recorder: Optional[LatencyRecorder] = None,
+       live: Optional[bool] = None,
+       cassette: Optional[Cassette] = None,
+       connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+       deadline: float = DEFAULT_DEADLINE,
+       rate_limit: Optional[float] = None,
+       breaker: Optional[CircuitBreaker] = None,
+   ) -> None:
        self._base_url = base_url
-       self._fake = FakeObjectApi()
+       self._live = live
+       self._cassette = cassette
+       self.latency = recorder if recorder is not None else default_recorder
+       self._fake = FakeObjectApi(default_store())
+       self._pool_size = pool_size
+       self._timeout = (connect_timeout, timeout)
+       self._deadline = deadline
+       if rate_limit is None and os.getenv("API_RATE_LIMIT"):
+           rate_limit = float(os.getenv("API_RATE_LIMIT"))
+       self.rate_limiter = TokenBucket(rate_limit)
+       self.retry_policy = RetryPolicy(retries, backoff_factor)
+       self.breaker = breaker if breaker is not None else CircuitBreaker()
+       self._session: Optional[requests.Session] = None
+       self._session_pid: Optional[int] = None
+       self._session_lock = threading.Lock()
+       self.created = CreatedObjects()
+
+
+   @property
+   def base_url(self) -> str:
+       return self._base_url
+
+
+   @property
+   def pool_size(self) -> int:
+       return self._pool_size
 
 
    @property
    def live(self) -> bool:
+       if self._live is not None:
+           return self._live
+       if self._cassette is not None and self._cassette.replaying:
+           return True
        return os.getenv("LIVE_API", "").strip().lower() in {"1", "true", "yes", "y"}
 
 
+   @property
+   def session(self) -> requests.Session:
+       pid = os.getpid()
+       if self._session is None or self._session_pid != pid:
+           with self._session_lock:
+               if self._session is None or self._session_pid != pid:
+                   self._session = build_session(self._pool_size)
+                   self._session_pid = pid
+       return self._session
+
+
+   def close(self) -> None:
+       with self._session_lock:
+           if self._session is not None and self._session_pid == os.getpid():
+               self._session.close()
+           self._session = None
+           self._session_pid = None
+       if self._cassette is not None:
+           self._cassette.close()
+
+
+   def __enter__(self) -> "ObjectApi":
+       return self
+
+
+   def __exit__(self, *exc_info: Any) -> None:
+       self.close()
+
+
+   def _call_fake(self, verb: str, method, *args: Any) -> SimpleResponse:
+       start = time.perf_counter()
+       response = method(*args)
+       response.elapsed = time.perf_counter() - start
+       self.latency.record(verb, response.elapsed)
+       return response
+
+
+   def _call_replay(self, verb: str, path: str, payload: Optional[Dict[str, Any]]) -> Optional[ApiResponse]:
+       start = time.perf_counter()
+       response = self._cassette.play(verb, path, payload)
+       if response is not None:
+           response.elapsed = time.perf_counter() - start
+           self.latency.record(verb, response.elapsed)
+           return response
+       if self._cassette.on_miss == "fake":
+           if verb == "GET" and not path.startswith("/"):  # collection read
+               ids, conditions = parse_query(path[1:])
+               method = partial(self._fake.get_many, ids) if ids else partial(self._fake.list, **conditions)
+               return self._call_fake(verb, method)
+           object_id = path[1:]
+           args = (payload,) if verb == "POST" else (object_id, payload) if verb == "PUT" else (object_id,)
+           return self._call_fake(verb, getattr(self._fake, verb.lower()), *args)
+       if self._cassette.on_miss == "error":
+           raise CassetteMiss(f"No recorded response for {verb} {path or '/'} in {self._cassette.path}")
+       return None
+
+
+   def _call_live(self, verb: str, path: str, payload: Optional[Dict[str, Any]] = None) -> ApiResponse:
+       # path is relative to base_url, so a cassette replays against any base URL
+       cassette = self._cassette
+       if cassette is not None and cassette.replaying:
+           response = self._call_replay(verb, path, payload)
+           if response is not None:
+               return response
+       reset_connect_time()
+       start = time.perf_counter()
+       response = ApiResponse.from_requests(self._send(verb, path, payload, start))
+       response.elapsed = time.perf_counter() - start
+       self.latency.record(verb, response.elapsed, connect=take_connect_time(), ttfb=response.ttfb)
+       if cassette is not None and not cassette.replaying:
+           cassette.record(verb, path, payload, response)
+       return response
+
+
+   def _send(self, verb: str, path: str, payload: Optional[Dict[str, Any]], start: float) -> requests.Response:
+       """One live call through the rate limit, circuit breaker and retry policy."""
+       import requests
+
+       policy, breaker, limiter = self.retry_policy, self.breaker, self.rate_limiter
+       url = self._base_url + path
+       attempt = 0
+       while True:
+           breaker.before_call()
+           limiter.acquire()
+           try:
+               response = self.session.request(verb, url, json=payload, timeout=self._timeout)
+           except (requests.ConnectionError, requests.Timeout):
+               breaker.record_failure()
+               delay = policy.delay(attempt) if policy.retries_error(verb) else None
+               if delay is None or time.perf_counter() + delay - start > self._deadline:
+                   raise
+           else:
+               status = response.status_code
+               if status == 429 or status >= 500:
+                   breaker.record_failure()
+               else:
+                   breaker.record_success()
+               if not policy.retries_status(verb, status):
+                   return response
+               if status == 429:
+                   retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                   if retry_after is not None:
+                       limiter.pause(min(retry_after, policy.max_retry_after))
+               delay = policy.delay(attempt, response.headers)
+               if delay is None or time.perf_counter() + delay - start > self._deadline:
+                   return response
+               response.close()
+           time.sleep(delay)
+           attempt += 1
+
+
    def post(self, payload: Dict[str, Any]):
        if not self.live:
-           return self._fake.post(payload)
-       return requests.post(self._base_url, json=payload, timeout=15)
+           return self._call_fake("POST", self._fake.post, payload)
+       response = self._call_live("POST", "", payload)
+       if response.status_code == 200:
+           try:
+               created = response.json()
+           except ValueError:  # e.g. a proxy's HTML page: nothing to register, the caller sees the body
+               created = None
+           if isinstance(created, dict) and created.get("id"):
+               self.created.add(created["id"])
+       return response
 
 
    def get(self, object_id: str):
        if not self.live:
-           return self._fake.get(object_id)
-       return requests.get(f"{self._base_url}/{object_id}", timeout=15)
+           return self._call_fake("GET", self._fake.get, object_id)
+       return self._call_live("GET", f"/{object_id}")
 
 
    def put(self, object_id: str, payload: Dict[str, Any]):
        if not self.live:
-           return self._fake.put(object_id, payload)
-       return requests.put(f"{self._base_url}/{object_id}", json=payload, timeout=15)
+           return self._call_fake("PUT", self._fake.put, object_id, payload)
+       return self._call_live("PUT", f"/{object_id}", payload)
 
 
    def delete(self, object_id: str):
        if not self.live:
-           return self._fake.delete(object_id)
-       return requests.delete(f"{self._base_url}/{object_id}", timeout=15)
+           return self._call_fake("DELETE", self._fake.delete, object_id)
+       response = self._call_live("DELETE", f"/{object_id}")
+       if response.status_code in (200, 404):
+           self.created.discard(object_id)
+       return response
+
+
+   def delete_leftovers(self, leftovers_file: Optional[str] = None, concurrency: Optional[int] = None,
+                        rounds: int = DEFAULT_TEARDOWN_ROUNDS) -> Optional[Dict[str, Any]]:
+       """
+       Delete the live objects this client created and didn't delete, and the
+       ones earlier runs recorded in leftovers_file, on at most `concurrency`
+       threads (default: the pool size). Ids that still can't be deleted are
+       written to leftovers_file for the next run. Returns the summary of
+       api.teardown.delete_objects, or None in fake or replay mode.
+       """
+       if not self.live or (self._cassette is not None and self._cassette.replaying):
+           return None
+       return reclaim_leftovers(self, leftovers_file, concurrency=concurrency or self._pool_size, rounds=rounds)
+
+
+   # ---------------------------
+   # Collection reads
+   # ---------------------------
+   def list(self, **conditions: Any):
+       """
+       Objects matching the conditions (all if none). Live: GET base_url with the
+       conditions as query parameters; the result is re-filtered here as well,
+       since the public API ignores parameters it doesn't know.
+       """
+       if not self.live:
+           return self._call_fake("GET", partial(self._fake.list, **conditions))
+       path = "?" + urlencode(sorted(conditions.items())) if conditions else ""
+       return _filtered(self._call_live("GET", path), conditions)
+
+
+   def get_many(self, object_ids: Iterable[str]):
+       object_ids = list(object_ids)
+       if not self.live:
+           return self._call_fake("GET", self._fake.get_many, object_ids)
+       if not object_ids:  # "?" alone would read the whole collection
+           return SimpleResponse(200, [])
+       return self._call_live("GET", "?" + urlencode([("id", object_id) for object_id in object_ids]))
+
+
+   def iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, **conditions: Any) -> Iterator[Any]:
+       """
+       Generator of responses with up to page_size objects each. Fake mode
+       queries the store page by page; the live API has no pagination, so the
+       list is fetched once and split.
+       """
+       if not self.live:
+           pages = self._fake.iter_pages(page_size, **conditions)
+           while True:
+               start = time.perf_counter()
+               page = next(pages, None)
+               if page is None:
+                   return
+               page.elapsed = time.perf_counter() - start
+               self.latency.record("GET", page.elapsed)
+               yield page
+       response = self.list(**conditions)
+       if not response.ok:
+           yield response
+           return
+       objects = response.json()
+       for start in range(0, len(objects), page_size):
+           yield ApiResponse(response.status_code, headers=response.headers,
+                             data=objects[start:start + page_size], elapsed=response.elapsed)
+
+
+   # ---------------------------
+   # Bulk operations
+   # ---------------------------
+   def _bulk(self, method, items: Iterable[Tuple[Any, ...]], batch_size: int, concurrency: Optional[int]):
+       """
+       Yield method(*item) for every item, in input order.
+       Live mode pulls `batch_size` items at a time and runs them on at most
+       `concurrency` threads (default: the pool size), keeping one batch in
+       flight while the previous one is being consumed, so memory stays flat.
+       """
+       if not self.live:
+           for item in items:
+               yield method(*item)
+           return
+
+       items = iter(items)
+       with ThreadPoolExecutor(max_workers=concurrency or self._pool_size, thread_name_prefix="object-api-bulk") as pool:
+           pending = []
+           while True:
+               batch = list(islice(items, batch_size))
+               submitted = [pool.submit(method, *item) for item in batch]
+               for future in pending:
+                   yield future.result()
+               if not submitted:
+                   return
+               pending = submitted
+
+
+   def bulk_create(self, payloads: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BULK_BATCH_SIZE, concurrency: Optional[int] = None):
+       return self._bulk(self.post, ((p,) for p in payloads), batch_size, concurrency)
+
 
+   def bulk_get(self, object_ids: Iterable[str], batch_size: int = DEFAULT_BULK_BATCH_SIZE, concurrency: Optional[int] = None):
+       return self._bulk(self.get, ((i,) for i in object_ids), batch_size, concurrency)
 
 
+   def bulk_update(self, updates: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int = DEFAULT_BULK_BATCH_SIZE, concurrency: Optional[int] = None):
+       return self._bulk(self.put, updates, batch_size, concurrency)
 
 
+   def bulk_delete(self, object_ids: Iterable[str], batch_size: int = DEFAULT_BULK_BATCH_SIZE, concurrency: Optional[int] = None):
+       return self._bulk(self.delete, ((i,) for i in object_ids), batch_size, concurrency)
 
 
 
 
+def _filtered(response: ApiResponse, conditions: Dict[str, Any]) -> ApiResponse:
+   """response with only the listed objects that match conditions."""
+   if not conditions or not response.ok:
+       return response
+   parsed = parse_conditions(conditions)
+   objects: List[Dict[str, Any]] = response.json()
+   kept = [obj for obj in objects if matches(obj, parsed)]
+   if len(kept) == len(objects):
+       return response
+   return ApiResponse(response.status_code, headers=response.headers, data=kept,
+                      elapsed=response.elapsed, ttfb=response.ttfb)
@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from itertools import accumulate, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+from api.indexes import matches, parse_conditions
+
+
+try:  # no cross-process guard where flock doesn't exist
+   import fcntl
+except ImportError:
+   fcntl = None
+
+try:  # optional faster codec; same results as json for stored objects
+   import orjson
+
+
+   _dumps = orjson.dumps
+   _loads = orjson.loads
+except ImportError:
+   def _dumps(obj: Any) -> bytes:
+       return json.dumps(obj, separators=(",", ":")).encode()
+
+
+   _loads = json.loads
+
+
+
+
+LOG_MAGIC = b"OBJLOG1\0"
+INDEX_MAGIC = b"OBJIDX1\0"
+INDEX_SUFFIX = ".idx"
+
+DEFAULT_CHECKPOINT_EVERY = 100_000  # ids changed since the last snapshot before a new one is written
+DEFAULT_COMPACT_RATIO = 0.5  # share of dead bytes in the log that triggers a compaction
+COMPACT_MIN_BYTES = 16 << 20  # ... once the dead bytes are at least this many
+
+_LOG_HEADER = struct.Struct(">8s8s")  # LOG_MAGIC, generation
+_RECORD = struct.Struct(">BII")  # op, id length, value length
+_INDEX_HEADER = struct.Struct(">8s8sQQQ")  # INDEX_MAGIC, generation, log bytes covered, entries, dead bytes
+_FANOUT = struct.Struct(">65537I")  # first entry of each 2-byte key prefix, plus the entry count
+_FANOUT_PAIR = struct.Struct(">II")
+_ENTRY = struct.Struct(">16sQ")  # id key, record offset
+_OFFSET = struct.Struct(">Q")
+_KEY_SIZE = 16
+_ENTRIES_OFFSET = _INDEX_HEADER.size + _FANOUT.size
+_SCAN_BATCH = 1024
+
+_OP_DELETE, _OP_SET = 0, 1
+_DELETED = -1  # marks an id deleted since the snapshot
+
+
+
+
+def _key(object_id: bytes) -> bytes:
+   return hashlib.blake2b(object_id, digest_size=_KEY_SIZE).digest()
+
+
+
+
+class DiskStore:
+   """
+   Persistent object store for FakeObjectApi, with the same interface as
+   ShardedStore. Datasets can be larger than memory and survive between runs.
+
+   log:      `path`, append-only. Every set/replace writes the object's JSON,
+             every pop a tombstone; nothing is ever rewritten in place.
+   snapshot: `path` + ".idx", the live ids as (16-byte blake2b key, log
+             offset) entries sorted by key, with a fan-out table over the
+             first two key bytes. Memory-mapped, so opening a store takes
+             milliseconds however big it is, and a lookup is a few probes.
+   recent:   in-memory key -> offset map of the ids changed since the
+             snapshot. Opening replays the log past the snapshot into it.
+
+   A new snapshot is written every `checkpoint_every` changed ids (bounding
+   memory and start-up replay) and on close(); when dead records make up
+   `compact_ratio` of the log, compaction rewrites it with only the live
+   objects. Both run inline, under the store's lock; compaction waits until
+   no select() is in progress. A truncated last record (a crash mid-write)
+   is dropped on open.
+
+   Filter queries scan the log: there are no secondary indexes on disk.
+   One process at a time may open a store; share it between xdist workers
+   with FAKE_STORE_SHARED=1.
+   """
+
+
+   def __init__(self, path: str, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                compact_ratio: float = DEFAULT_COMPACT_RATIO) -> None:
+       self.path = path
+       self.index_path = path + INDEX_SUFFIX
+       self.checkpoint_every = checkpoint_every
+       self.compact_ratio = compact_ratio
+       self.compactions = 0
+       self._lock = threading.Lock()
+       self._scans = 0
+       self._closed = False
+       self._open_log()
+       self._open_snapshot()
+       self._replay(self._covered)
+       self._maybe_maintain()
+
+
+   def __enter__(self) -> "DiskStore":
+       return self
+
+
+   def __exit__(self, *exc_info: Any) -> None:
+       self.close()
+
+
+   # ---------------------------
+   # Files
+   # ---------------------------
+   def _open_log(self) -> None:
+       folder = os.path.dirname(os.path.abspath(self.path))
+       os.makedirs(folder, exist_ok=True)
+       self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+       if fcntl is not None:
+           try:
+               fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+           except BlockingIOError:
+               os.close(self._fd)
+               raise RuntimeError(f"{self.path} is open in another process or client; "
+                                  f"share one store with FAKE_STORE_SHARED=1") from None
+       self._size = os.fstat(self._fd).st_size
+       if self._size == 0:
+           os.pwrite(self._fd, _LOG_HEADER.pack(LOG_MAGIC, os.urandom(8)), 0)
+           self._size = _LOG_HEADER.size
+       header = os.pread(self._fd, _LOG_HEADER.size, 0)
+       if len(header) < _LOG_HEADER.size or header[:len(LOG_MAGIC)] != LOG_MAGIC:
+           os.close(self._fd)
+           raise ValueError(f"Not an object store log: {self.path}")
+       self._generation = _LOG_HEADER.unpack(header)[1]
+       self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+
+
+   def _remap(self) -> None:
+       # records past the mapping are read with pread until the next remap
+       old, self._mm = self._mm, mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+       old.close()
+
+
+   def _open_snapshot(self) -> None:
+       self._index_mm: Optional[mmap.mmap] = None
+       self._entries = 0
+       self._covered = _LOG_HEADER.size
+       self._dead = 0
+       self._recent: Dict[bytes, int] = {}
+       try:
+           with open(self.index_path, "rb") as f:
+               mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+       except (FileNotFoundError, ValueError):  # ValueError: empty file
+           return
+       if len(mm) >= _ENTRIES_OFFSET:
+           magic, generation, covered, entries, dead = _INDEX_HEADER.unpack_from(mm, 0)
+           # a snapshot of another log (e.g. left over from before a compaction) is ignored
+           if (magic == INDEX_MAGIC and generation == self._generation and covered <= self._size
+                   and len(mm) == _ENTRIES_OFFSET + entries * _ENTRY.size):
+               self._index_mm, self._entries, self._covered, self._dead = mm, entries, covered, dead
+               self._count = entries
+               return
+       mm.close()
+
+
+   def _replay(self, start: int) -> None:
+       """Apply the log records from `start` on; drop a truncated last record."""
+       if self._index_mm is None:
+           self._count = 0
+       pos, size = start, self._size
+       while pos + _RECORD.size <= size:
+           op, id_length, value_length = _RECORD.unpack_from(self._mm, pos)
+           end = pos + _RECORD.size + id_length + value_length
+           if end > size or op not in (_OP_DELETE, _OP_SET):
+               break
+           key = _key(self._mm[pos + _RECORD.size:pos + _RECORD.size + id_length])
+           self._apply(key, pos, end - pos, op == _OP_DELETE)
+           pos = end
+       if pos < size:
+           os.ftruncate(self._fd, pos)
+           self._size = pos
+           self._remap()
+
+
+   # ---------------------------
+   # Records
+   # ---------------------------
+   def _snapshot_lookup(self, key: bytes) -> Optional[int]:
+       mm = self._index_mm
+       if mm is None:
+           return None
+       lo, hi = _FANOUT_PAIR.unpack_from(mm, _INDEX_HEADER.size + ((key[0] << 8) | key[1]) * 4)
+       while lo < hi:
+           mid = (lo + hi) // 2
+           start = _ENTRIES_OFFSET + mid * _ENTRY.size
+           probe = mm[start:start + _KEY_SIZE]
+           if probe < key:
+               lo = mid + 1
+           elif probe > key:
+               hi = mid
+           else:
+               return _OFFSET.unpack_from(mm, start + _KEY_SIZE)[0]
+       return None
+
+
+   def _lookup(self, key: bytes) -> Optional[int]:
+       offset = self._recent.get(key)
+       if offset is None:
+           return self._snapshot_lookup(key)
+       return offset if offset != _DELETED else None
+
+
+   def _read(self, offset: int, length: int) -> bytes:
+       if offset + length <= len(self._mm):
+           return self._mm[offset:offset + length]
+       return os.pread(self._fd, length, offset)
+
+
+   def _record(self, offset: int) -> Tuple[int, bytes]:
+       """(record size, value) of the record at offset."""
+       _, id_length, value_length = _RECORD.unpack(self._read(offset, _RECORD.size))
+       size = _RECORD.size + id_length + value_length
+       return size, self._read(offset + _RECORD.size + id_length, value_length)
+
+
+   def _append(self, records: List[bytes]) -> int:
+       """Write records at the end of the log; returns where the first one starts."""
+       offset = self._size
+       data = b"".join(records)
+       os.pwrite(self._fd, data, offset)
+       self._size += len(data)
+       return offset
+
+
+   def _apply(self, key: bytes, offset: int, size: int, deleted: bool) -> None:
+       old = self._lookup(key)
+       if old is not None:
+           self._dead += self._record(old)[0]
+       if deleted:
+           self._dead += size
+           self._count -= old is not None
+           if self._snapshot_lookup(key) is None:
+               self._recent.pop(key, None)
+           else:
+               self._recent[key] = _DELETED
+       else:
+           self._count += old is None
+           self._recent[key] = offset
+
+
+   @staticmethod
+   def _encode(op: int, object_id: bytes, value: bytes = b"") -> bytes:
+       return _RECORD.pack(op, len(object_id), len(value)) + object_id + value
+
+
+   # ---------------------------
+   # Store interface (see ShardedStore)
+   # ---------------------------
+   def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+       key = _key(object_id.encode())
+       with self._lock:
+           offset = self._lookup(key)
+           if offset is None:
+               return None
+           value = self._record(offset)[1]
+       return _loads(value)
+
+
+   def set(self, object_id: str, obj: Dict[str, Any]) -> None:
+       self.set_many(((object_id, obj),))
+
+
+   def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int = 1024) -> None:
+       """set() for many objects, one write per batch: the fast way to preload a dataset."""
+       items = iter(items)
+       while True:
+           batch = [(object_id.encode(), _dumps(obj)) for object_id, obj in islice(items, batch_size)]
+           if not batch:
+               return
+           records = [self._encode(_OP_SET, object_id, value) for object_id, value in batch]
+           with self._lock:
+               offset = self._append(records)
+               for (object_id, _), record in zip(batch, records):
+                   self._apply(_key(object_id), offset, len(record), False)
+                   offset += len(record)
+               self._maybe_maintain()
+
+
+   def replace(self, object_id: str, obj: Dict[str, Any]) -> bool:
+       """Store obj only if object_id already exists; returns whether it did."""
+       id_bytes = object_id.encode()
+       key, record = _key(id_bytes), self._encode(_OP_SET, id_bytes, _dumps(obj))
+       with self._lock:
+           if self._lookup(key) is None:
+               return False
+           self._apply(key, self._append([record]), len(record), False)
+           self._maybe_maintain()
+           return True
+
+
+   def pop(self, object_id: str) -> Optional[Dict[str, Any]]:
+       id_bytes = object_id.encode()
+       key = _key(id_bytes)
+       with self._lock:
+           offset = self._lookup(key)
+           if offset is None:
+               return None
+           value = self._record(offset)[1]
+           record = self._encode(_OP_DELETE, id_bytes)
+           self._apply(key, self._append([record]), len(record), True)
+           self._maybe_maintain()
+       return _loads(value)
+
+
+   def get_many(self, object_ids: Iterable[str]) -> List[Dict[str, Any]]:
+       """The objects that exist among object_ids, in that order."""
+       found = (self.get(object_id) for object_id in object_ids)
+       return [obj for obj in found if obj is not None]
+
+
+   def select(self, conditions: Optional[Mapping[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+       """
+       Lazily yield the objects matching every condition (none: all objects)
+       in log order, by scanning the log a batch of records at a time.
+       Raises ValueError for an unknown operator.
+       """
+       parsed = parse_conditions(conditions or {})
+       with self._lock:
+           self._scans += 1
+       try:
+           pos = _LOG_HEADER.size
+           while True:
+               values = []
+               with self._lock:
+                   end = self._size
+                   while pos < end and len(values) < _SCAN_BATCH:
+                       op, id_length, value_length = _RECORD.unpack(self._read(pos, _RECORD.size))
+                       size = _RECORD.size + id_length + value_length
+                       if op == _OP_SET:
+                           key = _key(self._read(pos + _RECORD.size, id_length))
+                           if self._lookup(key) == pos:
+                               values.append(self._read(pos + _RECORD.size + id_length, value_length))
+                       pos += size
+               if not values:
+                   return
+               for value in values:
+                   obj = _loads(value)
+                   if matches(obj, parsed):
+                       yield obj
+       finally:
+           with self._lock:
+               self._scans -= 1
+
+
+   def __contains__(self, object_id: str) -> bool:
+       with self._lock:
+           return self._lookup(_key(object_id.encode())) is not None
+
+
+   def __len__(self) -> int:
+       return self._count
+
+
+   # ---------------------------
+   # Snapshots and compaction
+   # ---------------------------
+   def _snapshot_entries(self) -> Iterator[Tuple[bytes, int]]:
+       mm = self._index_mm
+       if mm is None:
+           return
+       chunk = 65536 * _ENTRY.size
+       end = _ENTRIES_OFFSET + self._entries * _ENTRY.size
+       for start in range(_ENTRIES_OFFSET, end, chunk):
+           yield from _ENTRY.iter_unpack(mm[start:min(start + chunk, end)])
+
+
+   def _live_entries(self) -> Iterator[Tuple[bytes, int]]:
+       """(key, offset) of every live object in key order: the snapshot merged with recent changes."""
+       recent = sorted(self._recent.items())
+       i = 0
+       for key, offset in self._snapshot_entries():
+           while i < len(recent) and recent[i][0] < key:
+               yield recent[i]
+               i += 1
+           if i < len(recent) and recent[i][0] == key:
+               if recent[i][1] != _DELETED:
+                   yield recent[i]
+               i += 1
+           else:
+               yield key, offset
+       yield from recent[i:]  # not in the snapshot, so never _DELETED
+
+
+   def _write_index(self, entries: Iterable[Tuple[bytes, int]], generation: bytes, covered: Callable[[], int]) -> None:
+       """Write a snapshot of `entries` (sorted by key); `covered` is read after they are all consumed."""
+       folder = os.path.dirname(os.path.abspath(self.index_path))
+       fd, temp_file = tempfile.mkstemp(dir=folder, prefix=".store-", suffix=".tmp")
+       counts = [0] * 65536
+       with os.fdopen(fd, "wb") as f:
+           f.seek(_ENTRIES_OFFSET)
+           batch = []
+           for key, offset in entries:
+               counts[(key[0] << 8) | key[1]] += 1
+               batch.append(_ENTRY.pack(key, offset))
+               if len(batch) == 65536:
+                   f.write(b"".join(batch))
+                   batch = []
+           f.write(b"".join(batch))
+           fanout = list(accumulate(counts, initial=0))
+           f.seek(0)
+           f.write(_INDEX_HEADER.pack(INDEX_MAGIC, generation, covered(), fanout[-1], self._dead))
+           f.write(_FANOUT.pack(*fanout))
+       os.replace(temp_file, self.index_path)
+
+
+   def _reopen_snapshot(self) -> None:
+       if self._index_mm is not None:
+           self._index_mm.close()
+       self._open_snapshot()
+
+
+   def _checkpoint(self) -> None:
+       count = self._count
+       self._write_index(self._live_entries(), self._generation, lambda: self._size)
+       self._reopen_snapshot()
+       self._count = count
+       self._remap()
+
+
+   def _compact(self) -> None:
+       folder = os.path.dirname(os.path.abspath(self.path))
+       fd, temp_file = tempfile.mkstemp(dir=folder, prefix=".store-", suffix=".tmp")
+       generation = os.urandom(8)
+       end = _LOG_HEADER.size
+       count = self._count
+
+       def relocated(f) -> Iterator[Tuple[bytes, int]]:
+           nonlocal end
+           for key, offset in self._live_entries():
+               _, id_length, value_length = _RECORD.unpack(self._read(offset, _RECORD.size))
+               record = self._read(offset, _RECORD.size + id_length + value_length)
+               f.write(record)
+               yield key, end
+               end += len(record)
+
+       with os.fdopen(fd, "wb") as f:
+           f.write(_LOG_HEADER.pack(LOG_MAGIC, generation))
+           self._dead = 0
+           self._write_index(relocated(f), generation, lambda: end)
+       # a crash between the two renames leaves a snapshot of the old log, which open() ignores
+       os.replace(temp_file, self.path)
+       self._mm.close()
+       os.close(self._fd)
+       self._open_log()
+       self._reopen_snapshot()
+       self._count = count
+       self.compactions += 1
+
+
+   def _maybe_maintain(self) -> None:
+       if not self._scans and self._dead >= COMPACT_MIN_BYTES and self._dead >= self.compact_ratio * self._size:
+           self._compact()
+       elif len(self._recent) >= max(self.checkpoint_every, self._entries // 4):
+           self._checkpoint()
+
+
+   def checkpoint(self) -> None:
+       """Write a snapshot now, so the next open doesn't replay anything."""
+       with self._lock:
+           self._checkpoint()
+
+
+   def compact(self) -> None:
+       """Rewrite the log with only the live objects (and a fresh snapshot)."""
+       with self._lock:
+           if self._scans:
+               raise RuntimeError("Can't compact while a select() is in progress")
+           self._compact()
+
+
+   def stats(self) -> Dict[str, Any]:
+       return {
+           "objects": self._count,
+           "log_bytes": self._size,
+           "dead_bytes": self._dead,
+           "snapshot_entries": self._entries,
+           "recent": len(self._recent),
+           "compactions": self.compactions,
+       }
+
+
+   def close(self) -> None:
+       with self._lock:
+           if self._closed:
+               return
+           self._closed = True
+           if self._recent or self._covered != self._size:
+               self._checkpoint()
+           if self._index_mm is not None:
+               self._index_mm.close()
+           self._mm.close()
+           os.close(self._fd)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+
+import json
+from bisect import bisect_left, insort
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from urllib.parse import parse_qsl
+
+
+# ---------------------------
+# Filter conditions and the secondary indexes ShardedStore keeps per shard.
+# Conditions are keyword-style: {"name": "Apple AirPods", "price__lt": 500}.
+# "id" and "name" are top-level fields; every other field is looked up in the
+# object's `data`, case-insensitively ("price" also matches "Price").
+# ---------------------------
+OPERATORS = ("eq", "lt", "lte", "gt", "gte")
+TOP_LEVEL_FIELDS = ("id", "name")
+
+# field -> index kind: "eq" (hash of value -> ids) or "range" (sorted numeric values)
+DEFAULT_INDEXES: Dict[str, str] = {
+   "name": "eq",
+   "color": "eq",
+   "capacity": "eq",
+   "price": "range",
+   "year": "range",
+}
+
+Condition = Tuple[str, str, Any]  # (field, operator, value)
+_value = itemgetter(0)
+
+
+
+
+def parse_conditions(conditions: Mapping[str, Any]) -> List[Condition]:
+   parsed = []
+   for key, value in conditions.items():
+       field, _, op = key.partition("__")
+       op = op or "eq"
+       if op not in OPERATORS:
+           raise ValueError(f"Unknown filter operator {op!r} in {key!r}; expected one of {OPERATORS}")
+       parsed.append((field if field in TOP_LEVEL_FIELDS else field.lower(), op, value))
+   return parsed
+
+
+
+
+def parse_query(query: str) -> Tuple[List[str], Dict[str, Any]]:
+   """
+   Query string of a collection read -> (ids, conditions): ?id=1&id=3 asks
+   for several ids, anything else is a condition. Values are untyped in a
+   query string, so "500" filters as a number and "Red" as a string.
+   """
+   ids, conditions = [], {}
+   for key, value in parse_qsl(query):
+       if key == "id":
+           ids.append(value)
+           continue
+       try:
+           conditions[key] = json.loads(value)
+       except ValueError:
+           conditions[key] = value
+   return ids, conditions
+
+
+
+
+def field_value(obj: Mapping[str, Any], field: str) -> Any:
+   if field in TOP_LEVEL_FIELDS:
+       return obj.get(field)
+   data = obj.get("data")
+   if not isinstance(data, dict):
+       return None
+   if field in data:
+       return data[field]
+   for key, value in data.items():
+       if key.lower() == field:
+           return value
+   return None
+
+
+def _has_data(obj: Mapping[str, Any]) -> bool:
+   data = obj.get("data")
+   return isinstance(data, dict) and bool(data)
+
+
+def _is_number(value: Any) -> bool:
+   return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_orderable(value: Any) -> bool:
+   # range indexes hold bools too: True == 1, so an eq on 1 must find them
+   return isinstance(value, (int, float))
+
+
+def _holds(value: Any, op: str, expected: Any) -> bool:
+   if op == "eq":
+       return value == expected
+   if not _is_number(value) or not _is_number(expected):
+       return False
+   if op == "lt":
+       return value < expected
+   if op == "lte":
+       return value <= expected
+   if op == "gt":
+       return value > expected
+   return value >= expected
+
+
+def matches(obj: Mapping[str, Any], conditions: List[Condition]) -> bool:
+   return all(_holds(field_value(obj, field), op, expected) for field, op, expected in conditions)
+
+
+
+
+class SortedPairs:
+   """
+   (value, id) pairs in sorted order, kept as a list of chunks of at most
+   2 * LOAD pairs, so an insert or delete shifts one small chunk instead of
+   the whole index, and a range lookup is two bisects.
+   """
+
+
+   LOAD = 512
+
+
+   def __init__(self) -> None:
+       self._chunks: List[List[Tuple[Any, str]]] = []
+       self._maxes: List[Tuple[Any, str]] = []  # last pair of each chunk
+
+
+   def __len__(self) -> int:
+       return sum(len(chunk) for chunk in self._chunks)
+
+
+   def add(self, pair: Tuple[Any, str]) -> None:
+       if not self._chunks:
+           self._chunks.append([pair])
+           self._maxes.append(pair)
+           return
+       i = min(bisect_left(self._maxes, pair), len(self._maxes) - 1)
+       chunk = self._chunks[i]
+       insort(chunk, pair)
+       self._maxes[i] = chunk[-1]
+       if len(chunk) > 2 * self.LOAD:
+           self._chunks[i:i + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+           self._maxes[i:i + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+
+
+   def remove(self, pair: Tuple[Any, str]) -> None:
+       i = bisect_left(self._maxes, pair)
+       if i == len(self._maxes):
+           return
+       chunk = self._chunks[i]
+       j = bisect_left(chunk, pair)
+       if j == len(chunk) or chunk[j] != pair:
+           return
+       del chunk[j]
+       if chunk:
+           self._maxes[i] = chunk[-1]
+       else:
+           del self._chunks[i], self._maxes[i]
+
+
+   def between(self, low: Any = None, high: Any = None) -> Iterator[str]:
+       """Ids whose value lies in [low, high] (None: unbounded), in value order."""
+       i = j = 0
+       if low is not None:
+           i = bisect_left(self._maxes, low, key=_value)
+           j = bisect_left(self._chunks[i], low, key=_value) if i < len(self._chunks) else 0
+       for chunk in self._chunks[i:]:
+           for pair in chunk[j:] if j else chunk:
+               if high is not None and pair[0] > high:
+                   return
+               yield pair[1]
+           j = 0
+
+
+
+
+class ObjectIndex:
+   """
+   Secondary indexes of one store shard, updated on every set/replace/pop
+   under the shard's lock. candidates() narrows a query to the ids of its
+   most selective indexed condition; the caller re-checks every condition.
+   """
+
+
+   def __init__(self, fields: Mapping[str, str] = DEFAULT_INDEXES) -> None:
+       self._equal: Dict[str, Dict[Any, Set[str]]] = {f: {} for f, kind in fields.items() if kind == "eq"}
+       self._range: Dict[str, SortedPairs] = {f: SortedPairs() for f, kind in fields.items() if kind == "range"}
+       # objects without `data` (most writes in the lifecycle) only touch the top-level indexes
+       self._equal_fields = list(self._equal.items())
+       self._range_fields = list(self._range.items())
+       self._top_equal = [(f, ids) for f, ids in self._equal_fields if f in TOP_LEVEL_FIELDS]
+       self._top_range = [(f, pairs) for f, pairs in self._range_fields if f in TOP_LEVEL_FIELDS]
+
+
+   def add(self, object_id: str, obj: Mapping[str, Any]) -> None:
+       has_data = _has_data(obj)
+       for field, index in self._equal_fields if has_data else self._top_equal:
+           value = field_value(obj, field)
+           if value is not None and not isinstance(value, (dict, list)):
+               ids = index.get(value)
+               if ids is None:
+                   index[value] = ids = set()
+               ids.add(object_id)
+       for field, pairs in self._range_fields if has_data else self._top_range:
+           value = field_value(obj, field)
+           if _is_orderable(value):
+               pairs.add((value, object_id))
+
+
+   def remove(self, object_id: str, obj: Mapping[str, Any]) -> None:
+       has_data = _has_data(obj)
+       for field, index in self._equal_fields if has_data else self._top_equal:
+           value = field_value(obj, field)
+           if value is not None and not isinstance(value, (dict, list)):
+               ids = index.get(value)
+               if ids is not None:
+                   ids.discard(object_id)
+                   if not ids:
+                       del index[value]
+       for field, pairs in self._range_fields if has_data else self._top_range:
+           value = field_value(obj, field)
+           if _is_orderable(value):
+               pairs.remove((value, object_id))
+
+
+   def candidates(self, conditions: List[Condition]) -> Optional[List[str]]:
+       """
+       Ids that may match (a superset of the matches), or None if no condition
+       is indexed. The smallest equality match competes with the first indexed
+       range: the range is read only up to the equality match's size, so
+       picking the smaller one never costs more than the smaller one. An index
+       that can't answer a condition (an unhashable value, an eq on a
+       non-number against a range index) is skipped, never taken as "no match".
+       """
+       best: Optional[Set[str]] = None
+       for field, op, value in conditions:
+           if op == "eq" and field in self._equal:
+               try:
+                   ids = self._equal[field].get(value, ())
+               except TypeError:  # unhashable value: only unindexed dicts/lists can equal it
+                   continue
+               if best is None or len(ids) < len(best):
+                   best = ids
+
+       in_range = None
+       for field, pairs in self._range.items():
+           bounds = [(op, value) for f, op, value in conditions if f == field]
+           if not bounds:
+               continue
+           if any(op != "eq" and not _is_number(value) for op, value in bounds):
+               return []  # an ordering against a non-number never holds
+           if not all(_is_orderable(value) for _, value in bounds):
+               continue  # e.g. price="419.99": the index only holds numbers
+           # inclusive bounds give a superset for lt/gt too; the caller's re-check drops the edges
+           lows = [value for op, value in bounds if op in ("eq", "gt", "gte")]
+           highs = [value for op, value in bounds if op in ("eq", "lt", "lte")]
+           in_range = pairs.between(max(lows) if lows else None, min(highs) if highs else None)
+           break
+
+       if best is None:
+           return None if in_range is None else list(in_range)
+       if in_range is not None:
+           ranged = list(islice(in_range, len(best) + 1))
+           if len(ranged) <= len(best):
+               return ranged
+       return list(best)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+
+import contextvars
+import json
+import marshal
+import math
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+PHASES = ("total", "connect", "ttfb")
+
+# Scenario the current call belongs to; set by the pytest-bdd hooks in conftest
+current_scenario: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_scenario", default=None)
+
+
+
+
+class LatencyHistogram:
+   """
+   Log-bucketed latency histogram (~1% relative error).
+   Memory depends on the latency range, not on the number of samples.
+   """
+
+
+   _GROWTH = 1.01
+   _LOG_GROWTH = math.log(_GROWTH)
+
+
+   def __init__(self) -> None:
+       self.buckets: Dict[int, int] = {}
+       self.count = 0
+       self.total = 0.0
+       self.max = 0.0
+
+
+   def add(self, seconds: float) -> None:
+       micros = max(seconds * 1e6, 1.0)
+       bucket = int(math.log(micros) / self._LOG_GROWTH)
+       self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+       self.count += 1
+       self.total += seconds
+       self.max = max(self.max, seconds)
+
+
+   def merge(self, other: "LatencyHistogram") -> None:
+       for bucket, n in other.buckets.items():
+           self.buckets[bucket] = self.buckets.get(bucket, 0) + n
+       self.count += other.count
+       self.total += other.total
+       self.max = max(self.max, other.max)
+
+
+   def to_state(self) -> Tuple[Dict[int, int], int, float, float]:
+       return self.buckets, self.count, self.total, self.max
+
+
+   @classmethod
+   def from_state(cls, state: Tuple[Dict[int, int], int, float, float]) -> "LatencyHistogram":
+       histogram = cls()
+       histogram.buckets, histogram.count, histogram.total, histogram.max = state
+       return histogram
+
+
+   def percentile(self, q: float) -> float:
+       if not self.count:
+           return 0.0
+       rank = max(1, math.ceil(q / 100 * self.count))
+       seen = 0
+       for bucket in sorted(self.buckets):
+           seen += self.buckets[bucket]
+           if seen >= rank:
+               # geometric middle of the bucket, never above the observed max
+               return min(self._GROWTH ** (bucket + 0.5) / 1e6, self.max)
+       return self.max
+
+
+   def summary(self) -> Dict[str, float]:
+       return {
+           "count": self.count,
+           "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+           "p50_ms": round(self.percentile(50) * 1000, 3),
+           "p90_ms": round(self.percentile(90) * 1000, 3),
+           "p95_ms": round(self.percentile(95) * 1000, 3),
+           "p99_ms": round(self.percentile(99) * 1000, 3),
+           "max_ms": round(self.max * 1000, 3),
+       }
+
+
+
+
+class LatencyRecorder:
+   """
+   Thread-safe per-call timings, aggregated per HTTP verb and per scenario.
+   Phases: total for every call; connect and ttfb for live calls only.
+   """
+
+
+   def __init__(self) -> None:
+       self._lock = threading.Lock()
+       # (scenario or None for the run-wide view, verb, phase) -> histogram
+       self._histograms: Dict[Tuple[Optional[str], str, str], LatencyHistogram] = {}
+
+
+   def record(
+       self,
+       verb: str,
+       total: float,
+       connect: Optional[float] = None,
+       ttfb: Optional[float] = None,
+       scenario: Optional[str] = None,
+   ) -> None:
+       scenario = scenario if scenario is not None else current_scenario.get()
+       scopes = (None, scenario) if scenario is not None else (None,)
+       with self._lock:
+           for phase, seconds in zip(PHASES, (total, connect, ttfb)):
+               if seconds is None:
+                   continue
+               for scope in scopes:
+                   key = (scope, verb, phase)
+                   histogram = self._histograms.get(key)
+                   if histogram is None:
+                       histogram = self._histograms[key] = LatencyHistogram()
+                   histogram.add(seconds)
+
+
+   def merge(self, other: "LatencyRecorder") -> None:
+       with self._lock:
+           for key, histogram in other._histograms.items():
+               self._histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+
+
+   def dumps(self) -> bytes:
+       """Compact snapshot for shipping to another process (see loads)."""
+       with self._lock:
+           return marshal.dumps([(key, h.to_state()) for key, h in self._histograms.items()])
+
+
+   @classmethod
+   def loads(cls, data: bytes) -> "LatencyRecorder":
+       recorder = cls()
+       for key, state in marshal.loads(data):
+           recorder._histograms[tuple(key)] = LatencyHistogram.from_state(state)
+       return recorder
+
+
+   def histograms(self, phase: str = "total") -> Dict[Tuple[Optional[str], str], LatencyHistogram]:
+       """(scenario or None, verb) -> histogram for one phase."""
+       with self._lock:
+           return {(scope, verb): h for (scope, verb, p), h in self._histograms.items() if p == phase}
+
+
+   def __len__(self) -> int:
+       return sum(h.count for (scope, _, phase), h in self._histograms.items() if scope is None and phase == "total")
+
+
+   def summary(self) -> Dict[str, Any]:
+       """{"by_verb": {verb: {phase: stats}}, "by_scenario": {scenario: {verb: {phase: stats}}}}"""
+       by_verb: Dict[str, Dict[str, Any]] = {}
+       by_scenario: Dict[str, Dict[str, Dict[str, Any]]] = {}
+       with self._lock:
+           for (scope, verb, phase), histogram in sorted(self._histograms.items(), key=lambda kv: (kv[0][0] or "", kv[0][1], kv[0][2])):
+               target = by_verb if scope is None else by_scenario.setdefault(scope, {})
+               target.setdefault(verb, {})[phase] = histogram.summary()
+       return {"by_verb": by_verb, "by_scenario": by_scenario}
+
+
+   def write_json(self, path: str) -> None:
+       with open(path, "w", encoding="utf-8") as f:
+           json.dump(self.summary(), f, indent=2)
+
+
+
+
+# Run-wide recorder shared by every ObjectApi that isn't given its own
+default_recorder = LatencyRecorder()
+
+
+
+
+# ---------------------------
+# Connect-time instrumentation for the live session (connections in api/transport.py)
+# ---------------------------
+_connect_time = threading.local()
+
+
+def reset_connect_time() -> None:
+   _connect_time.seconds = 0.0
+
+
+def take_connect_time() -> float:
+   """Seconds spent opening connections on this thread since the last reset (0 on a reused connection)."""
+   seconds = getattr(_connect_time, "seconds", 0.0)
+   _connect_time.seconds = 0.0
+   return seconds
+
+
+def add_connect_time(seconds: float) -> None:
+   _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + seconds
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, FrozenSet, Mapping, Optional
+
+
+# ---------------------------
+# Building blocks of the live path's resilience layer (see ObjectApi._send).
+# Plain stdlib, so fake-mode runs can import the client without requests.
+# ---------------------------
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_VERBS = frozenset({"GET", "PUT", "DELETE"})
+
+DEFAULT_MAX_BACKOFF = 5.0
+DEFAULT_MAX_RETRY_AFTER = 10.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 5.0
+
+
+
+
+class CircuitOpenError(ConnectionError):
+   """The endpoint failed repeatedly; calls fail immediately until the breaker's reset timeout passes."""
+
+
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+   """Retry-After header (delay-seconds or HTTP-date) -> seconds to wait, or None."""
+   if not value:
+       return None
+   try:
+       return max(0.0, float(value))
+   except ValueError:
+       pass
+   try:
+       when = parsedate_to_datetime(value).timestamp()
+   except (TypeError, ValueError):
+       return None
+   return max(0.0, when - (time.time() if now is None else now))
+
+
+
+
+class RetryPolicy:
+   """
+   Which attempts to retry and how long to wait in between.
+   - Idempotent verbs retry on transient errors and RETRY_STATUSES; a POST
+     only on 429 (the server refused it, so nothing was created)
+   - Waits use full jitter: uniform(0, min(max_backoff, backoff_factor * 2**attempt)),
+     so clients that failed together don't retry together
+   - A Retry-After header replaces the backoff; one above max_retry_after
+     means the response is returned at once instead of waiting that long
+   """
+
+
+   def __init__(
+       self,
+       retries: int,
+       backoff_factor: float,
+       max_backoff: float = DEFAULT_MAX_BACKOFF,
+       max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+       statuses: FrozenSet[int] = RETRY_STATUSES,
+   ) -> None:
+       self.retries = retries
+       self.backoff_factor = backoff_factor
+       self.max_backoff = max_backoff
+       self.max_retry_after = max_retry_after
+       self.statuses = statuses
+
+
+   def retries_status(self, verb: str, status: int) -> bool:
+       return status in self.statuses and (verb in IDEMPOTENT_VERBS or status == 429)
+
+
+   def retries_error(self, verb: str) -> bool:
+       return verb in IDEMPOTENT_VERBS
+
+
+   def backoff(self, attempt: int) -> float:
+       return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+
+   def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+       """Seconds to wait before retry number `attempt` + 1, or None if it shouldn't be retried."""
+       if attempt >= self.retries:
+           return None
+       retry_after = parse_retry_after(headers.get("Retry-After")) if headers is not None else None
+       if retry_after is None:
+           return self.backoff(attempt)
+       return retry_after if retry_after <= self.max_retry_after else None
+
+
+
+
+class TokenBucket:
+   """
+   Client-side rate limit shared by all threads of one client: `rate` calls
+   per second with bursts of up to `burst`. rate=None means unlimited, but
+   pause() still works, so a 429's Retry-After holds back every thread, not
+   just the one that got it.
+   """
+
+
+   def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None,
+                clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+       self.rate = rate
+       self.capacity = burst if burst is not None else max(1.0, rate or 1.0)
+       self._tokens = self.capacity
+       self._clock = clock
+       self._sleep = sleep
+       self._updated = clock()
+       self._paused_until = 0.0
+       self._lock = threading.Lock()
+
+
+   def pause(self, seconds: float) -> None:
+       with self._lock:
+           self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+   def _reserve(self) -> float:
+       """Take a token (possibly going into debt) and return how long the caller has to wait for it."""
+       with self._lock:
+           now = self._clock()
+           wait = max(0.0, self._paused_until - now)
+           if self.rate is None:
+               return wait
+           self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+           self._updated = now
+           self._tokens -= 1
+           if self._tokens < 0:
+               wait = max(wait, -self._tokens / self.rate)
+           return wait
+
+
+   def acquire(self) -> None:
+       # the fast path (unlimited, not paused) only takes the lock
+       wait = self._reserve()
+       if wait > 0:
+           self._sleep(wait)
+
+
+
+
+class CircuitBreaker:
+   """
+   closed    -> calls go through; `failure_threshold` failed attempts in a row open it
+   open      -> calls fail at once with CircuitOpenError for `reset_timeout` seconds
+   half-open -> one probe call goes through; success closes, failure re-opens
+                (a probe that never reports back is replaced after another reset_timeout)
+   Failures are transient errors and 5xx/429 responses; other responses (4xx included) are successes.
+   """
+
+
+   def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                clock: Callable[[], float] = time.monotonic) -> None:
+       self.failure_threshold = failure_threshold
+       self.reset_timeout = reset_timeout
+       self.opened = 0  # times the breaker tripped
+       self._clock = clock
+       self._failures = 0
+       self._opened_at: Optional[float] = None
+       self._probe_at: Optional[float] = None
+       self._lock = threading.Lock()
+
+
+   @property
+   def state(self) -> str:
+       if self._opened_at is None:
+           return "closed"
+       return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+
+   def before_call(self) -> None:
+       if self._opened_at is None:
+           return
+       with self._lock:
+           if self._opened_at is None:
+               return
+           now = self._clock()
+           remaining = self.reset_timeout - (now - self._opened_at)
+           if remaining > 0 or (self._probe_at is not None and now - self._probe_at < self.reset_timeout):
+               raise CircuitOpenError(f"Circuit open after {self._failures} consecutive failures; "
+                                      f"retrying in {max(remaining, 0):.1f} s")
+           self._probe_at = now
+
+
+   def record_success(self) -> None:
+       if self._failures or self._opened_at is not None:
+           with self._lock:
+               self._failures = 0
+               self._opened_at = None
+               self._probe_at = None
+
+
+   def record_failure(self) -> None:
+       with self._lock:
+           self._failures += 1
+           # a failed probe re-opens; stragglers that started before the breaker opened don't extend it
+           if self._probe_at is not None or (self._opened_at is None and self._failures >= self.failure_threshold):
+               self.opened += 1
+               self._opened_at = self._clock()
+               self._probe_at = None
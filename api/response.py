@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+
+import json
+from collections import abc
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+
+try:  # optional faster decoder; same results as json.loads for API bodies
+   import orjson
+
+
+   _loads = orjson.loads
+except ImportError:
+   _loads = json.loads
+
+
+
+
+class Headers(abc.Mapping):
+   """Read-only, case-insensitive header map for responses that didn't come from requests."""
+
+
+   __slots__ = ("_items",)
+
+
+   def __init__(self, items: Mapping[str, str] = ()) -> None:
+       self._items: Dict[str, Tuple[str, str]] = {k.lower(): (k, v) for k, v in dict(items).items()}
+
+
+   def __getitem__(self, name: str) -> str:
+       return self._items[name.lower()][1]
+
+
+   def __iter__(self) -> Iterator[str]:
+       return (name for name, _ in self._items.values())
+
+
+   def __len__(self) -> int:
+       return len(self._items)
+
+
+   def __repr__(self) -> str:
+       return repr(dict(self.items()))
+
+
+
+
+_UNDECODED = object()
+_JSON_HEADERS = Headers({"Content-Type": "application/json"})
+
+
+
+
+class ApiResponse:
+   """
+   What ObjectApi returns on both paths (fake and live).
+   - json() decodes the body once and caches the result (or the error)
+   - content / raw(): the body bytes, raw() as a zero-copy memoryview
+   - headers, elapsed (total seconds of the call), ttfb (live only)
+   """
+
+
+   __slots__ = ("status_code", "elapsed", "ttfb", "_headers", "_content", "_data", "_error")
+
+
+   def __init__(
+       self,
+       status_code: int,
+       content: Optional[bytes] = None,
+       headers: Optional[Mapping[str, str]] = None,
+       data: Any = _UNDECODED,
+       elapsed: Optional[float] = None,
+       ttfb: Optional[float] = None,
+   ) -> None:
+       self.status_code = status_code
+       self._headers = headers
+       self.elapsed = elapsed
+       self.ttfb = ttfb
+       self._content = content
+       self._data = data
+       self._error: Optional[ValueError] = None
+
+
+   @classmethod
+   def from_requests(cls, response, elapsed: Optional[float] = None) -> "ApiResponse":
+       return cls(response.status_code, response.content, response.headers,
+                  elapsed=elapsed, ttfb=response.elapsed.total_seconds())
+
+
+   @property
+   def headers(self) -> Mapping[str, str]:
+       # fake responses share one header map
+       return self._headers if self._headers is not None else _JSON_HEADERS
+
+
+   @property
+   def ok(self) -> bool:
+       return self.status_code < 400
+
+
+   @property
+   def content(self) -> bytes:
+       if self._content is None:
+           # fake responses carry decoded data; encode only if someone asks for bytes
+           self._content = json.dumps(self._data).encode() if self._data is not _UNDECODED else b""
+       return self._content
+
+
+   def raw(self) -> memoryview:
+       return memoryview(self.content)
+
+
+   @property
+   def text(self) -> str:
+       return self.content.decode("utf-8", errors="replace")
+
+
+   def json(self) -> Any:
+       if self._data is _UNDECODED:
+           if self._error is not None:
+               raise self._error
+           try:
+               self._data = _loads(self._content or b"")
+           except ValueError as e:
+               self._error = e
+               raise
+       return self._data
+
+
+   def __repr__(self) -> str:
+       return f"<ApiResponse [{self.status_code}]>"
+
+
+
+
+class SimpleResponse(ApiResponse):
+   """Fake-backend response: the body is already decoded."""
+
+
+   __slots__ = ()
+
+
+   def __init__(self, status_code: int, json_data: Dict[str, Any]) -> None:
+       super().__init__(status_code, data=json_data)
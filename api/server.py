@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+
+import argparse
+import glob
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+from api.client import FakeObjectApi
+from api.indexes import parse_query
+from api.store import ShardedStore
+
+
+
+
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), "..", "data")
+DEFAULT_SEED_FILES = tuple(sorted(glob.glob(os.path.join(DATA_FOLDER, "*.json"))))
+
+
+
+
+def latency_distribution(spec: Optional[str]) -> Optional[Callable[[], float]]:
+   """
+   Parse a latency spec (milliseconds) into a sampler returning seconds.
+   - "fixed:5"        always 5 ms
+   - "uniform:2-10"   uniform between 2 and 10 ms
+   - "exp:5"          exponential with a 5 ms mean (long tail)
+   """
+   if not spec:
+       return None
+   kind, _, value = spec.partition(":")
+   if kind == "fixed":
+       ms = float(value)
+       return lambda: ms / 1000
+   if kind == "uniform":
+       low, high = (float(v) for v in value.split("-"))
+       return lambda: random.uniform(low, high) / 1000
+   if kind == "exp":
+       mean = float(value)
+       return lambda: random.expovariate(1 / mean) / 1000
+   raise ValueError(f"Unknown latency spec: {spec}")
+
+
+
+
+def seed_store(store: ShardedStore, files: Iterable[str]) -> int:
+   """Load JSON arrays of objects (with ids), e.g. data/payload_single.json."""
+   count = 0
+   for path in files:
+       with open(path, encoding="utf-8") as f:
+           for obj in json.load(f):
+               store.set(str(obj["id"]), obj)
+               count += 1
+   return count
+
+
+
+
+class _Handler(BaseHTTPRequestHandler):
+   protocol_version = "HTTP/1.1"
+   disable_nagle_algorithm = True
+   server: "_ObjectsHTTPServer"
+
+
+   def _route(self) -> Tuple[bool, Optional[str]]:
+       path = self.path.split("?", 1)[0].rstrip("/")
+       if path == "/objects":
+           return True, None
+       if path.startswith("/objects/"):
+           return True, path[len("/objects/"):]
+       return False, None
+
+
+   def _body(self) -> Any:
+       length = int(self.headers.get("Content-Length") or 0)
+       raw = self.rfile.read(length) if length else b""
+       return json.loads(raw) if raw else {}
+
+
+   def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+       data = json.dumps(body).encode()
+       self.send_response(status)
+       self.send_header("Content-Type", "application/json")
+       self.send_header("Content-Length", str(len(data)))
+       for name, value in (headers or {}).items():
+           self.send_header(name, value)
+       self.end_headers()
+       self.wfile.write(data)
+
+
+   def _handle(self) -> None:
+       server = self.server
+       with server.requests_lock:
+           server.requests_seen += 1
+       found, object_id = self._route()
+       try:
+           payload = self._body() if self.command in ("POST", "PUT") else None
+       except ValueError:
+           return self._send(400, {"error": "invalid JSON"})
+
+       if server.latency is not None:
+           time.sleep(server.latency())
+       if server.error_rate and random.random() < server.error_rate:
+           headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else None
+           return self._send(server.error_status, {"error": "injected failure"}, headers)
+
+       if not found or (object_id is None and self.command in ("PUT", "DELETE")) or (object_id is not None and self.command == "POST"):
+           return self._send(404, {"error": "not found"})
+       if self.command in ("POST", "PUT") and not isinstance(payload, dict):
+           return self._send(400, {"error": "invalid payload"})
+
+       api = server.api
+       if self.command == "GET" and object_id is None:
+           response = self._collection(api)
+       elif self.command == "POST":
+           response = api.post(payload)
+       elif self.command == "GET":
+           response = api.get(object_id)
+       elif self.command == "PUT":
+           response = api.put(object_id, payload)
+       else:
+           response = api.delete(object_id)
+       self._send(response.status_code, response.json())
+
+
+   def _collection(self, api: FakeObjectApi):
+       """GET /objects: all objects, ?id=1&id=3 for several ids, or filters like ?name=X&price__lt=500."""
+       ids, conditions = parse_query(self.path.partition("?")[2])
+       return api.get_many(ids) if ids else api.list(**conditions)
+
+
+   do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+   def log_message(self, *args: Any) -> None:
+       pass
+
+
+
+
+class _ObjectsHTTPServer(ThreadingHTTPServer):
+   daemon_threads = True
+
+
+   def handle_error(self, request, client_address) -> None:
+       # clients that time out and hang up are expected (fault-injection runs); anything else is printed
+       if not isinstance(sys.exc_info()[1], ConnectionError):
+           super().handle_error(request, client_address)
+
+
+   def process_request_thread(self, request, client_address) -> None:
+       # At most max_connections connections are served at once; the rest wait their turn
+       if self.slots is None:
+           return super().process_request_thread(request, client_address)
+       with self.slots:
+           super().process_request_thread(request, client_address)
+
+
+
+
+class StandinServer:
+   """
+   Local HTTP stand-in for the objects API, so the live (requests) code path
+   can be tested and benchmarked offline.
+   - Same /objects contract as FakeObjectApi, on top of a ShardedStore
+   - Pre-seeded from data/*.json
+   - Optional latency distribution, error injection and connection limit
+   Point ObjectApi at `base_url` with LIVE_API=1 (or live=True).
+   """
+
+
+   def __init__(
+       self,
+       host: str = "127.0.0.1",
+       port: int = 0,
+       latency: Optional[str] = None,
+       error_rate: float = 0.0,
+       error_status: int = 503,
+       retry_after: Optional[float] = None,
+       max_connections: Optional[int] = None,
+       seed_files: Iterable[str] = DEFAULT_SEED_FILES,
+   ) -> None:
+       self.store = ShardedStore()
+       self.seeded = seed_store(self.store, seed_files)
+       self._httpd = _ObjectsHTTPServer((host, port), _Handler)
+       self._httpd.api = FakeObjectApi(self.store)
+       self._httpd.latency = latency_distribution(latency)
+       self._httpd.error_rate = error_rate
+       self._httpd.error_status = error_status
+       self._httpd.retry_after = retry_after
+       self._httpd.slots = threading.BoundedSemaphore(max_connections) if max_connections else None
+       self._httpd.requests_seen = 0
+       self._httpd.requests_lock = threading.Lock()
+       self._thread: Optional[threading.Thread] = None
+
+
+   @property
+   def requests_seen(self) -> int:
+       """Requests received so far, injected failures included (e.g. to count client retries)."""
+       return self._httpd.requests_seen
+
+
+   @property
+   def error_rate(self) -> float:
+       return self._httpd.error_rate
+
+
+   @error_rate.setter
+   def error_rate(self, value: float) -> None:
+       # e.g. end an injected outage while a test is running
+       self._httpd.error_rate = value
+
+
+   @property
+   def base_url(self) -> str:
+       host, port = self._httpd.server_address[:2]
+       return f"http://{host}:{port}/objects"
+
+
+   def start(self) -> "StandinServer":
+       # short poll interval so stop() returns quickly (session-scoped fixture teardown)
+       self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), name="standin-server", daemon=True)
+       self._thread.start()
+       return self
+
+
+   def stop(self) -> None:
+       if self._thread is not None:
+           self._httpd.shutdown()
+           self._thread.join()
+           self._thread = None
+       self._httpd.server_close()
+
+
+   def __enter__(self) -> "StandinServer":
+       return self.start()
+
+
+   def __exit__(self, *exc_info: Any) -> None:
+       self.stop()
+
+
+
+
+@contextmanager
+def standin_process(*cli_args: str) -> Iterator[str]:
+   """
+   Run the stand-in in a separate process and yield its base URL. Use this
+   when benchmarking concurrency, so client and server don't share a GIL.
+   """
+   process = subprocess.Popen(
+       [sys.executable, "-m", "api.server", "--port", "0", *cli_args],
+       cwd=os.path.join(os.path.dirname(__file__), ".."),
+       stdout=subprocess.PIPE,
+       text=True,
+   )
+   try:
+       banner = process.stdout.readline()
+       yield banner.split(" at ", 1)[1].split()[0]
+   finally:
+       process.terminate()
+       process.wait()
+       process.stdout.close()
+
+
+
+
+def main(argv=None) -> None:
+   parser = argparse.ArgumentParser(description="Local stand-in for the objects API.")
+   parser.add_argument("--host", default="127.0.0.1")
+   parser.add_argument("--port", type=int, default=8000)
+   parser.add_argument("--latency", help='e.g. "fixed:5", "uniform:2-10", "exp:5" (ms)')
+   parser.add_argument("--error-rate", type=float, default=0.0)
+   parser.add_argument("--error-status", type=int, default=503)
+   parser.add_argument("--retry-after", type=float)
+   parser.add_argument("--max-connections", type=int)
+   args = parser.parse_args(argv)
+
+   server = StandinServer(args.host, args.port, args.latency, args.error_rate, args.error_status,
+                          args.retry_after, args.max_connections)
+   print(f"Serving {server.seeded} seeded objects at {server.base_url}  (BASE_URL=... LIVE_API=1)", flush=True)
+   try:
+       server._httpd.serve_forever()
+   except KeyboardInterrupt:
+       pass
+   finally:
+       server._httpd.server_close()
+
+
+
+
+if __name__ == "__main__":
+   main()
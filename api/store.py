@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+
+import atexit
+import os
+import secrets
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+from api.indexes import DEFAULT_INDEXES, ObjectIndex, matches, parse_conditions
+
+
+DEFAULT_SHARDS = 16
+STORE_ADDRESS_ENV = "FAKE_STORE_ADDRESS"
+STORE_AUTHKEY_ENV = "FAKE_STORE_AUTHKEY"
+STORE_PATH_ENV = "FAKE_STORE_PATH"
+
+
+
+
+class ShardedStore:
+   """
+   Thread-safe object store for FakeObjectApi.
+   Objects are spread over `shards` dicts by id, each with its own lock.
+   Under the GIL the striping brings no throughput gain over a single lock
+   (benchmarks/bench_store_contention.py shows them level at every thread
+   count); it is kept because it is cheap and keeps select() from holding
+   one lock over the whole store.
+
+   Each shard also keeps secondary indexes (api/indexes.py) on the `indexes`
+   fields, so select() answers filter queries without scanning every object.
+   They are built by a shard's first select() and from then on updated under
+   the shard's lock; until then writes skip them, so a run that never
+   queries (the CRUD lifecycle) doesn't pay for them.
+   """
+
+
+   def __init__(self, shards: int = DEFAULT_SHARDS, indexes: Mapping[str, str] = DEFAULT_INDEXES) -> None:
+       self._indexes = indexes
+       # [lock, objects, index or None until the shard's first query]
+       self._shards: List[List[Any]] = [[threading.Lock(), {}, None] for _ in range(shards)]
+       self._count = shards
+
+
+   # get/set/replace/pop look up their shard inline: it is on the path of every call
+
+
+   def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+       return self._shards[hash(object_id) % self._count][1].get(object_id)
+
+
+   def set(self, object_id: str, obj: Dict[str, Any]) -> None:
+       shard = self._shards[hash(object_id) % self._count]
+       lock, objects = shard[0], shard[1]
+       with lock:
+           index = shard[2]  # read under the lock: select() may have just built it
+           if index is not None:
+               old = objects.get(object_id)
+               if old is not None:
+                   index.remove(object_id, old)
+               index.add(object_id, obj)
+           objects[object_id] = obj
+
+
+   def replace(self, object_id: str, obj: Dict[str, Any]) -> bool:
+       """Store obj only if object_id already exists; returns whether it did."""
+       shard = self._shards[hash(object_id) % self._count]
+       lock, objects = shard[0], shard[1]
+       with lock:
+           old = objects.get(object_id)
+           if old is None:
+               return False
+           index = shard[2]
+           if index is not None:
+               index.remove(object_id, old)
+               index.add(object_id, obj)
+           objects[object_id] = obj
+           return True
+
+
+   def pop(self, object_id: str) -> Optional[Dict[str, Any]]:
+       shard = self._shards[hash(object_id) % self._count]
+       lock, objects = shard[0], shard[1]
+       with lock:
+           obj = objects.pop(object_id, None)
+           index = shard[2]
+           if obj is not None and index is not None:
+               index.remove(object_id, obj)
+           return obj
+
+
+   def get_many(self, object_ids: Iterable[str]) -> List[Dict[str, Any]]:
+       """The objects that exist among object_ids, in that order."""
+       found = (self.get(object_id) for object_id in object_ids)
+       return [obj for obj in found if obj is not None]
+
+
+   def select(self, conditions: Optional[Mapping[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+       """
+       Lazily yield the objects matching every condition (see api.indexes;
+       none: all objects), one shard at a time, in no particular order.
+       Each shard is narrowed by its most selective index, or scanned if no
+       condition is indexed; every candidate is re-checked against all the
+       conditions when it is yielded, so an object changed after the lookup
+       is never returned if it no longer matches. Raises ValueError for an
+       unknown operator.
+       """
+       parsed = parse_conditions(conditions or {})
+       for shard in self._shards:
+           lock, objects = shard[0], shard[1]
+           with lock:
+               index = shard[2]
+               if parsed and index is None:
+                   index = shard[2] = ObjectIndex(self._indexes)
+                   for object_id, obj in objects.items():
+                       index.add(object_id, obj)
+               ids = index.candidates(parsed) if parsed else None
+               if ids is None:
+                   ids = list(objects)
+           for object_id in ids:
+               obj = objects.get(object_id)
+               if obj is not None and matches(obj, parsed):
+                   yield obj
+
+
+   def __contains__(self, object_id: str) -> bool:
+       return self.get(object_id) is not None
+
+
+   def __len__(self) -> int:
+       return sum(len(shard[1]) for shard in self._shards)
+
+
+
+
+# ---------------------------
+# Persistent mode: FAKE_STORE_PATH=<file> keeps the fake's objects on disk (api/diskstore.py)
+# ---------------------------
+_disk_stores: Dict[str, Any] = {}
+_disk_stores_lock = threading.Lock()
+
+
+def local_store():
+   """
+   A new ShardedStore, or with FAKE_STORE_PATH set, the DiskStore at that
+   path: opened once per process, shared by every client in it and
+   snapshotted at exit.
+   """
+   path = os.getenv(STORE_PATH_ENV)
+   if not path:
+       return ShardedStore()
+   path = os.path.abspath(path)
+   with _disk_stores_lock:
+       store = _disk_stores.get(path)
+       if store is None:
+           from api.diskstore import DiskStore
+
+           store = _disk_stores[path] = DiskStore(path)
+           atexit.register(store.close)
+   return store
+
+
+
+
+# ---------------------------
+# Shared mode: one store served over a local socket to many processes
+# ---------------------------
+_served_store: Optional[ShardedStore] = None
+
+
+def _get_served_store() -> ShardedStore:
+   global _served_store
+   if _served_store is None:
+       _served_store = local_store()
+   return _served_store
+
+
+
+
+def _store_manager() -> type:
+   """
+   The BaseManager subclass serving the store, built on first use because
+   multiprocessing.managers is slow to import and only shared mode needs it.
+   Reachable as api.store.StoreManager, so manager processes can unpickle it.
+   """
+   global StoreManager
+   if "StoreManager" not in globals():
+       from multiprocessing.managers import BaseManager, IteratorProxy
+
+       class StoreManager(BaseManager):
+           pass
+
+       StoreManager.__qualname__ = "StoreManager"
+       # select() is a generator: it comes back as an iterator proxy (one round trip per object)
+       StoreManager.register("Iterator", proxytype=IteratorProxy, create_method=False)
+       StoreManager.register("store", callable=_get_served_store,
+                             exposed=("get", "set", "replace", "pop", "get_many", "select"),
+                             method_to_typeid={"select": "Iterator"})
+   return StoreManager
+
+
+def __getattr__(name: str) -> Any:
+   if name == "StoreManager":
+       return _store_manager()
+   raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+
+
+def serve_store(host: str = "127.0.0.1", port: int = 0):
+   """
+   Start a store server process and export its address/authkey through the
+   environment, so worker processes spawned afterwards (e.g. pytest-xdist)
+   all talk to the same fake backend. Call .shutdown() on the result when done.
+   """
+   authkey = secrets.token_hex(16)
+   manager = _store_manager()(address=(host, port), authkey=authkey.encode())
+   manager.start()
+   os.environ[STORE_ADDRESS_ENV] = "%s:%d" % manager.address
+   os.environ[STORE_AUTHKEY_ENV] = authkey
+   return manager
+
+
+
+
+def default_store():
+   """Proxy to the shared store if one is advertised in the environment, else a local store."""
+   address = os.getenv(STORE_ADDRESS_ENV)
+   if not address:
+       return local_store()
+   host, port = address.rsplit(":", 1)
+   manager = _store_manager()(address=(host, int(port)), authkey=os.environ[STORE_AUTHKEY_ENV].encode())
+   manager.connect()
+   return manager.store()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+try:  # no cross-process guard where flock doesn't exist
+   import fcntl
+except ImportError:
+   fcntl = None
+
+
+
+
+# ---------------------------
+# Cleanup of the objects a live run created and didn't delete (a scenario
+# failing midway leaves its object behind). ObjectApi keeps the registry;
+# the session-scoped `api` fixture calls ObjectApi.delete_leftovers() at the end.
+# ---------------------------
+LEFTOVERS_ENV = "API_LEFTOVERS_FILE"
+
+DEFAULT_TEARDOWN_CONCURRENCY = 10  # one per pooled connection of a default ObjectApi
+DEFAULT_TEARDOWN_ROUNDS = 3
+DEFAULT_ROUND_DELAY = 1.0
+
+
+
+
+class CreatedObjects:
+   """Ids a client created (POST 200) and hasn't deleted yet (DELETE 200 or 404); thread-safe, in creation order."""
+
+
+   def __init__(self) -> None:
+       self._ids: Dict[str, None] = {}
+       self._lock = threading.Lock()
+
+
+   def add(self, object_id: str) -> None:
+       with self._lock:
+           self._ids[object_id] = None
+
+
+   def discard(self, object_id: str) -> None:
+       with self._lock:
+           self._ids.pop(object_id, None)
+
+
+   def ids(self) -> List[str]:
+       with self._lock:
+           return list(self._ids)
+
+
+   def __contains__(self, object_id: str) -> bool:
+       return object_id in self._ids
+
+
+   def __len__(self) -> int:
+       return len(self._ids)
+
+
+
+
+class LeftoverFile:
+   """
+   Ids a run couldn't delete, per base URL, in a JSON file, so the next run
+   deletes them. Every read-modify-write holds an exclusive flock, so xdist
+   workers tearing down at the same time never claim the same ids.
+   """
+
+
+   def __init__(self, path: str) -> None:
+       self.path = path
+
+
+   def _update(self, change: Callable[[Dict[str, List[str]]], Any]) -> Any:
+       os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+       with open(self.path, "a+", encoding="utf-8") as f:
+           if fcntl is not None:
+               fcntl.flock(f, fcntl.LOCK_EX)
+           f.seek(0)
+           try:
+               data = json.loads(f.read() or "{}")
+           except ValueError:  # a damaged file is started over rather than failing the run
+               data = {}
+           result = change(data)
+           f.seek(0)
+           f.truncate()
+           json.dump(data, f, indent=1)
+       return result
+
+
+   def take(self, base_url: str) -> List[str]:
+       """Claim (and remove) the ids left for base_url."""
+       return self._update(lambda data: data.pop(base_url, []))
+
+
+   def put(self, base_url: str, object_ids: List[str]) -> None:
+       if object_ids:
+           self._update(lambda data: data.setdefault(base_url, []).extend(object_ids))
+
+
+
+
+def delete_objects(
+   api,
+   object_ids: Iterable[str],
+   concurrency: int = DEFAULT_TEARDOWN_CONCURRENCY,
+   rounds: int = DEFAULT_TEARDOWN_ROUNDS,
+   round_delay: float = DEFAULT_ROUND_DELAY,
+) -> Dict[str, Any]:
+   """
+   DELETE every id on at most `concurrency` threads; 200 and 404 (already
+   gone) both count as done. Each call has the client's own retries; ids
+   that still fail (an error status or an exception, e.g. an open circuit)
+   get up to `rounds` passes in all, `round_delay` seconds apart.
+   Returns {"objects", "deleted", "already_gone", "failed": [ids], "seconds"}.
+   """
+   start = time.perf_counter()
+   pending = list(dict.fromkeys(object_ids))
+   summary: Dict[str, Any] = {"objects": len(pending), "deleted": 0, "already_gone": 0}
+
+   def attempt(object_id: str) -> Optional[int]:
+       try:
+           return api.delete(object_id).status_code
+       except Exception:
+           return None
+
+   if pending:
+       with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="object-teardown") as pool:
+           for n in range(rounds):
+               if n:
+                   time.sleep(round_delay)
+               failed = []
+               for object_id, status in zip(pending, pool.map(attempt, pending)):
+                   if status == 200:
+                       summary["deleted"] += 1
+                   elif status == 404:
+                       summary["already_gone"] += 1
+                   else:
+                       failed.append(object_id)
+               pending = failed
+               if not pending:
+                   break
+   summary["failed"] = pending
+   summary["seconds"] = round(time.perf_counter() - start, 3)
+   return summary
+
+
+
+
+def reclaim_leftovers(api, leftovers_file: Optional[str] = None, **options: Any) -> Dict[str, Any]:
+   """
+   Delete what `api` created and didn't delete, plus the ids earlier runs
+   left in leftovers_file for the same base URL; whatever still can't be
+   deleted is written back there. No file: nothing is carried between runs.
+   """
+   leftovers = LeftoverFile(leftovers_file) if leftovers_file else None
+   claimed = leftovers.take(api.base_url) if leftovers is not None else []
+   summary = delete_objects(api, claimed + api.created.ids(), **options)
+   summary["reclaimed"] = len(claimed)
+   if leftovers is not None:
+       leftovers.put(api.base_url, summary["failed"])
+   return summary
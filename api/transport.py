@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+
+import time
+from typing import Any
+
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+from api.metrics import add_connect_time
+
+
+
+
+# ---------------------------
+# Connect-time instrumentation for the live session. Only build_session
+# imports this module, so fake-mode runs never load requests/urllib3.
+# ---------------------------
+class _TimedConnect:
+   def connect(self) -> None:
+       start = time.perf_counter()
+       try:
+           super().connect()
+       finally:
+           add_connect_time(time.perf_counter() - start)
+
+
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+   pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+   pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+   ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+   ConnectionCls = _TimedHTTPSConnection
+
+
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+   """HTTPAdapter whose connections report how long TCP/TLS setup took."""
+
+
+   def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+       super().init_poolmanager(*args, **kwargs)
+       self.poolmanager.pool_classes_by_scheme = {
+           "http": _TimedHTTPConnectionPool,
+           "https": _TimedHTTPSConnectionPool,
+       }
@@ -0,0 +1,59 @@
+"""
+Serial ObjectApi lifecycles vs AsyncObjectApi fan-out against a server with
+fixed per-request latency. With fan-out the wall time should approach
+objects * 5 calls * latency / concurrency.
+
+    python -m benchmarks.bench_async_fanout [objects] [concurrency] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+from api.async_client import AsyncObjectApi, run_lifecycles
+from api.client import ObjectApi
+from api.server import standin_process
+
+
+def _serial(base_url, payloads):
+    with ObjectApi(base_url) as api:
+        for payload in payloads:
+            object_id = api.post(payload).json()["id"]
+            api.get(object_id)
+            api.put(object_id, payload)
+            api.delete(object_id)
+            api.get(object_id)
+
+
+async def _fanout(base_url, payloads, concurrency):
+    async with AsyncObjectApi(base_url, concurrency=concurrency) as api:
+        await run_lifecycles(api, payloads)
+
+
+def main(objects=200, concurrency=50, latency_ms=5.0):
+    os.environ["LIVE_API"] = "1"
+    payloads = [{"name": f"bench {i}"} for i in range(objects)]
+
+    with standin_process("--latency", f"fixed:{latency_ms}") as base_url:
+        start = time.perf_counter()
+        _serial(base_url, payloads)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run(_fanout(base_url, payloads, concurrency))
+        fanout = time.perf_counter() - start
+
+    ideal = objects * 5 * latency_ms / 1000 / concurrency
+    print(f"{objects} lifecycles, {latency_ms} ms server latency")
+    print(f"serial                 {serial:8.3f} s   ({objects * 5 / serial:8.1f} req/s)")
+    print(f"fan-out (x{concurrency:<3})          {fanout:8.3f} s   ({objects * 5 / fanout:8.1f} req/s)")
+    print(f"latency-bound floor    {ideal:8.3f} s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 200,
+        int(args[1]) if len(args) > 1 else 50,
+        float(args[2]) if len(args) > 2 else 5.0,
+    )
@@ -0,0 +1,40 @@
+"""
+Seeding N objects against the local stand-in (with per-request latency):
+a Python loop of ObjectApi.post vs ObjectApi.bulk_create.
+
+    python -m benchmarks.bench_bulk [objects] [concurrency] [latency_ms]
+"""
+import sys
+import time
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import standin_process
+
+
+def main(objects=2000, concurrency=32, latency_ms=2.0):
+    payloads = [{"name": f"bulk {i}", "data": {"price": i}} for i in range(objects)]
+    with standin_process("--latency", f"fixed:{latency_ms}") as base_url:
+        with ObjectApi(base_url, pool_size=concurrency, recorder=LatencyRecorder(), live=True) as api:
+            start = time.perf_counter()
+            for payload in payloads:
+                api.post(payload)
+            loop = time.perf_counter() - start
+
+            start = time.perf_counter()
+            count = sum(1 for _ in api.bulk_create(payloads, concurrency=concurrency))
+            bulk = time.perf_counter() - start
+
+    assert count == objects
+    print(f"{objects} creates, {latency_ms} ms server latency")
+    print(f"loop of post()          {loop:8.3f} s   ({objects / loop:8.1f} obj/s)")
+    print(f"bulk_create (x{concurrency:<3})     {bulk:8.3f} s   ({objects / bulk:8.1f} obj/s)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 2000,
+        int(args[1]) if len(args) > 1 else 32,
+        float(args[2]) if len(args) > 2 else 2.0,
+    )
@@ -0,0 +1,63 @@
+"""
+Record/replay cassettes (api/cassette.py):
+- lookup: microseconds per Cassette.play() in a cassette of N recorded calls
+- throughput: GETs per second through ObjectApi live (stand-in server),
+  replaying from the cassette, and on the in-memory fake
+
+    python -m benchmarks.bench_cassette [calls]     (default: 2000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from api.cassette import Cassette
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.response import ApiResponse
+from api.server import StandinServer
+
+LOOKUP_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def lookup_us(folder, size):
+    path = os.path.join(folder, f"lookup-{size}.cassette")
+    response = ApiResponse(200, b'{"id": "1", "name": "x"}', {"Content-Type": "application/json"})
+    with Cassette(path, "record") as cassette:
+        for i in range(size):
+            cassette.record("GET", f"/{i}", None, response)
+    paths = [f"/{i * 7919 % size}" for i in range(20000)]
+    with Cassette(path) as cassette:
+        start = time.perf_counter()
+        for p in paths:
+            cassette.play("GET", p)
+        return (time.perf_counter() - start) / len(paths) * 1e6
+
+
+def calls_per_second(api, ids):
+    start = time.perf_counter()
+    for object_id in ids:
+        api.get(object_id)
+    return len(ids) / (time.perf_counter() - start)
+
+
+def main(calls=2000):
+    with tempfile.TemporaryDirectory() as folder:
+        for size in LOOKUP_SIZES:
+            print(f"lookup in {size:>9} calls: {lookup_us(folder, size):6.2f} us")
+
+        path = os.path.join(folder, "gets.cassette")
+        ids = [str(1 + i % 13) for i in range(calls)]
+        with StandinServer() as server:
+            with ObjectApi(server.base_url, recorder=LatencyRecorder(), live=True, cassette=Cassette(path, "record")) as api:
+                live = calls_per_second(api, ids)
+        with ObjectApi(None, recorder=LatencyRecorder(), cassette=Cassette(path)) as api:
+            replay = calls_per_second(api, ids)
+        fake = calls_per_second(ObjectApi(None, recorder=LatencyRecorder(), live=False), ids)
+    print(f"{'live (stand-in)':<16} {live:>10.0f} calls/s")
+    print(f"{'replay':<16} {replay:>10.0f} calls/s  ({replay / live:.0f}x live)")
+    print(f"{'fake':<16} {fake:>10.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else 2000)
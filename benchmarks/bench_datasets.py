@@ -0,0 +1,78 @@
+"""
+Peak memory of reading a large data file: json.load of the whole array vs
+iter_records streaming it, and of the whole data-driven scenario (pytest run
+of the feature, results recorded and streamed into the report) over the file.
+Each case runs in a fresh subprocess so ru_maxrss is not polluted by the other.
+
+    python -m benchmarks.bench_datasets [records ...]     (default: 100000 1000000)
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.datasets import iter_records
+
+
+def _write(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(n):
+            obj = {"id": str(i), "name": f"Object {i}", "data": {"year": 2024, "price": i * 1.25, "color": "Cloudy White"}}
+            f.write(("  " if i == 0 else ", ") + json.dumps(obj) + "\n")
+        f.write("]\n")
+
+
+def _scenario(path):
+    """The data-driven scenario over path in a pytest subprocess (fake mode, report in a temp folder)."""
+    with tempfile.TemporaryDirectory() as report_dir:
+        env = {k: v for k, v in os.environ.items() if k not in ("LIVE_API", "STANDIN_API", "BASE_URL")}
+        env.update(DATA_FILES=path, REPORT_DIR=report_dir)
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-k", "every_record",
+             "tests/steps/test_object_lifecycle.py"],
+            env=env, capture_output=True, check=True,
+        )
+    return sum(1 for _ in iter_records(path))
+
+
+def _child(impl, path):
+    start = time.perf_counter()
+    if impl == "scenario":
+        count = _scenario(path)
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"{count} {elapsed:.3f} {peak_mb:.1f}")
+        return
+    if impl == "json.load":
+        with open(path, encoding="utf-8") as f:
+            count = sum(1 for _ in json.load(f))
+    else:
+        count = sum(1 for _ in iter_records(path))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{count} {elapsed:.3f} {peak_mb:.1f}")
+
+
+def main(sizes):
+    print(f"{'records':>9} {'impl':>13} {'time s':>8} {'peak RSS MB':>12}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "objects.json")
+            _write(path, n)
+            for impl in ("json.load", "iter_records", "scenario"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_datasets", "--child", impl, path],
+                    capture_output=True, text=True, check=True,
+                ).stdout.split()
+                print(f"{n:>9} {impl:>13} {float(out[-2]):>8.3f} {float(out[-1]):>12.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(a) for a in sys.argv[1:]] or [100000, 1000000])
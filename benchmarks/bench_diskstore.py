@@ -0,0 +1,112 @@
+"""
+The disk-backed fake store (FAKE_STORE_PATH) vs the in-memory ShardedStore:
+preload rate, time to open an existing store (from its snapshot, and by
+replaying the whole log when there is none), memory held after opening (Linux),
+random gets and the post/get/put/delete lifecycle through FakeObjectApi.
+
+    python -m benchmarks.bench_diskstore [objects]     (default: 1000000)
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from api.client import FakeObjectApi
+from api.diskstore import INDEX_SUFFIX, DiskStore
+from api.store import ShardedStore
+
+COLORS = ("Red", "Blue", "Purple", "Cloudy White", "Brown")
+
+# measured in a fresh interpreter, so the RSS is only what opening the store costs
+_OPEN = """
+import sys, time
+from api.diskstore import DiskStore
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+before = rss_kb()
+start = time.perf_counter()
+store = DiskStore(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(elapsed, len(store), (rss_kb() - before) / 1024)
+"""
+
+
+def _objects(n):
+    rng = random.Random(1)
+    for i in range(n):
+        object_id = f"{i:032x}"
+        yield object_id, {
+            "id": object_id,
+            "name": f"Device {i % 1000}",
+            "data": {"price": round(rng.uniform(0, 10_000), 2), "color": rng.choice(COLORS), "year": 2000 + i % 25},
+        }
+
+
+def _open(path):
+    root = os.path.join(os.path.dirname(__file__), "..")
+    out = subprocess.run([sys.executable, "-c", _OPEN, path], cwd=root, capture_output=True, text=True, check=True)
+    elapsed, count, rss_mb = out.stdout.split()
+    return float(elapsed) * 1000, int(count), float(rss_mb)
+
+
+def _gets_per_s(store, n, lookups=100_000):
+    rng = random.Random(2)
+    ids = [f"{rng.randrange(n):032x}" for _ in range(lookups)]
+    start = time.perf_counter()
+    for object_id in ids:
+        store.get(object_id)
+    return lookups / (time.perf_counter() - start)
+
+
+def _lifecycles_per_s(store, rounds=20_000):
+    fake = FakeObjectApi(store)
+    start = time.perf_counter()
+    for i in range(rounds):
+        object_id = fake.post({"name": f"obj {i}", "data": {"price": i}}).json()["id"]
+        fake.get(object_id)
+        fake.put(object_id, {"name": "updated"})
+        fake.delete(object_id)
+    return rounds * 4 / (time.perf_counter() - start)
+
+
+def main(n):
+    folder = tempfile.mkdtemp(prefix="bench-diskstore-")
+    path = os.path.join(folder, "objects.log")
+
+    start = time.perf_counter()
+    memory = ShardedStore()
+    for object_id, obj in _objects(n):
+        memory.set(object_id, obj)
+    print(f"ShardedStore: {n} objects loaded in {time.perf_counter() - start:.1f} s, "
+          f"process max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    print(f"  random get {_gets_per_s(memory, n):,.0f}/s, lifecycle {_lifecycles_per_s(memory):,.0f} ops/s")
+    del memory
+
+    start = time.perf_counter()
+    with DiskStore(path) as store:
+        store.set_many(_objects(n))
+    load = time.perf_counter() - start
+    print(f"DiskStore: {n} objects preloaded in {load:.1f} s ({n / load:,.0f}/s), "
+          f"log {os.path.getsize(path) / 2**20:.0f} MB, snapshot {os.path.getsize(path + INDEX_SUFFIX) / 2**20:.0f} MB")
+
+    ms, count, rss = _open(path)
+    print(f"  open from snapshot: {ms:8.1f} ms, {count} objects, +{rss:.0f} MB RSS")
+    with DiskStore(path) as store:
+        print(f"  random get {_gets_per_s(store, n):,.0f}/s, lifecycle {_lifecycles_per_s(store):,.0f} ops/s")
+        print(f"  {store.stats()}")
+
+    os.unlink(path + INDEX_SUFFIX)
+    ms, count, rss = _open(path)  # replays the log and writes a new snapshot
+    print(f"  open without snapshot (full replay): {ms:8.1f} ms, {count} objects, +{rss:.0f} MB RSS")
+
+    for name in os.listdir(folder):
+        os.unlink(os.path.join(folder, name))
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,53 @@
+"""
+Export and aggregation cost for large runs: JSONL vs the columnar format.
+Writes N synthetic assertions with each exporter, then times summarize()
+over the file (what CI runs to get pass rates per scenario/action/status).
+
+    python -m benchmarks.bench_exporters [rows ...]     (default: 100000 1000000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from utils.exporters import ColumnarExporter, JsonlExporter, summarize
+from utils.results import ResultRecord
+
+_SCENARIOS = [f"Scenario {i}" for i in range(20)]
+_ACTIONS = ("POST request to create the object", "GET request using the stored object id",
+            "PUT request to update the object", "DELETE request using the stored object id")
+
+
+def _records(n):
+    payload = {"name": "Test Object", "data": {"year": 2024, "price": 1000}}
+    for i in range(n):
+        yield ResultRecord(_SCENARIOS[i % 20], _ACTIONS[i % 4], "Status code is 200", i % 31 != 0,
+                           payload=payload, response={"id": str(i), **payload})
+
+
+def bench(exporter_cls, n, folder):
+    exporter = exporter_cls(folder)
+    start = time.perf_counter()
+    for r in _records(n):
+        exporter.add(r)
+    path = exporter.close(os.path.join(folder, "bench"))
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = summarize([path])
+    summarize_s = time.perf_counter() - start
+    assert sum(summary["by_status"].values()) == n
+    return write_s, summarize_s, os.path.getsize(path) / 1e6
+
+
+def main(sizes):
+    print(f"{'rows':>9} {'format':>9} {'write s':>9} {'summarize s':>12} {'size MB':>9}")
+    for n in sizes:
+        for exporter_cls in (JsonlExporter, ColumnarExporter):
+            with tempfile.TemporaryDirectory() as folder:
+                write_s, summarize_s, size_mb = bench(exporter_cls, n, folder)
+            print(f"{n:>9} {exporter_cls.suffix:>9} {write_s:>9.2f} {summarize_s:>12.3f} {size_mb:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100000, 1000000])
@@ -0,0 +1,88 @@
+"""
+Peak RSS and wall time of report generation: the old build-one-string
+approach vs StreamingReportWriter. Each case runs in a fresh subprocess so
+ru_maxrss is not polluted by earlier cases.
+
+    python -m benchmarks.bench_html_report [rows ...]     (default: 1000 100000;
+                                                            add 1000000 for the large case)
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils import html_report
+from utils.results import ResultRecord
+
+
+def _rows(n):
+    scenarios = ("Create", "Retrieve", "Update", "Delete")
+    for i in range(n):
+        yield ResultRecord(
+            scenarios[i % len(scenarios)],
+            "GET request using the stored object id",
+            "Status code is 200",
+            i % 17 != 0,
+            payload={"name": f"Object {i}", "data": {"year": 2024, "price": i}},
+            response={"id": str(i), "name": f"Object {i}", "data": {"year": 2024, "price": i}},
+        )
+
+
+def eager_cell(data):
+    """Cell as the report used to render it: the whole body, pretty-printed inline."""
+    return f"<pre>{html_report.pretty_format(data) if data else 'N/A'}</pre>"
+
+
+def _string_report(results, folder):
+    """The previous implementation: collect everything, concatenate, write once."""
+    grouped = {}
+    for r in results:
+        grouped.setdefault(r.scenario, []).append(r)
+    html = html_report._report_head()
+    for scenario, rows in grouped.items():
+        html += html_report._scenario_head(scenario, len(rows), sum(1 for r in rows if r.passed))
+        for r in rows:
+            html += html_report._result_row(r, eager_cell(r.payload), eager_cell(r.response))
+        html += html_report._SCENARIO_FOOT
+    html += html_report._REPORT_FOOT
+    with open(os.path.join(folder, "string.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def _streaming_report(results, folder):
+    writer = html_report.StreamingReportWriter(folder, open_browser=False)
+    for r in results:
+        writer.add(r)
+    writer.close()
+
+
+def _child(impl, n):
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        if impl == "string":
+            _string_report(list(_rows(n)), folder)
+        else:
+            _streaming_report(_rows(n), folder)
+        elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.3f} {peak_mb:.1f}")
+
+
+def main(sizes):
+    print(f"{'rows':>9} {'impl':>10} {'time s':>9} {'peak RSS MB':>12}")
+    for n in sizes:
+        for impl in ("string", "streaming"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_html_report", "--child", impl, str(n)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            print(f"{n:>9} {impl:>10} {float(out[-2]):>9.3f} {float(out[-1]):>12.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(a) for a in sys.argv[1:]] or [1000, 100000])
@@ -0,0 +1,28 @@
+"""
+Open-loop load against the local stand-in server at increasing target rates,
+to show achieved throughput and tail latency as the offered load grows.
+
+    python -m benchmarks.bench_loadgen [duration_s] [rps ...]
+"""
+import sys
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import standin_process
+from utils.loadgen import run_load
+
+
+def main(duration=3.0, rates=(100, 300, 1000)):
+    print(f"{'target rps':>10} {'achieved':>10} {'errors':>8} {'GET p50 ms':>11} {'GET p99 ms':>11}")
+    with standin_process("--latency", "fixed:2") as base_url:
+        for rps in rates:
+            with ObjectApi(base_url, pool_size=64, retries=0, recorder=LatencyRecorder(), live=True) as api:
+                summary = run_load(api, rps=rps, duration=duration, max_in_flight=64)
+            errors = sum(v["count"] for cls, v in summary["status_classes"].items() if cls in ("5xx", "error"))
+            get = summary["latency"]["GET"]
+            print(f"{rps:>10} {summary['throughput_rps']:>10} {errors:>8} {get['p50_ms']:>11} {get['p99_ms']:>11}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(float(args[0]) if args else 3.0, [int(a) for a in args[1:]] or (100, 300, 1000))
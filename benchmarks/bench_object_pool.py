@@ -0,0 +1,59 @@
+"""
+Read-only scenarios against the local stand-in (with per-request latency):
+each POSTing and DELETEing its own object vs borrowing one from the
+session's ObjectPool. Reports requests sent and suite time, provisioning
+and bulk cleanup included.
+
+    python -m benchmarks.bench_object_pool [scenarios] [pool_size] [latency_ms]
+"""
+import sys
+import time
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import standin_process
+from utils.object_pool import ObjectPool
+
+PAYLOAD = {"name": "Read-only object", "data": {"year": 2024, "price": 1000}}
+
+
+def _requests(recorder):
+    return {verb: phases["total"]["count"] for verb, phases in recorder.summary()["by_verb"].items()}
+
+
+def _own_objects(api, scenarios):
+    for _ in range(scenarios):
+        object_id = api.post(PAYLOAD).json()["id"]
+        assert api.get(object_id).json()["name"] == PAYLOAD["name"]
+        api.delete(object_id)
+
+
+def _pooled(api, scenarios, pool_size):
+    with ObjectPool(api, iter([PAYLOAD]), size=pool_size) as pool:
+        for _ in range(scenarios):
+            obj = pool.checkout()
+            assert api.get(obj["id"]).json()["name"] == obj["name"]
+            pool.checkin(obj)
+
+
+def main(scenarios=500, pool_size=10, latency_ms=2.0):
+    print(f"{scenarios} read-only scenarios, {latency_ms} ms server latency")
+    with standin_process("--latency", f"fixed:{latency_ms}") as base_url:
+        for label, run in (("own object per scenario", lambda api: _own_objects(api, scenarios)),
+                           (f"object pool ({pool_size})", lambda api: _pooled(api, scenarios, pool_size))):
+            recorder = LatencyRecorder()
+            with ObjectApi(base_url, recorder=recorder, live=True) as api:
+                start = time.perf_counter()
+                run(api)
+                elapsed = time.perf_counter() - start
+            requests = _requests(recorder)
+            print(f"{label:<24} {elapsed:7.3f} s  {sum(requests.values()):6} requests  {requests}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 500,
+        int(args[1]) if len(args) > 1 else 10,
+        float(args[2]) if len(args) > 2 else 2.0,
+    )
@@ -0,0 +1,63 @@
+"""
+Filter queries on the fake store as it grows: ShardedStore.select() using
+its secondary indexes vs a full scan with the same predicate. Each query
+matches ~10 objects at every size, so indexed time should stay about flat
+while the scan grows linearly.
+
+    python -m benchmarks.bench_queries [sizes ...]     (default: 10000 100000 1000000)
+"""
+import random
+import sys
+import time
+
+from api.indexes import matches, parse_conditions
+from api.store import ShardedStore
+
+COLORS = ("Red", "Blue", "Purple", "Cloudy White", "Brown")
+
+
+def build(n, rng):
+    store = ShardedStore()
+    list(store.select({"name": None}))  # indexes are built by the first query; time indexed inserts
+    start = time.perf_counter()
+    for i in range(n):
+        object_id = str(i)
+        store.set(object_id, {
+            "id": object_id,
+            "name": f"Device {i % (n // 10)}",
+            "data": {"price": round(rng.uniform(0, 10_000), 2), "color": rng.choice(COLORS)},
+        })
+    return store, (time.perf_counter() - start) / n * 1e6
+
+
+def _scan(store, conditions):
+    parsed = parse_conditions(conditions)
+    return [obj for _, objects, _ in store._shards for obj in list(objects.values()) if matches(obj, parsed)]
+
+
+def _ms(query, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        found = query()
+    return (time.perf_counter() - start) / repeat * 1000, len(found)
+
+
+def main(sizes):
+    rng = random.Random(1)
+    print(f"{'objects':>9} {'insert us':>9} {'query':<26} {'matches':>7} {'indexed ms':>11} {'scan ms':>9}")
+    for n in sizes:
+        store, insert_us = build(n, rng)
+        queries = {
+            "name == Device 42": {"name": "Device 42"},
+            "price < ~10 matches": {"price__lt": 10_000 * 10 / n},
+            "Red and price in band": {"color": "Red", "price__gte": 5000, "price__lt": 5000 + 10_000 * 50 / n},
+        }
+        for label, conditions in queries.items():
+            indexed, found = _ms(lambda: list(store.select(conditions)), 20)
+            scan, _ = _ms(lambda: _scan(store, conditions), 1)
+            print(f"{n:>9} {insert_us:>9.1f} {label:<26} {found:>7} {indexed:>11.3f} {scan:>9.1f}")
+        del store
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
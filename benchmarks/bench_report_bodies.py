@@ -0,0 +1,107 @@
+"""
+Report size and generation time with large JSON bodies: every payload and
+response pretty-printed inline (as before) vs stored once per distinct body,
+capped and compressed, and expanded on click.
+
+Then the writer's peak RSS when every body is distinct, as in the lifecycle
+(each POST/GET response carries its own id), with the digest map bounded
+(REPORT_DEDUP_BODIES, the default) vs unbounded. Bounded, memory stays flat
+however many distinct bodies there are; the trade-off is that a body recurring
+after that many others is stored again. Each case runs in a fresh subprocess.
+
+    python -m benchmarks.bench_report_bodies [rows ...]     (default: 1000 10000)
+    python -m benchmarks.bench_report_bodies --memory [rows ...]     (default: 100000 1000000)
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_html_report import eager_cell
+from utils import html_report
+from utils.results import ResultRecord
+
+# ~20 KB of JSON per response; the lifecycle re-reads the same object, so bodies repeat
+_ITEMS = [{"sku": f"SKU-{i:05d}", "price": i * 1.25, "tags": ["a", "b", "c"], "note": "lorem ipsum " * 8}
+          for i in range(150)]
+
+
+def _rows(n):
+    steps = ("Status code is 200", "Response has an id", "Name matches the payload")
+    for i in range(n):
+        obj = i // 6
+        payload = {"name": f"Object {obj}", "data": {"year": 2024, "items": _ITEMS}}
+        yield ResultRecord(
+            "Lifecycle", "GET request using the stored object id", steps[i % len(steps)], i % 23 != 0,
+            payload=payload, response={"id": str(obj), **payload},
+        )
+
+
+class _EagerWriter(html_report.StreamingReportWriter):
+    def _cell(self, data):
+        return eager_cell(data)
+
+
+def _run(writer_cls, n):
+    with tempfile.TemporaryDirectory() as folder:
+        writer = writer_cls(folder, open_browser=False)
+        start = time.perf_counter()
+        for r in _rows(n):
+            writer.add(r)
+        output_file = writer.close()
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(output_file) / 1e6
+    return elapsed, size_mb
+
+
+def _unique_rows(n):
+    for i in range(n):
+        payload = {"name": f"Object {i}", "data": {"year": 2024, "price": i * 1.25, "color": "Cloudy White"}}
+        yield ResultRecord("Lifecycle", "POST request", "Status code is 200", True,
+                           payload=payload, response={"id": f"{i:032x}", **payload})
+
+
+def _memory_child(bound, n):
+    max_dedup_bodies = html_report.MAX_DEDUP_BODIES if bound == "bounded" else n * 2
+    with tempfile.TemporaryDirectory() as folder:
+        # rendered inline: a generator outruns the background renderer, and its queue would dominate
+        writer = html_report.StreamingReportWriter(folder, open_browser=False, background=False,
+                                                   max_dedup_bodies=max_dedup_bodies)
+        start = time.perf_counter()
+        for r in _unique_rows(n):
+            writer.add(r)
+        output_file = writer.close()
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(output_file) / 1e6
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.3f} {size_mb:.2f} {peak_mb:.1f}")
+
+
+def memory(sizes):
+    print(f"{'rows':>9} {'digests':>10} {'time s':>8} {'size MB':>9} {'peak RSS MB':>12}")
+    for n in sizes:
+        for bound in ("unbounded", "bounded"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_report_bodies", "--child", bound, str(n)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            print(f"{n:>9} {bound:>10} {float(out[-3]):>8.3f} {float(out[-2]):>9.2f} {float(out[-1]):>12.1f}")
+
+
+def main(sizes):
+    print(f"{'rows':>7} {'impl':>8} {'time s':>8} {'size MB':>9}")
+    for n in sizes:
+        for name, writer_cls in (("inline", _EagerWriter), ("lazy", html_report.StreamingReportWriter)):
+            elapsed, size_mb = _run(writer_cls, n)
+            print(f"{n:>7} {name:>8} {elapsed:>8.3f} {size_mb:>9.2f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _memory_child(sys.argv[2], int(sys.argv[3]))
+    elif sys.argv[1:2] == ["--memory"]:
+        memory([int(a) for a in sys.argv[2:]] or [100000, 1000000])
+    else:
+        main([int(a) for a in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,59 @@
+"""
+Cost of picking the next report number as the archive grows: listing the
+folder (get_next_filename) vs one INSERT into the run-history index, plus
+the time of a pass-rate/latency trend query over the last 500 runs.
+
+    python -m benchmarks.bench_report_numbering [archive sizes ...]   (default: 1000 10000 50000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from api.metrics import LatencyRecorder
+from utils.history import HISTORY_FILE, RunHistory
+from utils.html_report import get_next_filename
+
+SCENARIO = "Successfully create, retrieve, update and delete an object"
+REPEAT = 200
+
+
+def _per_call_ms(fn, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(archive_size):
+    with tempfile.TemporaryDirectory() as folder:
+        for i in range(1, archive_size + 1):
+            open(os.path.join(folder, f"result{i}.html"), "w").close()
+
+        history = RunHistory(os.path.join(folder, HISTORY_FILE), existing_runs=lambda: archive_size)
+        try:
+            listing_ms = _per_call_ms(lambda: get_next_filename(folder), repeat=20)
+            allocate_ms = _per_call_ms(history.allocate_run)
+
+            latency = LatencyRecorder()
+            for verb, seconds in (("POST", 0.012), ("GET", 0.008), ("PUT", 0.011), ("DELETE", 0.009)):
+                for k in range(50):
+                    latency.record(verb, seconds * (1 + k / 50), scenario=SCENARIO)
+            for _ in range(500):
+                history.finish_run(history.allocate_run(), "resultN.html", {SCENARIO: (6, 6)}, latency)
+            trend_ms = _per_call_ms(lambda: history.scenario_trend(SCENARIO, last=500), repeat=5)
+        finally:
+            history.close()
+
+    print(f"{archive_size:>8} reports   listdir {listing_ms:8.3f} ms   allocate_run {allocate_ms:7.3f} ms"
+          f"   trend(500 runs) {trend_ms:7.2f} ms")
+
+
+def main(argv=None):
+    sizes = [int(a) for a in (argv if argv is not None else sys.argv[1:])] or [1000, 10000, 50000]
+    for size in sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
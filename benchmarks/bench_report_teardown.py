@@ -0,0 +1,39 @@
+"""
+Where report generation lands in a run: rendering inline in add() (on the
+tests' critical path) vs the background renderer, which overlaps with the
+tests' own I/O waits and leaves close() a quick flush and rename.
+Each simulated test waits `io_ms` (an API call) and then records one result.
+
+    python -m benchmarks.bench_report_teardown [results] [io_ms]     (default: 20000 0.2)
+"""
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_html_report import _rows
+from utils.html_report import StreamingReportWriter
+
+
+def run(background, n, io_ms):
+    with tempfile.TemporaryDirectory() as folder:
+        writer = StreamingReportWriter(folder, open_browser=False, background=background)
+        start = time.perf_counter()
+        for r in _rows(n):
+            time.sleep(io_ms / 1000)
+            writer.add(r)
+        tests = time.perf_counter() - start
+        writer.close()
+        total = time.perf_counter() - start
+    return tests, writer.close_seconds, total
+
+
+def main(n=20000, io_ms=0.2):
+    print(f"{n} results, {io_ms} ms of I/O per test")
+    print(f"{'renderer':>10} {'tests s':>9} {'close ms':>9} {'total s':>8}")
+    for background in (False, True):
+        tests, close, total = run(background, n, io_ms)
+        print(f"{'background' if background else 'inline':>10} {tests:>9.3f} {close * 1000:>9.1f} {total:>8.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else 20000, float(sys.argv[2]) if sys.argv[2:] else 0.2)
@@ -0,0 +1,54 @@
+"""
+The live path's resilience layer against the stand-in server in its own process:
+- healthy:   GETs per second with the layer on (unlimited rate, breaker closed)
+- flaky:     20% injected 503s; share of GETs that still end in 200 thanks to retries
+- outage:    every call fails; mean time per call until the run gives up,
+             with the circuit breaker vs without one (threshold never reached)
+
+    python -m benchmarks.bench_resilience [calls]     (default: 300)
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.resilience import CircuitBreaker
+from api.server import standin_process
+
+THREADS = 8
+
+
+def run(base_url, calls, **options):
+    """(calls per second, share of 200s) for `calls` GETs on THREADS threads."""
+    def get(i):
+        try:
+            return api.get(str(1 + i % 13)).status_code
+        except ConnectionError:
+            return None
+
+    with ObjectApi(base_url, pool_size=THREADS, recorder=LatencyRecorder(), live=True, **options) as api:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            statuses = list(pool.map(get, range(calls)))
+        elapsed = time.perf_counter() - start
+    return calls / elapsed, statuses.count(200) / calls
+
+
+def main(calls=300):
+    with standin_process("--latency", "fixed:2") as base_url:
+        rate, _ = run(base_url, calls)
+        print(f"{'healthy':<22} {rate:>8.0f} calls/s")
+    with standin_process("--latency", "fixed:2", "--error-rate", "0.2") as base_url:
+        rate, ok = run(base_url, calls, retries=3, backoff_factor=0.05)
+        print(f"{'flaky (20% 503)':<22} {rate:>8.0f} calls/s  {ok:6.1%} ok with retries")
+        _, ok = run(base_url, calls, retries=0)
+        print(f"{'':<22} {'':>15}  {ok:6.1%} ok without")
+    with standin_process("--latency", "fixed:2", "--error-rate", "1") as base_url:
+        for label, breaker in (("outage, breaker", None), ("outage, no breaker", CircuitBreaker(failure_threshold=10 ** 9))):
+            rate, _ = run(base_url, calls, retries=3, backoff_factor=0.05, breaker=breaker)
+            print(f"{label:<22} {1000 / rate:>8.2f} ms per call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else 300)
@@ -0,0 +1,56 @@
+"""
+Cost of reading a response body from several assertion steps: calling
+requests.Response.json() each time (decodes every call) vs ApiResponse,
+which decodes once and caches.
+
+    python -m benchmarks.bench_response_parse [body KB ...]     (default: 1 100 1000)
+"""
+import datetime
+import json
+import sys
+import time
+
+import requests
+
+from api.response import ApiResponse
+
+READS_PER_RESPONSE = 6  # Then steps that look at the same response in the lifecycle
+
+
+def _requests_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    response.elapsed = datetime.timedelta(milliseconds=1)
+    return response
+
+
+def _body(kb):
+    item = {"sku": "SKU-00001", "price": 12.5, "tags": ["a", "b", "c"], "note": "lorem ipsum dolor"}
+    n = max(1, kb * 1024 // len(json.dumps(item)))
+    return json.dumps({"id": "1", "name": "Large object", "data": {"items": [item] * n}}).encode()
+
+
+def _per_response_ms(make, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = make(body)
+        for _ in range(READS_PER_RESPONSE):
+            response.json()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(sizes):
+    print(f"{'body KB':>8} {'requests ms':>12} {'ApiResponse ms':>15} {'speedup':>8}")
+    for kb in sizes:
+        body = _body(kb)
+        repeat = max(5, 20000 // kb)
+        before = _per_response_ms(_requests_response, body, repeat)
+        after = _per_response_ms(lambda b: ApiResponse.from_requests(_requests_response(b)), body, repeat)
+        print(f"{kb:>8} {before:>12.3f} {after:>15.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1, 100, 1000])
@@ -0,0 +1,60 @@
+"""
+Bytes per recorded assertion: the old per-step dict (with an eagerly
+formatted timestamp) vs ResultRecord. Payload/response objects are shared
+references in both cases, so only the record overhead is measured.
+
+    python -m benchmarks.bench_result_memory [records]
+"""
+import sys
+import tracemalloc
+from datetime import datetime
+
+from utils.results import ResultRecord
+
+PAYLOAD = {"name": "Test Object", "data": {"year": 2024, "price": 1000}}
+RESPONSE = {"id": "abc", **PAYLOAD}
+
+
+def _as_dict(i):
+    return {
+        "scenario": "Successfully create, retrieve, update and delete an object",
+        "action": "GET request using the stored object id",
+        "step_description": f"Status code is {200 + i % 2}",
+        "passed": True,
+        "payload": PAYLOAD,
+        "response": RESPONSE,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _as_record(i):
+    return ResultRecord(
+        "Successfully create, retrieve, update and delete an object",
+        "GET request using the stored object id",
+        f"Status code is {200 + i % 2}",
+        True,
+        payload=PAYLOAD,
+        response=RESPONSE,
+    )
+
+
+def _bytes_per_record(make, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [make(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(kept) == n
+    return (after - before) / n
+
+
+def main(n=100000):
+    legacy = _bytes_per_record(_as_dict, n)
+    slotted = _bytes_per_record(_as_record, n)
+    print(f"{n} records")
+    print(f"dict + strftime   {legacy:8.1f} bytes/record")
+    print(f"ResultRecord      {slotted:8.1f} bytes/record   ({legacy / slotted:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,52 @@
+"""
+Per-request latency: module-level requests.* vs the pooled ObjectApi session.
+
+Runs against the local stand-in server (api/server.py), so the number
+reflects connection setup cost rather than the public endpoint.
+
+    python -m benchmarks.bench_session_pool [requests]
+"""
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+from api.client import ObjectApi
+from api.server import StandinServer
+
+
+def _timed(call, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _row(label, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{label:<22} mean {statistics.mean(ms):7.3f} ms   p50 {statistics.median(ms):7.3f} ms   p99 {p99:7.3f} ms")
+
+
+def main(n=500):
+    os.environ["LIVE_API"] = "1"
+
+    with StandinServer() as server:
+        base_url = server.base_url
+        unpooled = _timed(lambda: requests.get(f"{base_url}/1", timeout=15), n)
+        with ObjectApi(base_url) as api:
+            api.get("1")  # warm the pool
+            pooled = _timed(lambda: api.get("1"), n)
+
+    print(f"{n} sequential GETs against {base_url}")
+    _row("requests.get (no pool)", unpooled)
+    _row("ObjectApi (pooled)", pooled)
+    print(f"speedup (mean): {statistics.mean(unpooled) / statistics.mean(pooled):.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,62 @@
+"""
+Harness startup cost for short smoke jobs, measured on `pytest --collect-only`:
+- `-X importtime`: import time of our own modules (api.*, utils.*, the .env
+  loader) and which heavy, live-mode-only modules got imported at all
+- wall time of the collection (median of several runs)
+
+    python -m benchmarks.bench_startup [runs] [pytest args]     (default: 5 tests/steps)
+
+In fake mode none of HEAVY should be imported while collecting tests/steps.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+OURS = ("api", "utils", "dotenv")
+HEAVY = ("requests", "urllib3", "asyncio", "http.server", "multiprocessing.managers", "sqlite3", "webbrowser")
+# -s: pytest would otherwise capture the importtime lines written during collection
+COLLECT = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-s", "-p", "no:cacheprovider"]
+
+
+def import_times(pytest_args):
+    """Top-level module -> cumulative import time in ms, for one fresh interpreter."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *COLLECT[1:], *pytest_args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name[1:].rstrip()] = int(cumulative) / 1000  # keeps the nesting indent
+    return times
+
+
+def collect_seconds(pytest_args, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([*COLLECT, *pytest_args], cwd=ROOT, capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(runs=5, pytest_args=("tests/steps",)):
+    times = import_times(pytest_args)
+    # unindented names are imported directly by conftest / the test modules
+    ours = {name: ms for name, ms in times.items() if name.split(".")[0] in OURS and name == name.lstrip()}
+    for name, ms in sorted(ours.items(), key=lambda kv: -kv[1]):
+        print(f"import {name:<30} {ms:8.1f} ms")
+    print(f"{'total':<37} {sum(ours.values()):8.1f} ms")
+    loaded = [name for name in HEAVY if any(n.strip() == name for n in times)]
+    print(f"heavy modules imported: {', '.join(loaded) or 'none'}")
+    print(f"pytest --collect-only {' '.join(pytest_args)} (median of {runs}): {collect_seconds(pytest_args, runs):.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if sys.argv[1:] else 5, tuple(sys.argv[2:]) or ("tests/steps",))
@@ -0,0 +1,81 @@
+"""
+FakeObjectApi throughput as threads are added: one global lock vs the
+lock-striped ShardedStore, plus the shared (local socket) store. Under the
+GIL the striping gives no gain: the two stay level at every thread count.
+
+    python -m benchmarks.bench_store_contention [ops_per_thread]
+"""
+import sys
+import threading
+import time
+
+from api.client import FakeObjectApi
+from api.store import ShardedStore, default_store, serve_store
+
+
+class _GlobalLockStore:
+    """Baseline: the old plain dict, guarded by a single lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects = {}
+
+    def get(self, object_id):
+        with self._lock:
+            return self._objects.get(object_id)
+
+    def set(self, object_id, obj):
+        with self._lock:
+            self._objects[object_id] = obj
+
+    def replace(self, object_id, obj):
+        with self._lock:
+            if object_id not in self._objects:
+                return False
+            self._objects[object_id] = obj
+            return True
+
+    def pop(self, object_id):
+        with self._lock:
+            return self._objects.pop(object_id, None)
+
+
+def _worker(fake, ops, barrier):
+    barrier.wait()
+    for i in range(ops // 4):
+        object_id = fake.post({"name": f"obj {i}"}).json()["id"]
+        fake.get(object_id)
+        fake.put(object_id, {"name": "updated"})
+        fake.delete(object_id)
+
+
+def _throughput(make_store, threads, ops):
+    fake = FakeObjectApi(make_store())
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=_worker, args=(fake, ops, barrier)) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def main(ops=20000):
+    manager = serve_store()
+    stores = [("global lock", _GlobalLockStore), ("sharded", ShardedStore), ("shared socket", default_store)]
+    try:
+        print(f"{'threads':>7} " + " ".join(f"{name + ' ops/s':>20}" for name, _ in stores))
+        for threads in (1, 2, 4, 8, 16):
+            row = []
+            for name, make_store in stores:
+                # the socket store is ~1000x slower per call; keep its run short
+                row.append(_throughput(make_store, threads, ops if name != "shared socket" else ops // 20))
+            print(f"{threads:>7} " + " ".join(f"{r:>20,.0f}" for r in row))
+    finally:
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,46 @@
+"""
+Session-end cleanup of a large set of leftover objects against the local
+stand-in (with per-request latency): a loop of delete() vs
+ObjectApi.delete_leftovers() at a few concurrency levels.
+
+    python -m benchmarks.bench_teardown [leftovers] [latency_ms]
+"""
+import sys
+import time
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import standin_process
+
+
+def _leave_objects(api, n):
+    payloads = ({"name": f"leftover {i}"} for i in range(n))
+    assert all(r.status_code == 200 for r in api.bulk_create(payloads, concurrency=32))
+    assert len(api.created) == n
+
+
+def main(leftovers=3000, latency_ms=2.0):
+    print(f"{leftovers} leftover objects, {latency_ms} ms server latency")
+    with standin_process("--latency", f"fixed:{latency_ms}") as base_url:
+        with ObjectApi(base_url, pool_size=32, recorder=LatencyRecorder(), live=True) as api:
+            _leave_objects(api, leftovers)
+            start = time.perf_counter()
+            for object_id in api.created.ids():
+                api.delete(object_id)
+            loop = time.perf_counter() - start
+            print(f"loop of delete()                 {loop:8.3f} s   ({leftovers / loop:8.1f} obj/s)")
+
+            for concurrency in (4, 10, 32):
+                _leave_objects(api, leftovers)
+                cleanup = api.delete_leftovers(concurrency=concurrency)
+                assert cleanup["deleted"] == leftovers and not cleanup["failed"]
+                seconds = cleanup["seconds"]
+                print(f"delete_leftovers (x{concurrency:<3})         {seconds:8.3f} s   ({leftovers / seconds:8.1f} obj/s)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 3000,
+        float(args[1]) if len(args) > 1 else 2.0,
+    )
@@ -0,0 +1,92 @@
+"""
+Validator throughput on large response bodies: a compiled schema vs
+interpreting the same schema dict on every call (what a generic validator
+without a compile step does).
+
+    python -m benchmarks.bench_validation [items per body ...]     (default: 100 10000)
+"""
+import re
+import sys
+import time
+
+from utils.validation import _TYPES, compile_schema
+
+SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "data"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "name": {"type": "string", "minLength": 1},
+        "data": {
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["sku", "price"],
+                        "properties": {
+                            "sku": {"type": "string", "pattern": "^SKU-\\d+$"},
+                            "price": {"type": "number", "minimum": 0},
+                            "tags": {"type": "array", "items": {"type": "string"}},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+def interpret(schema, value, path="$", errors=None):
+    errors = [] if errors is None else errors
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        if not any(_TYPES[n](value) for n in names):
+            errors.append(f"{path}: expected {names}")
+            return errors
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            errors.append(f"{path}: too short")
+        if "pattern" in schema and not re.search(schema["pattern"], value):
+            errors.append(f"{path}: pattern")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: minimum")
+    if isinstance(value, dict):
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append(f"{path}: missing {key}")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                interpret(sub, value[key], f"{path}.{key}", errors)
+    if isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            interpret(schema["items"], item, f"{path}[{i}]", errors)
+    return errors
+
+
+def _body(n):
+    items = [{"sku": f"SKU-{i}", "price": i * 1.25, "tags": ["a", "b"]} for i in range(n)]
+    return {"id": "1", "name": "Large object", "data": {"items": items}}
+
+
+def _throughput(validate, body, min_seconds=1.0):
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        assert not validate(body)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main(sizes):
+    compiled = compile_schema(SCHEMA)
+    print(f"{'items':>7} {'interpreted /s':>15} {'compiled /s':>12} {'speedup':>8}")
+    for n in sizes:
+        body = _body(n)
+        slow = _throughput(lambda b: interpret(SCHEMA, b), body)
+        fast = _throughput(compiled, body)
+        print(f"{n:>7} {slow:>15.1f} {fast:>12.1f} {fast / slow:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 10000])
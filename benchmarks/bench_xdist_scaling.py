@@ -0,0 +1,78 @@
+"""
+Wall time of a lifecycle-heavy suite with 1..N pytest-xdist workers, and a
+check that every run still produces exactly one merged report.
+
+A throwaway suite with `scenarios` copies of the lifecycle scenario is
+generated next to the repo conftest (so its hooks and fixtures apply) and
+run with STANDIN_API=1 against a stand-in with fixed per-request latency.
+
+    python -m benchmarks.bench_xdist_scaling [scenarios] [latency_ms] [workers ...]
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+FEATURE = os.path.join(ROOT, "features", "object_lifecycle.feature")
+
+
+def _lifecycle_steps():
+    text = open(FEATURE, encoding="utf-8").read()
+    block = text.split("Scenario: Successfully create, retrieve, update and delete an object\n", 1)[1]
+    return block.split("#", 1)[0].split("Scenario:", 1)[0]
+
+
+def _write_suite(folder, scenarios):
+    steps = _lifecycle_steps()
+    with open(os.path.join(folder, "scaling.feature"), "w", encoding="utf-8") as f:
+        f.write("Feature: Scaling\n")
+        for i in range(scenarios):
+            f.write(f"Scenario: Lifecycle {i}\n{steps}")
+    with open(os.path.join(folder, "test_scaling.py"), "w", encoding="utf-8") as f:
+        f.write(
+            "from pytest_bdd import scenarios\n"
+            "from tests.steps import test_object_lifecycle as steps\n\n"
+            "# reuse the step definitions and context fixture, but not the original scenarios\n"
+            "globals().update({k: v for k, v in vars(steps).items() if k.startswith('pytestbdd_') or k == 'context'})\n"
+            "scenarios('scaling.feature')\n"
+        )
+
+
+def main(scenarios=48, latency_ms=50.0, workers=(1, 2, 4, 8)):
+    suite = tempfile.mkdtemp(prefix="_bench_xdist_", dir=ROOT)
+    reports = tempfile.mkdtemp(prefix="bench_reports_")
+    env = dict(os.environ, STANDIN_API="1", STANDIN_LATENCY=f"fixed:{latency_ms}", REPORT_DIR=reports)
+    try:
+        _write_suite(suite, scenarios)
+        print(f"{scenarios} lifecycle scenarios, {latency_ms} ms per request, {os.cpu_count()} CPU(s)")
+        print(f"{'workers':>7} {'wall s':>8} {'speedup':>8} {'report rows':>12}")
+        baseline = None
+        for n in workers:
+            before = set(os.listdir(reports))
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-n", str(n), suite],
+                cwd=ROOT, env=env, check=True, capture_output=True,
+            )
+            wall = time.perf_counter() - start
+            (new_report,) = [f for f in set(os.listdir(reports)) - before if f.endswith(".html")]
+            html = open(os.path.join(reports, new_report), encoding="utf-8").read()
+            rows = sum(int(n) for n in re.findall(r"Total: (\d+)", html))
+            baseline = baseline or wall
+            print(f"{n:>7} {wall:>8.2f} {baseline / wall:>7.2f}x {rows:>12}")
+    finally:
+        shutil.rmtree(suite, ignore_errors=True)
+        shutil.rmtree(reports, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 48,
+        float(args[1]) if len(args) > 1 else 50.0,
+        [int(a) for a in args[2:]] or (1, 2, 4, 8),
+    )
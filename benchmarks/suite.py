@@ -0,0 +1,339 @@
+"""
+Benchmark suite for the hot paths of the client and the reporter, at several
+data sizes, with a stored baseline (benchmarks/baseline.json) and regression
+gating:
+
+    python -m benchmarks.suite                      run, compare with the baseline, exit 1 on a regression
+    python -m benchmarks.suite --save               run and store the results as the new baseline
+    python -m benchmarks.suite -k fake -k html      only benchmarks whose name contains one of these
+    python -m benchmarks.suite --repeat 21 --threshold 0.1 --json current.json
+
+Every benchmark is timed `repeat` times (each sample long enough to be above
+timer noise), in rounds alongside a calibration loop, and each sample is
+divided by its round's calibration sample. That cancels out machine speed,
+so a baseline recorded on another machine still compares sensibly. A
+benchmark regressed if its median is more than `threshold` slower AND a
+one-sided Mann-Whitney U test says the slowdown is significant (p < alpha),
+so one noisy sample can't fail a review. Runs in fake mode (LIVE_API is ignored).
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from api.client import FakeObjectApi, ObjectApi
+from api.metrics import LatencyRecorder
+from api.response import ApiResponse
+from utils.html_report import generate_html, get_next_filename, pretty_format
+from utils.lifecycle import safe_json
+from utils.results import ResultRecord
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_REPEAT = 11
+DEFAULT_MIN_TIME = 0.02  # seconds per sample
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_ALPHA = 0.01
+CALIBRATION = "calibration"
+
+BENCHMARKS = {}  # name -> (setup(size) -> op, sizes)
+_workdir = None
+
+
+def benchmark(name, sizes):
+    def register(setup):
+        BENCHMARKS[name] = (setup, sizes)
+        return setup
+    return register
+
+
+def _scratch():
+    return tempfile.mkdtemp(dir=_workdir)
+
+
+def _payload(fields):
+    return {"name": "Bench Object", "data": {f"field {i}": i * 1.5 for i in range(fields)}}
+
+
+# -----------------------------
+# Benchmarks: setup(size) returns the operation to time
+# -----------------------------
+@benchmark("fake_crud", sizes=(10, 1000))  # fields in the payload
+def fake_crud(size):
+    fake, payload = FakeObjectApi(), _payload(size)
+
+    def op():
+        object_id = fake.post(payload).json()["id"]
+        fake.get(object_id)
+        fake.put(object_id, payload)
+        fake.delete(object_id)
+    return op
+
+
+@benchmark("fake_get", sizes=(1000, 100_000))  # objects in the store
+def fake_get(size):
+    fake = FakeObjectApi()
+    ids = [fake.post(_payload(10)).json()["id"] for _ in range(size)]
+    return lambda: fake.get(ids[len(ids) // 2])
+
+
+@benchmark("objectapi_dispatch", sizes=(10, 1000))  # fields in the object; `live` re-reads LIVE_API per call
+def objectapi_dispatch(size):
+    api = ObjectApi("http://unused", recorder=LatencyRecorder())
+    object_id = api.post(_payload(size)).json()["id"]
+    return lambda: api.get(object_id)
+
+
+@benchmark("safe_json", sizes=(1, 1000))  # objects in the body
+def safe_json_body(size):
+    body = json.dumps([{"id": str(i), **_payload(10)} for i in range(size)]).encode()
+    return lambda: safe_json(ApiResponse(200, body))
+
+
+@benchmark("safe_json_not_json", sizes=(100, 100_000))  # bytes of HTML
+def safe_json_text(size):
+    body = (b"<html>" * (size // 6 + 1))[:size]
+    return lambda: safe_json(ApiResponse(502, body))
+
+
+@benchmark("pretty_format", sizes=(10, 1000))  # fields, half of them nested one level down
+def pretty_format_dict(size):
+    data = {"id": "1", "name": "Bench Object", "data": _payload(size // 2)["data"],
+            "meta": {"nested": _payload(size - size // 2)["data"]}}
+    return lambda: pretty_format(data)
+
+
+@benchmark("get_next_filename", sizes=(10, 1000))  # reports already in the folder
+def next_filename(size):
+    folder = _scratch()
+    for i in range(1, size + 1):
+        open(os.path.join(folder, f"result{i}.html"), "w").close()
+    return lambda: get_next_filename(folder)
+
+
+@benchmark("generate_html", sizes=(10, 1000))  # rows in the report
+def html_report(size):
+    folder = _scratch()
+    rows = [
+        ResultRecord("Bench scenario", "GET request using the stored object id", "Status code is 200", i % 7 != 0,
+                     payload=_payload(5), response={"id": str(i), **_payload(5)})
+        for i in range(size)
+    ]
+
+    def op():
+        with contextlib.redirect_stdout(io.StringIO()):
+            output_file = generate_html(rows, folder, open_browser=False)
+        os.unlink(output_file)
+    return op
+
+
+def _calibration():
+    """Fixed pure-Python + C workload; its ratio between two runs is the machines' speed ratio."""
+    data = {f"key {i}": i for i in range(500)}
+
+    def op():
+        total = 0
+        for key, value in data.items():
+            total += len(key) * value
+        return total + len(json.dumps(data))
+    return op
+
+
+# -----------------------------
+# Timing
+# -----------------------------
+def _loops(op, min_time):
+    """How many calls of op make one sample of at least min_time seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+
+def _sample(op, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return (time.perf_counter() - start) / number
+
+
+def run(patterns=(), repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """
+    {"results": {"name[size]": {"samples": [...], "calibration": [...]}}} for
+    the selected benchmarks, in per-call seconds. Samples are taken in
+    rounds, one of every benchmark and of the calibration loop per round, so
+    drift of the machine's speed during the run hits all of them alike and
+    each sample is judged against the calibration sample of its own round.
+    """
+    global _workdir
+    # fake mode while timing; restored afterwards, since the suite can run inside a live test session
+    live = os.environ.pop("LIVE_API", None)
+    try:
+        # scratch folders in RAM where possible: the disk's fsync latency would drown the reporter's own time
+        scratch_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.TemporaryDirectory(prefix="bench-suite-", dir=scratch_root) as _workdir:
+            ops = {CALIBRATION: _calibration()}
+            for name, (setup, sizes) in BENCHMARKS.items():
+                if not patterns or any(p in name for p in patterns):
+                    ops.update((f"{name}[{size}]", setup(size)) for size in sizes)
+            loops = {key: _loops(op, min_time) for key, op in ops.items()}
+            samples = {key: [] for key in ops}
+            for _ in range(repeat):
+                for key, op in ops.items():
+                    samples[key].append(_sample(op, loops[key]))
+    finally:
+        _workdir = None
+        if live is not None:
+            os.environ["LIVE_API"] = live
+    calibration = samples.pop(CALIBRATION)
+    return {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "repeat": repeat,
+        "results": {key: {"samples": values, CALIBRATION: calibration} for key, values in samples.items()},
+    }
+
+
+# -----------------------------
+# Comparison
+# -----------------------------
+def mann_whitney_greater(a, b):
+    """
+    One-sided p-value for "values in a tend to be larger than in b"
+    (Mann-Whitney U, normal approximation with tie and continuity correction).
+    """
+    n1, n2 = len(a), len(b)
+    n = n1 + n2
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    rank_a, ties, i = 0.0, 0, 0
+    while i < n:
+        j = i
+        while j + 1 < n and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_a += rank * sum(1 for k in range(i, j + 1) if pooled[k][1] == 0)
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    u = rank_a - n1 * (n1 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 0.5
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _normalized(result):
+    return [sample / calibration for sample, calibration in zip(result["samples"], result[CALIBRATION])]
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA):
+    """
+    One row per current benchmark: (name, baseline median, current median,
+    change, p-value, status). The current median is expressed on the
+    baseline machine's scale (via the calibration loop).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        now = _normalized(result)
+        base = baseline["results"].get(name)
+        if not base:
+            rows.append((name, None, statistics.median(result["samples"]), None, None, "new"))
+            continue
+        before = _normalized(base)
+        change = statistics.median(now) / statistics.median(before) - 1
+        slower, faster = mann_whitney_greater(now, before), mann_whitney_greater(before, now)
+        if change > threshold and slower < alpha:
+            status, p = "REGRESSED", slower
+        elif change < -threshold and faster < alpha:
+            status, p = "faster", faster
+        else:
+            status, p = "ok", min(slower, faster)
+        scaled = statistics.median(now) * statistics.median(base[CALIBRATION])
+        rows.append((name, statistics.median(base["samples"]), scaled, change, p, status))
+    return rows
+
+
+def _time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def format_rows(rows):
+    lines = [f"{'benchmark':<32} {'baseline':>11} {'current':>11} {'change':>8} {'p':>7}  status"]
+    for name, base, current, change, p, status in rows:
+        lines.append(
+            f"{name:<32} {_time(base) if base is not None else '-':>11} {_time(current):>11} "
+            f"{f'{change:+.1%}' if change is not None else '-':>8} {f'{p:.3f}' if p is not None else '-':>7}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def _save(path, current):
+    """Write current into the baseline; benchmarks not run this time keep their stored samples."""
+    results = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            results = json.load(f)["results"]
+    results.update(current["results"])
+    rounded = {
+        name: {key: [float(f"{v:.4g}") for v in values] for key, values in result.items()}
+        for name, result in results.items()
+    }
+    # one line per benchmark, so a baseline update reads as a per-benchmark diff in review
+    header = json.dumps({k: v for k, v in current.items() if k != "results"})[:-1]
+    lines = ",\n".join(f"  {json.dumps(name)}: {json.dumps(result)}" for name, result in rounded.items())
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{header}, "results": {{\n{lines}\n}}}}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare it with the stored baseline.")
+    parser.add_argument("-k", dest="patterns", action="append", default=[], help="only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="seconds per sample")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline instead of gating")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="slowdown that fails (0.2 = 20%%)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level of the slowdown")
+    parser.add_argument("--json", help="also write this run's samples here")
+    args = parser.parse_args(argv)
+
+    current = run(args.patterns, args.repeat, args.min_time)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+    if args.save:
+        _save(args.baseline, current)
+        print(format_rows(compare({"results": {}}, current)))
+        print(f"Baseline written to {args.baseline} ({len(current['results'])} benchmarks)")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.alpha)
+    print(format_rows(rows))
+    regressed = [row[0] for row in rows if row[5] == "REGRESSED"]
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
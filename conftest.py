@@ -1,26 +1,178 @@
+import os
 import pytest
-from dotenv import load_dotenv
 from pathlib import Path
 
-# Load .env from project root automatically
-BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / ".env")
+from api.cassette import Cassette
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder, current_scenario, default_recorder
+from api.store import STORE_ADDRESS_ENV, serve_store
+from api.teardown import LEFTOVERS_ENV
+from utils.html_report import REPORT_FOLDER, StreamingReportWriter
+from utils.results import RecordSpool, ResultStore, decode_records, encode_records, iter_spooled_records
 
-results = []
+# Heavier modules (api.server, utils.exporters, requests via the live path) are imported
+# only when the run uses them; see benchmarks/bench_startup.py
 
-# Hook to capture test results
+# Load .env from the project root (this file's folder) automatically
+BASE_DIR = Path(__file__).resolve().parent
+if (BASE_DIR / ".env").is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
+
+# Single collection point for recorded assertions; rows stream into the report as they arrive
+results = ResultStore()
+report = StreamingReportWriter()
+results.add_sink(report.add)
+# RESULT_EXPORTS=jsonl,columnar: also stream results to machine-readable files (see utils/exporters.py)
+exporters = []
+
+
+# FAKE_STORE_SHARED=1: the controller serves one fake store that all xdist workers share
+# STANDIN_API=1: start the local stand-in server and run the live (requests) path against it
+def pytest_configure(config):
+    if os.getenv("FAKE_STORE_SHARED") and not hasattr(config, "workerinput") and not os.getenv(STORE_ADDRESS_ENV):
+        config._fake_store_manager = serve_store()
+    if os.getenv("STANDIN_API") and not hasattr(config, "workerinput"):
+        from api.server import StandinServer
+
+        config._standin_server = StandinServer(latency=os.getenv("STANDIN_LATENCY")).start()
+        os.environ["BASE_URL"] = config._standin_server.base_url
+        os.environ["LIVE_API"] = "1"
+    if os.getenv("RESULT_EXPORTS") and not hasattr(config, "workerinput"):
+        from utils.exporters import EXPORTERS
+
+        for name in filter(None, os.getenv("RESULT_EXPORTS").split(",")):
+            exporter = EXPORTERS[name.strip()](REPORT_FOLDER)
+            exporters.append(exporter)
+            results.add_sink(exporter.add)
+
+
+def pytest_unconfigure(config):
+    manager = getattr(config, "_fake_store_manager", None)
+    if manager is not None:
+        manager.shutdown()
+    server = getattr(config, "_standin_server", None)
+    if server is not None:
+        server.stop()
+
+
+# Local stand-in for the objects API (seeded from data/*.json), for tests of the live path
+@pytest.fixture(scope="session")
+def standin_server():
+    from api.server import StandinServer
+
+    with StandinServer() as server:
+        yield server
+
+
+# One pooled client for the whole session; closed (sockets released) at the end.
+# API_CASSETTE=<file> records live calls into a cassette (API_CASSETTE_MODE=record)
+# or replays them from it offline (the default mode; see api/cassette.py)
+# Live runs then delete the objects the session created and didn't delete (e.g. a scenario
+# that failed midway), plus those an earlier run couldn't, listed in API_LEFTOVERS_FILE
+# (default reports/leftover_objects.json; the stand-in's objects die with it, so none there)
+@pytest.fixture(scope="session")
+def api():
+    client = ObjectApi(os.getenv("BASE_URL"), cassette=Cassette.from_env())
+    yield client
+    leftovers_file = None if os.getenv("STANDIN_API") else os.getenv(LEFTOVERS_ENV) or os.path.join(REPORT_FOLDER, "leftover_objects.json")
+    cleanup = client.delete_leftovers(leftovers_file)
+    if cleanup and cleanup["objects"]:
+        print(f"\nDeleted {cleanup['deleted']} leftover objects ({cleanup['already_gone']} already gone, "
+              f"{cleanup['reclaimed']} from earlier runs) in {cleanup['seconds']:.2f} s; "
+              f"{len(cleanup['failed'])} left for the next run")
+    client.close()
+
+
+# Pre-provisioned objects for scenarios that only need one to exist (see utils/object_pool.py):
+# created in bulk when first used, refilled in the background, deleted in bulk at the end
+@pytest.fixture(scope="session")
+def object_pool(api):
+    from utils.object_pool import ObjectPool
+
+    with ObjectPool.from_env(api) as pool:
+        yield pool
+
+
+# Tag API timings with the running scenario so latency is aggregated per scenario too
+def pytest_bdd_before_scenario(request, feature, scenario):
+    current_scenario.set(scenario.name)
+
+
+def pytest_bdd_after_scenario(request, feature, scenario):
+    current_scenario.set(None)
+
+
+def _is_xdist_worker(config):
+    return hasattr(config, "workerinput")
+
+
+def pytest_sessionfinish(session):
+    if _is_xdist_worker(session.config):
+        # Results already streamed to the controller; hand over latency stats at node down
+        session.config.workeroutput["latency"] = default_recorder.dumps()
+        return
+    if len(results):
+        output_file = report.close(latency=default_recorder)
+        # Machine-readable latency summary next to the HTML report
+        default_recorder.write_json(os.path.splitext(output_file)[0] + "-latency.json")
+        for exporter in exporters:
+            exporter.close(os.path.splitext(output_file)[0], default_recorder)
+    else:
+        for exporter in exporters:
+            exporter.discard()
+
+
+# Records go to the store as the steps make them (a data-driven scenario makes one per data-file
+# record). On an xdist worker they are spooled instead and ride along on the report to the controller.
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    if _is_xdist_worker(item.config):
+        item.record_spool = RecordSpool()
+        item.result_sink = item.record_spool.add
+    else:
+        item.result_sink = results.add
+
+
+# Hook to capture test results: moves what a test recorded without a sink into the store,
+# and attaches a worker's spooled records (marshal-encoded, or the spool file) to its report.
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
 
     if rep.when == "call":
-        step_name = getattr(item, "step_name", item.name)
-        context_data = getattr(item, "context_data", None)
-
-        results.append({
-            "scenario": item.name,
-            "step": step_name,
-            "passed": rep.passed,
-            "data": context_data
-        })
\ No newline at end of file
+        recorded = getattr(item, "recorded_results", ())
+        spool = getattr(item, "record_spool", None)
+        if _is_xdist_worker(item.config):
+            if recorded:
+                rep.user_properties.append(("recorded_results", encode_records(recorded)))
+            handoff = spool.handoff() if spool is not None else None
+            if handoff:
+                rep.user_properties.append(handoff)
+        else:
+            for record in recorded:
+                results.add(record)
+        item.recorded_results = []
+        item.result_sink = item.record_spool = None
+
+
+# Controller side of the above: every worker report arrives here as the test finishes
+def pytest_runtest_logreport(report):
+    if getattr(report, "node", None) is None:  # not relayed from an xdist worker
+        return
+    for name, value in report.user_properties:
+        if name == "recorded_results" and isinstance(value, bytes):
+            for record in decode_records(value):
+                results.add(record)
+        elif name == "recorded_results_file":
+            for record in iter_spooled_records(value):
+                results.add(record)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    latency = getattr(node, "workeroutput", {}).get("latency")
+    if latency:
+        default_recorder.merge(LatencyRecorder.loads(latency))
@@ -8,8 +8,10 @@ Given I have a valid object payload
 When I send a POST request to create the object
 Then the response status code should be 200
 And the response should contain an object id
+And the response should match the "object" schema
 When I send a GET request using the stored object id
 Then the response status code should be 200
+And the response should match the "object" schema
 And the response name should match the created object name
 When I update the object with a new name
 Then the response status code should be 200
@@ -23,7 +25,34 @@ Scenario: Retrieve non-existing object
 Given I have a non-existing object id
 When I send a GET request using that id
 Then the response status code should be 404
+And the response should match the "error" schema
 Scenario: Create object with invalid payload
 Given I have an invalid object payload
 When I send a POST request to create the object
-Then the response status code should indicate a client error
\ No newline at end of file
+Then the response status code should indicate a client error
+# Pooled objects: no POST of their own
+Scenario: Retrieve an existing object
+Given an existing object from the pool
+When I send a GET request using the stored object id
+Then the response status code should be 200
+And the response should match the "object" schema
+And the response name should match the created object name
+Scenario: Update and delete an existing object
+Given an object of my own from the pool
+When I update the object with a new name
+Then the response status code should be 200
+And the response name should reflect the updated value
+When I send a DELETE request using the stored object id
+Then the response status code should be 200
+When I send a GET request using the deleted object id
+Then the response status code should be 404
+# Concurrency
+Scenario: Run many object lifecycles concurrently
+Given I have 50 valid object payloads
+When I run their lifecycles concurrently with at most 10 in flight
+Then every lifecycle should complete with the expected status codes
+# Data-driven
+Scenario: Run the object lifecycle for every record in the data files
+Given the object records from "data/*.json"
+When I run the lifecycle for every record in batches of 100 with at most 10 in flight
+Then every record's lifecycle should complete with the expected status codes
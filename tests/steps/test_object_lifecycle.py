@@ -1,204 +1,193 @@
 import pytest
-from pytest_bdd import scenarios, given, when, then
-from api.client import ObjectApi
-import atexit
+from pytest_bdd import scenarios, given, when, then, parsers
 import os
-from datetime import datetime
-from dotenv import load_dotenv
-from pathlib import Path
-BASE_URL = os.getenv("BASE_URL")
 
-api = ObjectApi(BASE_URL)
+from utils.datasets import iter_records, record_lifecycles, run_records
+from utils.lifecycle import GIVEN_STEPS, WHEN_STEPS, safe_json
+from utils.results import record_result
+from utils.validation import get_validator
 
 # Load feature file
 scenarios("../../features/object_lifecycle.feature")
 
-# Results collector
-results = []
-
-# Ensure results folder exists
-RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "..", "results")
-os.makedirs(RESULTS_FOLDER, exist_ok=True)
-
-from utils.html_report import generate_html
-
-# Register HTML generation at exit
-atexit.register(lambda: generate_html(results))
-
 @pytest.fixture
 def context():
     return {}
 
 # ---------------------------
-# HELPER
-# ---------------------------
-def safe_json(response):
-    """Extract JSON safely from FakeObjectApi or requests.Response."""
-    try:
-        return response.json()
-    except Exception:
-        if hasattr(response, "text"):
-            return {"raw_text": response.text}
-        return {"raw_text": str(response)}
-
-# ---------------------------
-# GIVEN STEPS
+# GIVEN / WHEN STEPS
 # ---------------------------
-@given("I have a valid object payload")
-def valid_object_payload(context):
-    context["payload"] = {
-        "name": "Test Object",
-        "data": {
-            "year": 2024,
-            "price": 1000
-        }
-    }
-
-@given("I have an invalid object payload")
-def invalid_object_payload(context):
-    context["payload"] = {}
-
-@given("I have a non-existing object id")
-def non_existing_object_id(context):
-    context["object_id"] = "999999999"
-
-# ---------------------------
-# WHEN STEPS
-# ---------------------------
-@when("I send a POST request to create the object")
-def create_object(context):
-    context["action"] = "POST request to create the object"   
-    response = api.post(context["payload"])
-    context["response"] = response
-    if response.status_code == 200:
-        json_data = safe_json(response)
-        context["object_id"] = json_data["id"]
-        context["created_name"] = json_data["name"]
-
-@when("I send a GET request using the stored object id")
-def get_object(context):
-    context["action"] = "GET request using the stored object id"   
-    response = api.get(context["object_id"])
-    context["response"] = response
-
-@when("I update the object with a new name")
-def update_object(context):
-    context["action"] = "PUT request to update the object"   
-    updated_payload = {"name": "Updated Object Name"}
-    response = api.put(context["object_id"], updated_payload)
-    context["response"] = response
-    context["updated_name"] = updated_payload["name"]
-
-@when("I send a DELETE request using the stored object id")
-def delete_object(context):
-    context["action"] = "DELETE request using the stored object id"   
-    response = api.delete(context["object_id"])
-    context["response"] = response
-
-@when("I send a GET request using the deleted object id")
-def get_deleted_object(context):
-    context["action"] = "GET request using the deleted object id"   
-    response = api.get(context["object_id"])
-    context["response"] = response
-
-@when("I send a GET request using that id")
-def get_non_existing_object(context):
-    context["action"] = "GET request using non-existing id"   
-    response = api.get(context["object_id"])
-    context["response"] = response
+# Shared with the load generator, see utils/lifecycle.py
+for step_text, step_func in GIVEN_STEPS.items():
+    given(step_text)(step_func)
+
+for step_text, step_func in WHEN_STEPS.items():
+    when(step_text)(step_func)
+
+# Pooled objects (session fixture): read-only scenarios borrow one, mutating ones get their own
+@given("an existing object from the pool")
+def pooled_object(request, context, object_pool):
+    obj = object_pool.checkout()
+    request.addfinalizer(lambda: object_pool.checkin(obj))
+    context["object_id"], context["created_name"] = obj["id"], obj["name"]
+
+@given("an object of my own from the pool")
+def own_pooled_object(context, object_pool):
+    obj = object_pool.take()
+    context["object_id"], context["created_name"] = obj["id"], obj["name"]
+
+@given(parsers.parse("I have {count:d} valid object payloads"))
+def many_valid_object_payloads(context, count):
+    context["payloads"] = [
+        {"name": f"Test Object {i}", "data": {"year": 2024, "price": 1000 + i}}
+        for i in range(count)
+    ]
+
+@when(parsers.parse("I run their lifecycles concurrently with at most {limit:d} in flight"))
+def run_concurrent_lifecycles(api, context, limit):
+    # asyncio is only imported by the scenario that needs it
+    import asyncio
+    from api.async_client import AsyncObjectApi, run_lifecycles
+
+    async def run():
+        # wraps the session client: same cassette, breaker, rate limit and created-object registry
+        async with AsyncObjectApi(api, concurrency=limit) as async_api:
+            return await run_lifecycles(async_api, context["payloads"])
+
+    context["action"] = f"Concurrent lifecycles (max {limit} in flight)"
+    context["lifecycle_statuses"] = asyncio.run(run())
+
+# Records are streamed from the files and run lazily; DATA_FILES overrides the feature's files
+@given(parsers.parse('the object records from "{patterns}"'))
+def object_records(context, patterns):
+    context["records"] = iter_records(os.getenv("DATA_FILES") or patterns)
+
+@when(parsers.parse("I run the lifecycle for every record in batches of {batch_size:d} with at most {limit:d} in flight"))
+def run_data_driven_lifecycles(api, context, batch_size, limit):
+    context["action"] = f"Data-driven lifecycle (batches of {batch_size}, max {limit} in flight)"
+    context["record_results"] = run_records(api, context["records"], batch_size, limit)
 
 # ---------------------------
 # THEN STEPS
 # ---------------------------
 @then("the response status code should be 200")
-def check_status_200(context):
+def check_status_200(request, context):
     passed = context["response"].status_code == 200
     data = safe_json(context["response"])
-    results.append({
-        "scenario": "Successfully create, retrieve, update and delete an object",
-        "action": context.get("action", "N/A"), 
-        "step_description": f"Status code is {context['response'].status_code}",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": data, 
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        f"Status code is {context['response'].status_code}",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=data,
+    )
     assert passed
 
 @then("the response should contain an object id")
-def check_object_id(context):
+def check_object_id(request, context):
     json_data = safe_json(context["response"])
     passed = "id" in json_data and json_data["id"]
-    results.append({
-        "scenario": "Successfully create, retrieve, update and delete an object",
-        "action": context.get("action", "N/A"), 
-        "step_description": "Check response contains object id",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": json_data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        "Check response contains object id",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=json_data,
+    )
     assert passed
 
+@then(parsers.parse('the response should match the "{schema}" schema'))
+def check_schema(request, context, schema):
+    json_data = safe_json(context["response"])
+    errors = get_validator(schema)(json_data)
+    passed = not errors
+    record_result(
+        request.node,
+        f"Response matches {schema} schema" + (f": {'; '.join(errors[:3])}" if errors else ""),
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=json_data,
+    )
+    assert passed, errors
+
 @then("the response name should match the created object name")
-def check_created_name(context):
+def check_created_name(request, context):
     json_data = safe_json(context["response"])
     passed = json_data.get("name") == context.get("created_name")
-    results.append({
-        "scenario": "Successfully create, retrieve, update and delete an object",
-        "action": context.get("action", "N/A"), 
-        "step_description": "Check created object name",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": json_data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        "Check created object name",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=json_data,
+    )
     assert passed
 
 @then("the response name should reflect the updated value")
-def check_updated_name(context):
+def check_updated_name(request, context):
     json_data = safe_json(context["response"])
     passed = json_data.get("name") == context.get("updated_name")
-    results.append({
-        "scenario": "Successfully create, retrieve, update and delete an object",
-        "action": context.get("action", "N/A"), 
-        "step_description": "Check updated object name",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": json_data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        "Check updated object name",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=json_data,
+    )
     assert passed
 
 @then("the response status code should be 404")
-def check_status_404(context):
+def check_status_404(request, context):
     passed = context["response"].status_code == 404
     data = safe_json(context["response"])
-    results.append({
-        "scenario": "Retrieve non-existing object",
-        "action": context.get("action", "N/A"), 
-        "step_description": "Status code is 404",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        "Status code is 404",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=data,
+    )
     assert passed
 
 @then("the response status code should indicate a client error")
-def check_client_error(context):
+def check_client_error(request, context):
     status = context["response"].status_code
     passed = 400 <= status < 500
     data = safe_json(context["response"])
-    results.append({
-        "scenario": "Create object with invalid payload",
-        "action": context.get("action", "N/A"), 
-        "step_description": f"Client error status: {status}",
-        "passed": passed,
-        "payload": context.get("payload", None),   # 👈 store payload
-        "response": data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    record_result(
+        request.node,
+        f"Client error status: {status}",
+        passed,
+        action=context.get("action", "N/A"),
+        payload=context.get("payload"),
+        response=data,
+    )
     assert passed
 
+@then("every lifecycle should complete with the expected status codes")
+def check_concurrent_lifecycles(request, context):
+    from api.async_client import LIFECYCLE_EXPECTED
+
+    statuses = context["lifecycle_statuses"]
+    failed = [s for s in statuses if tuple(s) != LIFECYCLE_EXPECTED]
+    passed = not failed
+    record_result(
+        request.node,
+        f"{len(statuses) - len(failed)}/{len(statuses)} lifecycles returned {LIFECYCLE_EXPECTED}",
+        passed,
+        action=context.get("action", "N/A"),
+        response={"lifecycles": len(statuses), "failed": failed[:5]},
+    )
+    assert passed
 
+@then("every record's lifecycle should complete with the expected status codes")
+def check_data_driven_lifecycles(request, context):
+    # one result per record, each handed to the result sink as its lifecycle completes
+    total, failed = record_lifecycles(request.node, context["record_results"], context.get("action", "N/A"))
+    assert total and not failed, f"{failed}/{total} records failed"
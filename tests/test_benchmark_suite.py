@@ -0,0 +1,68 @@
+import json
+import os
+import random
+
+from benchmarks import suite
+
+
+def _result(samples, calibration):
+    return {"samples": samples, "calibration": calibration}
+
+
+def test_mann_whitney_separates_shifted_samples_only():
+    rng = random.Random(4)
+    base = [1 + rng.random() * 0.1 for _ in range(11)]
+    assert suite.mann_whitney_greater([x * 1.5 for x in base], base) < 0.001
+    assert suite.mann_whitney_greater(base, [x * 1.5 for x in base]) > 0.99
+    assert 0.3 < suite.mann_whitney_greater(base, list(base)) < 0.7
+
+
+def test_compare_gates_on_calibrated_slowdowns():
+    rng = random.Random(5)
+    noise = [1 + rng.random() * 0.05 for _ in range(11)]
+    calibration = [1e-4 * x for x in noise]
+    baseline = {"results": {
+        "a[1]": _result([1e-6 * x for x in noise], calibration),
+        "b[1]": _result([1e-3 * x for x in noise], calibration),
+        "c[1]": _result([1e-3 * x for x in noise], calibration),
+    }}
+    current = {"results": {
+        "a[1]": _result([2e-6 * x for x in reversed(noise)], calibration),  # twice as slow
+        "b[1]": _result([2e-3 * x for x in noise], [2 * c for c in calibration]),  # a machine twice as slow
+        "c[1]": _result([1.1e-3 * x for x in reversed(noise)], calibration),  # within the threshold
+        "d[1]": _result([1e-6] * 11, calibration),
+    }}
+    statuses = {row[0]: row[5] for row in suite.compare(baseline, current, threshold=0.2)}
+    assert statuses == {"a[1]": "REGRESSED", "b[1]": "ok", "c[1]": "ok", "d[1]": "new"}
+
+
+def test_run_times_in_fake_mode_and_restores_live_api(monkeypatch):
+    monkeypatch.setenv("LIVE_API", "1")
+    current = suite.run(["pretty_format"], repeat=1, min_time=0.0001)
+    assert list(current["results"]) == ["pretty_format[10]", "pretty_format[1000]"]
+    assert os.environ["LIVE_API"] == "1"
+
+
+def test_cli_saves_a_baseline_and_fails_on_a_regression(tmp_path, capsys, monkeypatch):
+    rng = random.Random(6)
+    noise = [1 + rng.random() * 0.05 for _ in range(7)]
+    current = {"python": "3", "machine": "test", "repeat": 7, "results": {
+        "pretty_format[10]": _result([2e-6 * x for x in noise], [1e-4] * 7),
+        "pretty_format[1000]": _result([3e-4 * x for x in noise], [1e-4] * 7),
+    }}
+    monkeypatch.setattr(suite, "run", lambda patterns, repeat, min_time: current)  # fixed samples, no timing
+    path = str(tmp_path / "baseline.json")
+    options = ["-k", "pretty_format", "--baseline", path]
+    assert suite.main(options + ["--save"]) == 0
+    with open(path) as f:
+        stored = json.load(f)
+    assert list(stored["results"]) == ["pretty_format[10]", "pretty_format[1000]"]
+    assert suite.main(options) == 0
+
+    # a baseline 4x faster than what the code does now
+    for result in stored["results"].values():
+        result["samples"] = [s / 4 for s in result["samples"]]
+    with open(path, "w") as f:
+        json.dump(stored, f)
+    assert suite.main(options) == 1
+    assert "REGRESSED" in capsys.readouterr().out
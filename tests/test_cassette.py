@@ -0,0 +1,90 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from api.async_client import AsyncObjectApi, run_lifecycles
+from api.cassette import Cassette, CassetteMiss
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+
+
+def _lifecycle(api):
+    created = api.post({"name": "Recorded", "data": {"notes": "x" * 1000}})
+    object_id = created.json()["id"]
+    return [
+        created,
+        api.get(object_id),
+        api.put(object_id, {"name": "Updated"}),
+        api.delete(object_id),
+        api.get(object_id),
+    ]
+
+
+def _replay_api(path, on_miss="error"):
+    return ObjectApi("http://127.0.0.1:1/unused", recorder=LatencyRecorder(), cassette=Cassette(path, on_miss=on_miss))
+
+
+def test_replay_serves_recorded_calls_without_network(standin_server, tmp_path):
+    path = str(tmp_path / "lifecycle.cassette")
+    with ObjectApi(standin_server.base_url, retries=0, recorder=LatencyRecorder(), live=True,
+                   cassette=Cassette(path, "record")) as api:
+        recorded = _lifecycle(api)
+
+    with _replay_api(path) as api:
+        assert api.live and len(api._cassette) == 5
+        replayed = _lifecycle(api)
+        assert api._session is None
+        assert api.latency.summary()["by_verb"]["GET"]["total"]["count"] == 2
+    assert [r.status_code for r in replayed] == [r.status_code for r in recorded] == [200, 200, 200, 200, 404]
+    assert [r.json() for r in replayed] == [r.json() for r in recorded]
+    assert replayed[0].headers["content-type"] == "application/json"
+
+
+def test_async_lifecycles_record_and_replay_through_the_wrapped_client(standin_server, tmp_path):
+    path = str(tmp_path / "concurrent.cassette")
+    payloads = [{"name": f"Concurrent {i}"} for i in range(20)]
+
+    async def run(api):
+        async with AsyncObjectApi(api, concurrency=5) as async_api:
+            return await run_lifecycles(async_api, payloads)
+
+    with ObjectApi(standin_server.base_url, recorder=LatencyRecorder(), live=True,
+                   cassette=Cassette(path, "record")) as api:
+        recorded = asyncio.run(run(api))
+        assert len(api._cassette) == 5 * len(payloads)
+
+    with _replay_api(path) as api:  # on_miss="error": a call that bypassed the cassette would raise
+        assert asyncio.run(run(api)) == recorded == [[200, 200, 200, 200, 404]] * len(payloads)
+        assert api._session is None
+
+
+def test_unmatched_requests_follow_the_miss_policy(standin_server, tmp_path):
+    path = str(tmp_path / "empty.cassette")
+    Cassette(path, "record").close()
+
+    with _replay_api(path) as api, pytest.raises(CassetteMiss, match="GET /1"):
+        api.get("1")
+    with _replay_api(path, on_miss="fake") as api:
+        assert api.post({"name": "fallback"}).json()["name"] == "fallback"
+    with ObjectApi(standin_server.base_url, recorder=LatencyRecorder(), cassette=Cassette(path, on_miss="live")) as api:
+        assert api.get("1").json()["name"] == "Google Pixel 6 Pro"
+    with pytest.raises(ValueError):
+        Cassette(path, on_miss="ignore")
+
+
+def test_replay_never_imports_the_http_stack(standin_server, tmp_path):
+    path = str(tmp_path / "get.cassette")
+    with ObjectApi(standin_server.base_url, recorder=LatencyRecorder(), live=True, cassette=Cassette(path, "record")) as api:
+        api.get("1")
+    code = (
+        "import sys; from api.cassette import Cassette; from api.client import ObjectApi\n"
+        f"api = ObjectApi(None, cassette=Cassette({path!r}))\n"
+        "assert api.get('1').json()['id'] == '1'\n"
+        "print(sorted(m for m in ('requests', 'urllib3') if m in sys.modules))\n"
+    )
+    root = os.path.join(os.path.dirname(__file__), "..")
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from api.async_client import AsyncObjectApi, object_lifecycle
+from api.client import FakeObjectApi, ObjectApi
+from api.metrics import LatencyHistogram, LatencyRecorder, current_scenario
+from api.store import STORE_ADDRESS_ENV, STORE_AUTHKEY_ENV, STORE_PATH_ENV, default_store, serve_store
+
+
+def test_live_session_is_pooled_and_reused():
+    api = ObjectApi("http://127.0.0.1:1/objects", pool_size=4, retries=2)
+    session = api.session
+    assert api.session is session
+
+    adapter = session.get_adapter("http://127.0.0.1:1/objects")
+    assert adapter._pool_maxsize == 4
+    # retries happen in ObjectApi (see tests/test_resilience.py), not in the transport
+    assert adapter.max_retries.total == 0
+    assert api.retry_policy.retries == 2
+
+
+def test_close_releases_session():
+    with ObjectApi("http://127.0.0.1:1/objects") as api:
+        first = api.session
+    assert api._session is None
+    assert api.session is not first
+    api.close()
+
+
+def test_async_client_shares_the_wrapped_client(standin_server):
+    async def run(api):
+        async with AsyncObjectApi(api) as async_api:
+            assert async_api.concurrency == api.pool_size == 3
+            created = await async_api.post({"name": "Async"})
+            return await object_lifecycle(async_api, {"name": "Async lifecycle"}), created.json()["id"]
+
+    with ObjectApi(standin_server.base_url, pool_size=3, recorder=LatencyRecorder(), live=True) as api:
+        statuses, left = asyncio.run(run(api))
+        assert statuses == [200, 200, 200, 200, 404]
+        assert api.created.ids() == [left]  # the wrapped client's registry, and it is still open
+        assert api.latency.summary()["by_verb"]["POST"]["total"]["count"] == 2
+        assert api.delete(left).status_code == 200
+
+
+def test_fake_store_is_consistent_under_threads():
+    fake = FakeObjectApi()
+
+    def lifecycle(i):
+        object_id = fake.post({"name": f"obj {i}"}).json()["id"]
+        assert fake.put(object_id, {"name": "updated"}).status_code == 200
+        return object_id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lifecycle, range(400)))
+    assert len(fake._store) == 400
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(lambda i: fake.delete(i).status_code, ids + ids[:50]))
+    assert statuses.count(200) == 400 and statuses.count(404) == 50
+    assert len(fake._store) == 0
+
+
+def test_shared_store_is_visible_across_clients(monkeypatch):
+    # serve_store() overwrites the address; monkeypatch puts back the session's own (FAKE_STORE_SHARED=1)
+    monkeypatch.setenv(STORE_ADDRESS_ENV, "")
+    monkeypatch.setenv(STORE_AUTHKEY_ENV, "")
+    manager = serve_store()
+    try:
+        first, second = FakeObjectApi(default_store()), FakeObjectApi(default_store())
+        object_id = first.post({"name": "shared"}).json()["id"]
+        assert second.get(object_id).json()["name"] == "shared"
+        assert second.delete(object_id).status_code == 200
+        assert first.get(object_id).status_code == 404
+    finally:
+        manager.shutdown()
+
+
+def test_latency_histogram_percentiles_are_close():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.add(ms / 1000)
+    assert abs(histogram.percentile(50) - 0.5) < 0.5 * 0.01
+    assert abs(histogram.percentile(99) - 0.99) < 0.99 * 0.01
+    assert histogram.percentile(100) == histogram.max == 1.0
+
+
+def test_object_api_records_latency_per_verb_and_scenario():
+    recorder = LatencyRecorder()
+    api = ObjectApi("http://unused", recorder=recorder, live=False)
+    token = current_scenario.set("Lifecycle")
+    try:
+        object_id = api.post({"name": "timed"}).json()["id"]
+        api.get(object_id)
+        api.get(object_id)
+    finally:
+        current_scenario.reset(token)
+    api.delete(object_id)
+
+    summary = recorder.summary()
+    assert summary["by_verb"]["GET"]["total"]["count"] == 2
+    assert summary["by_verb"]["DELETE"]["total"]["count"] == 1
+    assert set(summary["by_scenario"]["Lifecycle"]) == {"POST", "GET"}
+    assert "connect" not in summary["by_verb"]["GET"]
+
+
+def _data_file_payloads():
+    with open(os.path.join(os.path.dirname(__file__), "..", "data", "payload_single.json"), encoding="utf-8") as f:
+        return [{k: v for k, v in record.items() if k != "id"} for record in json.load(f)]
+
+
+def test_bulk_crud_streams_one_response_per_item():
+    api = ObjectApi(None, recorder=LatencyRecorder(), live=False)
+    payloads = _data_file_payloads()
+
+    created = api.bulk_create(iter(payloads))
+    assert not isinstance(created, list)
+    ids = [r.json()["id"] for r in created]
+    assert len(ids) == len(payloads) == 13
+
+    names = [r.json()["name"] for r in api.bulk_get(ids)]
+    assert names == [p["name"] for p in payloads]
+
+    updated = api.bulk_update((object_id, {"name": "renamed"}) for object_id in ids)
+    assert {r.json()["name"] for r in updated} == {"renamed"}
+
+    statuses = [r.status_code for r in api.bulk_delete(ids + ["missing"])]
+    assert statuses == [200] * 13 + [404]
+
+
+def test_fake_bulk_methods_are_lazy():
+    fake = FakeObjectApi()
+    responses = fake.bulk_create({"name": f"obj {i}"} for i in range(3))
+    assert len(fake._store) == 0
+    ids = [r.json()["id"] for r in responses]
+    assert [r.status_code for r in fake.bulk_get(ids)] == [200, 200, 200]
+    assert [r.status_code for r in fake.bulk_delete(ids)] == [200, 200, 200]
+
+
+def test_latency_recorder_round_trips_between_processes():
+    worker = LatencyRecorder()
+    worker.record("GET", 0.010, scenario="S")
+    controller = LatencyRecorder()
+    controller.record("GET", 0.020)
+    controller.merge(LatencyRecorder.loads(worker.dumps()))
+
+    summary = controller.summary()
+    assert summary["by_verb"]["GET"]["total"]["count"] == 2
+    assert summary["by_scenario"]["S"]["GET"]["total"]["max_ms"] == 10.0
+
+
+def test_fake_mode_never_imports_the_http_stack():
+    code = (
+        "import sys, api.client\n"
+        "api.client.ObjectApi('http://unused', live=False).post({'name': 'x'})\n"
+        "print(sorted({'requests', 'urllib3', 'multiprocessing.managers'} & set(sys.modules)))"
+    )
+    root = os.path.join(os.path.dirname(__file__), "..")
+    # the in-process store: a shared (FAKE_STORE_SHARED=1) or on-disk one is the session's, not this process's
+    env = {k: v for k, v in os.environ.items() if k not in (STORE_ADDRESS_ENV, STORE_AUTHKEY_ENV, STORE_PATH_ENV)}
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
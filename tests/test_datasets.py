@@ -0,0 +1,51 @@
+import json
+import tracemalloc
+
+from api.client import FakeObjectApi, ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import StandinServer
+from utils import datasets
+from utils.datasets import iter_records, lifecycle_passed, record_lifecycles, run_records
+from utils.results import ResultStore
+
+
+def test_records_stream_from_json_arrays_and_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, "_CHUNK_SIZE", 5)
+    objects = [{"id": str(i), "name": f"Object {i}", "data": {"price": i * 1.5}} for i in range(20)]
+    (tmp_path / "a.json").write_text(json.dumps(objects, indent=2))
+    (tmp_path / "b.jsonl").write_text("\n".join(json.dumps(o) for o in objects[:3]) + "\n")
+
+    records = list(iter_records(f"{tmp_path}/a.json, {tmp_path}/*.jsonl"))
+    assert [tag for tag, _ in records[19:]] == ["a.json#20", "b.jsonl#1", "b.jsonl#2", "b.jsonl#3"]
+    assert records[5][1] == {"name": "Object 5", "data": {"price": 7.5}}
+
+
+def test_records_run_in_order_in_batches_against_a_live_backend():
+    records = [(f"r#{i}", {"name": f"Object {i}"}) for i in range(7)] + [("bad#1", {})]
+    with StandinServer() as server, ObjectApi(server.base_url, recorder=LatencyRecorder(), live=True) as api:
+        results = list(run_records(api, records, batch_size=3, concurrency=3))
+    assert [tag for tag, *_ in results] == [tag for tag, _ in records]
+    assert all(lifecycle_passed(statuses, error) for _, _, statuses, error in results[:7])
+    _, _, statuses, error = results[7]
+    assert statuses == (400,) and error is not None and not lifecycle_passed(statuses, error)
+
+
+def test_recording_every_record_stays_flat_in_memory(tmp_path, monkeypatch):
+    monkeypatch.delenv("LIVE_API", raising=False)
+
+    def peak_bytes(n):
+        path = tmp_path / f"{n}.jsonl"
+        path.write_text("".join(json.dumps({"id": str(i), "name": f"Object {i}", "data": {"price": i}}) + "\n" for i in range(n)))
+        store, node = ResultStore(), type("Node", (), {"name": "data-driven"})()
+        node.result_sink = store.add
+        tracemalloc.start()
+        try:
+            assert record_lifecycles(node, run_records(FakeObjectApi(), iter_records(str(path)))) == (n, 0)
+            assert len(store) == n and not hasattr(node, "recorded_results")
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak_bytes(100)  # imports and caches
+    small, large = peak_bytes(500), peak_bytes(5000)
+    assert large < small * 1.5, (small, large)
@@ -0,0 +1,98 @@
+import os
+import random
+
+import pytest
+
+from api import diskstore
+from api.client import FakeObjectApi
+from api.diskstore import DiskStore
+from api.indexes import matches, parse_conditions
+from api.store import STORE_PATH_ENV, ShardedStore, local_store
+
+
+def _objects(n, seed=1):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield str(i), {"id": str(i), "name": f"Object {i % 20}", "data": {"price": rng.randint(1, 1000)}}
+
+
+def test_fake_api_keeps_its_semantics_and_objects_across_reopens(tmp_path):
+    path = str(tmp_path / "objects.log")
+    with DiskStore(path) as store:
+        fake = FakeObjectApi(store)
+        object_id = fake.post({"name": "Apple", "data": {"price": 10}}).json()["id"]
+        gone = fake.post({"name": "Gone"}).json()["id"]
+        assert fake.get(object_id).json()["data"] == {"price": 10}
+        assert fake.put(object_id, {"name": "Pear"}).status_code == 200
+        assert fake.delete(gone).status_code == 200
+        assert [fake.get(gone).status_code, fake.put(gone, {"name": "x"}).status_code, fake.delete(gone).status_code] == [404] * 3
+        assert fake.post({}).status_code == 400
+        assert fake.list(name__like="x").status_code == 400
+        assert fake.list(name="Pear").json() == [{"id": object_id, "name": "Pear"}]
+
+    with DiskStore(path) as store:
+        assert store.stats()["recent"] == 0  # started from the snapshot, nothing replayed
+        assert len(store) == 1 and gone not in store
+        assert FakeObjectApi(store).get(object_id).json() == {"id": object_id, "name": "Pear"}
+
+
+def test_unclosed_store_recovers_from_its_log(tmp_path):
+    path = str(tmp_path / "objects.log")
+    store = DiskStore(path, checkpoint_every=50)
+    store.set_many(_objects(120))
+    store.set("new", {"id": "new", "name": "New"})
+    store.pop("7")
+    store.replace("8", {"id": "8", "name": "Eight"})
+    # the process dies: no close(), and its last write is cut short
+    store._index_mm.close()
+    store._mm.close()
+    os.close(store._fd)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x00\x00\x00")
+
+    with DiskStore(path) as reopened:
+        assert len(reopened) == 120
+        assert reopened.get("new") == {"id": "new", "name": "New"}
+        assert reopened.get("7") is None and reopened.get("8")["name"] == "Eight"
+        assert reopened.stats()["log_bytes"] == os.path.getsize(path)
+
+
+def test_snapshots_and_compaction_keep_the_same_objects(tmp_path, monkeypatch):
+    monkeypatch.setattr(diskstore, "COMPACT_MIN_BYTES", 4096)
+    rng = random.Random(5)
+    store, expected = DiskStore(str(tmp_path / "objects.log"), checkpoint_every=100), ShardedStore()
+    for object_id, obj in _objects(1000):
+        store.set(object_id, obj)
+        expected.set(object_id, obj)
+    for _ in range(5000):
+        object_id = str(rng.randrange(1200))
+        if rng.random() < 0.3:
+            assert store.pop(object_id) == expected.pop(object_id)
+        else:
+            obj = {"id": object_id, "name": "Changed", "data": {"price": rng.randint(1, 1000)}}
+            assert store.replace(object_id, obj) == expected.replace(object_id, obj)
+            if rng.random() < 0.2:
+                store.set(object_id, obj)
+                expected.set(object_id, obj)
+
+    assert store.compactions > 0
+    assert store.stats()["dead_bytes"] < store.stats()["log_bytes"]
+    everything = list(expected.select())
+    assert len(store) == len(expected) and sorted(map(str, store.select())) == sorted(map(str, everything))
+    parsed = parse_conditions({"name": "Changed", "price__lt": 300})
+    want = sorted(obj["id"] for obj in everything if matches(obj, parsed))
+    assert sorted(obj["id"] for obj in store.select({"name": "Changed", "price__lt": 300})) == want
+    assert store.get_many(["5", "nope", "6"]) == expected.get_many(["5", "nope", "6"])
+    store.close()
+
+
+def test_one_store_per_path_and_process(tmp_path, monkeypatch):
+    path = str(tmp_path / "objects.log")
+    monkeypatch.setenv(STORE_PATH_ENV, path)
+    store = local_store()
+    try:
+        assert local_store() is store and isinstance(store, DiskStore)
+        with pytest.raises(RuntimeError, match="FAKE_STORE_SHARED"):
+            DiskStore(path)
+    finally:
+        store.close()
@@ -0,0 +1,51 @@
+import os
+import stat
+
+import pytest
+
+from api.metrics import LatencyRecorder
+from utils.exporters import ColumnarExporter, JsonlExporter, ResultExporter, read_columnar, summarize
+from utils.results import ResultRecord
+
+
+def _records():
+    for i in range(7):
+        yield ResultRecord(f"S{i % 2}", "POST" if i < 4 else "GET", "Status code is 200", i != 3,
+                           payload={"name": f"o{i}"}, response={"id": str(i)})
+
+
+def _export(exporter_cls, tmp_path, **kwargs):
+    exporter = exporter_cls(str(tmp_path), **kwargs)
+    for r in _records():
+        exporter.add(r)
+    latency = LatencyRecorder()
+    latency.record("GET", 0.02)
+    return exporter.close(str(tmp_path / "result1"), latency)
+
+
+def test_columnar_export_spans_row_groups_and_keeps_latency(tmp_path):
+    path = _export(ColumnarExporter, tmp_path, row_group_size=3)
+    strings, columns, latency = read_columnar(path)
+    assert [strings[c] for c in columns["scenario"]] == [f"S{i % 2}" for i in range(7)]
+    assert list(columns["passed"]) == [1, 1, 1, 0, 1, 1, 1]
+    assert len(latency) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["result1.rcol"]
+
+
+def test_jsonl_and_columnar_summaries_agree(tmp_path):
+    old_umask = os.umask(0o022)
+    try:
+        paths = [_export(ColumnarExporter, tmp_path), _export(JsonlExporter, tmp_path)]
+    finally:
+        os.umask(old_umask)
+    assert [stat.S_IMODE(os.stat(path).st_mode) for path in paths] == [0o644, 0o644]
+    columnar, jsonl = summarize(paths[:1]), summarize(paths[1:])
+    assert columnar["by_status"] == jsonl["by_status"] == {"passed": 6, "failed": 1}
+    assert columnar["by_scenario"] == jsonl["by_scenario"]
+    assert columnar["by_action"]["POST"] == {"total": 4, "passed": 3, "failed": 1, "pass_rate": 0.75}
+    assert columnar["latency"]["GET"]["total"]["count"] == 1
+
+
+def test_exporters_must_implement_add(tmp_path):
+    with pytest.raises(TypeError, match="add"):
+        ResultExporter(str(tmp_path))
@@ -0,0 +1,141 @@
+import base64
+import json
+import os
+import re
+import stat
+import subprocess
+import time
+import zlib
+
+from api.metrics import LatencyRecorder
+from utils.history import HISTORY_FILE, RunHistory
+from utils.html_report import StreamingReportWriter, get_next_filename
+from utils.results import ResultRecord
+
+
+def _result(scenario, passed, step):
+    return ResultRecord(scenario, "GET", step, passed, payload={"name": "x"}, response={"id": "1"})
+
+
+def test_streaming_writer_groups_interleaved_rows_by_scenario(tmp_path):
+    writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False)
+    writer.add(_result("A", True, "step-a1"))
+    writer.add(_result("B", False, "step-b1"))
+    writer.add(_result("A", False, "step-a2"))
+
+    html = open(writer.close(), encoding="utf-8").read()
+    a, b = html.index("Scenario: A"), html.index("Scenario: B")
+    assert a < html.index("step-a1") < html.index("step-a2") < b < html.index("step-b1")
+    assert "Total: 2" in html and "Success Rate: 50.00%" in html
+    assert html.rstrip().endswith("</html>")
+
+
+def _bodies(html):
+    blob = re.search(r'<script id="report-bodies"[^>]*>(.*?)</script>', html, re.S).group(1)
+    return json.loads(zlib.decompress(base64.b64decode(blob)))
+
+
+def test_bodies_are_stored_once_capped_and_expanded_on_demand(tmp_path):
+    big = {"blob": "x" * 500}
+    writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False, max_body_chars=100)
+    for step in ("step-a1", "step-a2", "step-a3"):
+        writer.add(ResultRecord("A", "POST", step, True, payload={"name": "x"}, response=big))
+
+    html = open(writer.close(), encoding="utf-8").read()
+    assert "x" * 101 not in html
+    assert html.count('data-body="0"') == 3 and html.count('data-body="1"') == 3
+    (payload, payload_size), (response, response_size) = _bodies(html)
+    assert json.loads(payload) == {"name": "x"} and len(payload) == payload_size
+    assert len(response) == 100 and response_size == len(json.dumps(big, separators=(",", ":")))
+
+
+def test_dedup_remembers_only_the_most_recent_bodies(tmp_path):
+    writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False, background=False, max_dedup_bodies=2)
+    for step, body in enumerate(("a", "b", "a", "c", "b", "a")):
+        writer.add(ResultRecord("A", "GET", f"step-{step}", True, response={"id": body}))
+        assert len(writer._bodies) <= 2
+
+    html = open(writer.close(), encoding="utf-8").read()
+    # a, b, (a again), c evicts b, b is stored again and evicts a, a is stored again
+    assert [json.loads(text)["id"] for text, _ in _bodies(html)] == ["a", "b", "c", "b", "a"]
+    assert [html.count(f'data-body="{i}"') for i in range(5)] == [2, 1, 1, 1, 1]
+
+
+def test_next_filename_follows_highest_number(tmp_path):
+    for name in ("result3.html", "result10.html", "notes.html"):
+        (tmp_path / name).write_text("")
+    assert get_next_filename(str(tmp_path)) == "result11.html"
+
+
+def test_publish_skips_a_name_taken_by_a_concurrent_run(tmp_path):
+    writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False)
+    writer.add(_result("A", True, "step-a1"))
+    # Index is created by close(); result1.html appears in between, as if another run won the race
+    RunHistory(str(tmp_path / HISTORY_FILE)).close()
+    (tmp_path / "result1.html").write_text("other run")
+
+    assert writer.close().endswith("result2.html")
+    assert (tmp_path / "result1.html").read_text() == "other run"
+    assert sorted(p.name for p in tmp_path.glob("*.html")) == ["result1.html", "result2.html"]
+
+
+def test_published_report_follows_the_umask(tmp_path):
+    old_umask = os.umask(0o022)
+    try:
+        writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False)
+        writer.add(_result("A", True, "step-a1"))
+        assert stat.S_IMODE(os.stat(writer.close()).st_mode) == 0o644
+    finally:
+        os.umask(old_umask)
+
+
+def test_run_history_continues_numbering_and_tracks_scenario_trend(tmp_path):
+    (tmp_path / "result7.html").write_text("from before the index")
+    for passed in (True, False):
+        latency = LatencyRecorder()
+        latency.record("GET", 0.010, scenario="A")
+        latency.record("GET", 0.030, scenario="A")
+        writer = StreamingReportWriter(folder=str(tmp_path), open_browser=False)
+        writer.add(_result("A", True, "step-a1"))
+        writer.add(_result("A", passed, "step-a2"))
+        writer.close(latency)
+
+    history = RunHistory(str(tmp_path / HISTORY_FILE))
+    try:
+        assert [r["report_file"] for r in history.recent_runs()] == ["result9.html", "result8.html"]
+        trend = history.scenario_trend("A")
+        assert (trend["runs"], trend["pass_rate"]) == (2, 0.75)
+        assert trend["latency"]["GET"]["count"] == 4
+        assert 29 < trend["latency"]["GET"]["p95_ms"] <= 30
+    finally:
+        history.close()
+
+
+def test_rows_render_in_the_background_and_close_is_bounded(tmp_path, monkeypatch):
+    writer = StreamingReportWriter(folder=str(tmp_path))
+    assert not writer.open_browser  # opt-in via REPORT_OPEN_BROWSER
+    for i in range(200):
+        writer.add(_result("A", True, f"step-{i}"))
+    assert writer._worker.name == "report-writer"
+    html = open(writer.close(), encoding="utf-8").read()
+    assert "step-199" in html and "Total: 200" in html
+    assert 0 <= writer.flush_seconds <= writer.close_seconds
+
+    stuck = StreamingReportWriter(folder=str(tmp_path / "stuck"), flush_timeout=0.05)
+    monkeypatch.setattr(stuck, "_render", lambda r: time.sleep(1))
+    stuck.add(_result("A", True, "step-a1"))
+    start = time.perf_counter()
+    assert stuck.close() is None
+    assert time.perf_counter() - start < 0.5
+    assert not (tmp_path / "stuck").exists()
+
+
+def test_browser_opens_from_a_detached_process(tmp_path, monkeypatch):
+    launched = []
+    monkeypatch.setattr(subprocess, "Popen", lambda args, **kwargs: launched.append((args, kwargs)))
+    writer = StreamingReportWriter(folder=str(tmp_path), open_browser=True)
+    writer.add(_result("A", True, "step-a1"))
+    output_file = writer.close()
+    ((args, kwargs),) = launched
+    assert args[1:4] == ["-m", "webbrowser", "-t"] and args[4] == f"file://{os.path.abspath(output_file)}"
+    assert kwargs["start_new_session"]
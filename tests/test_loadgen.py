@@ -0,0 +1,26 @@
+import pytest
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from utils.lifecycle import LIFECYCLE_SCENARIO, create_object, delete_object, scenario_steps
+from utils.loadgen import run_load
+
+
+def test_scenario_steps_follow_the_feature_file():
+    steps = scenario_steps(LIFECYCLE_SCENARIO)
+    assert [keyword for keyword, _ in steps] == ["Given"] + ["When"] * 5
+    assert steps[1][1] is create_object and steps[4][1] is delete_object
+
+    with pytest.raises(ValueError):
+        scenario_steps("No such scenario")
+
+
+def test_open_loop_run_reaches_target_rate_on_fake_backend():
+    api = ObjectApi(None, recorder=LatencyRecorder(), live=False)
+    summary = run_load(api, rps=500, duration=0.5)
+
+    assert summary["requests"] == 250
+    assert summary["failed_iterations"] == 0
+    # GET after DELETE is the one expected 404 of each lifecycle
+    assert summary["status_classes"]["4xx"]["count"] == 50
+    assert set(summary["latency"]) == {"POST", "GET", "PUT", "DELETE"}
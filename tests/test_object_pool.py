@@ -0,0 +1,55 @@
+import time
+
+from api.client import FakeObjectApi, ObjectApi
+from api.metrics import LatencyRecorder
+from utils.object_pool import ObjectPool
+
+
+def _payloads():
+    return ({"name": f"Pooled {i}", "data": {"price": i}} for i in range(3))
+
+
+def test_pool_lends_copies_and_refills_what_is_taken():
+    fake = FakeObjectApi()
+    with ObjectPool(fake, _payloads(), size=5) as pool:
+        assert len(fake._store) == 5
+        borrowed = pool.checkout()
+        borrowed["name"] = "changed by the scenario"
+        pool.checkin(borrowed)
+        everything = [pool.checkout() for _ in range(5)]
+        assert sorted(obj["name"] for obj in everything) == ["Pooled 0", "Pooled 0", "Pooled 1", "Pooled 1", "Pooled 2"]
+        for obj in everything:
+            pool.checkin(obj)
+        assert fake.get(borrowed["id"]).json()["name"] != "changed by the scenario"
+
+        own = pool.take()
+        assert fake.delete(own["id"]).status_code == 200
+        deadline = time.monotonic() + 5
+        while pool.stats["created"] < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.stats["created"] == 6 and pool._available.qsize() == 5
+    assert len(fake._store) == 0
+    assert pool.stats["deleted"] == 5
+
+
+def test_pool_cuts_requests_to_the_live_api(standin_server):
+    def read_scenarios(api, n, pool=None):
+        before = standin_server.requests_seen
+        for i in range(n):
+            if pool is None:
+                object_id = api.post({"name": f"Read {i}"}).json()["id"]
+                assert api.get(object_id).status_code == 200
+                api.delete(object_id)
+            else:
+                obj = pool.checkout()
+                assert api.get(obj["id"]).status_code == 200
+                pool.checkin(obj)
+        return standin_server.requests_seen - before
+
+    with ObjectApi(standin_server.base_url, retries=0, recorder=LatencyRecorder(), live=True) as api:
+        own_objects = read_scenarios(api, 20)
+        before = standin_server.requests_seen
+        with ObjectPool(api, _payloads(), size=4) as pool:
+            pooled = read_scenarios(api, 20, pool)
+        assert standin_server.requests_seen - before == pooled + 4 + 4  # bulk create + bulk delete
+    assert (own_objects, pooled) == (60, 20)
@@ -0,0 +1,126 @@
+import random
+
+from api.client import FakeObjectApi, ObjectApi
+from api.indexes import SortedPairs, matches, parse_conditions
+from api.metrics import LatencyRecorder
+from api.server import DEFAULT_SEED_FILES, seed_store
+from api.diskstore import DiskStore
+from api.store import STORE_ADDRESS_ENV, STORE_AUTHKEY_ENV, ShardedStore, default_store, serve_store
+
+
+def test_sorted_pairs_match_a_sorted_list_under_churn():
+    SortedPairs.LOAD, load = 4, SortedPairs.LOAD  # small chunks, so splits and empty chunks happen
+    try:
+        rng = random.Random(7)
+        pairs, expected = SortedPairs(), set()
+        for i in range(2000):
+            pair = (rng.randint(0, 200), str(i % 300))
+            if pair in expected and rng.random() < 0.5:
+                pairs.remove(pair)
+                expected.discard(pair)
+            elif pair not in expected:
+                pairs.add(pair)
+                expected.add(pair)
+        assert len(pairs) == len(expected)
+        for low, high in ((None, None), (50, 60), (None, 10), (190, None), (300, None), (60, 50)):
+            want = [i for v, i in sorted(expected) if (low is None or v >= low) and (high is None or v <= high)]
+            assert list(pairs.between(low, high)) == want
+    finally:
+        SortedPairs.LOAD = load
+
+
+def test_indexed_queries_agree_with_a_full_scan_after_updates():
+    rng = random.Random(3)
+    store = ShardedStore(shards=4)
+    colors = ("Red", "Blue", "Purple")
+    for i in range(1500):  # half the objects are there when the first query builds the indexes
+        if i == 750:
+            assert len(list(store.select({"name": "Object 7"}))) == 15
+        data = {"Price": rng.randint(1, 1000), "color": rng.choice(colors)}
+        store.set(str(i), {"id": str(i), "name": f"Object {i % 50}", "data": data if i % 10 else None})
+    for i in range(1500, 3000):
+        price = rng.choice((rng.randint(1, 1000), rng.random() * 1000, f"{rng.randint(1, 20)}.99", True))
+        data = {"Price": price, "color": rng.choice(colors)}
+        store.set(str(i), {"id": str(i), "name": f"Object {i % 50}", "data": data if i % 10 else None})
+    for i in rng.sample(range(3000), 1000):
+        if i % 2:
+            store.pop(str(i))
+        else:
+            store.replace(str(i), {"id": str(i), "name": "Renamed", "data": {"price": i, "Color": "Red"}})
+
+    everything = list(store.select())
+    assert len(everything) == len(store)
+    for conditions in (
+        {"name": "Object 7"},
+        {"name": "Renamed", "price__lt": 900},
+        {"price__gte": 250.5, "price__lt": 260},
+        {"price": 100},
+        {"color": "Red", "price__gt": 990},
+        {"price__lt": "cheap"},
+        {"year__gt": 2000},
+        {"price": "7.99"},
+        {"price": "7.99", "color": "Red"},
+        {"price": 1},
+        {"price": True, "price__lte": 1},
+        {"name": ["unhashable"]},
+    ):
+        parsed = parse_conditions(conditions)
+        want = sorted(obj["id"] for obj in everything if matches(obj, parsed))
+        assert sorted(obj["id"] for obj in store.select(conditions)) == want, conditions
+
+
+def test_indexed_and_scanning_stores_agree_on_the_seed_data(tmp_path):
+    sharded, disk = ShardedStore(), DiskStore(str(tmp_path / "objects.log"))
+    try:
+        for store in (sharded, disk):
+            seed_store(store, DEFAULT_SEED_FILES)
+        everything = list(disk.select())
+        for conditions in ({"price": "419.99"}, {"price": 519.99}, {"price__lt": 500}, {"color": "Cloudy White"}):
+            parsed = parse_conditions(conditions)
+            want = sorted(obj["id"] for obj in everything if matches(obj, parsed))
+            assert sorted(o["id"] for o in sharded.select(conditions)) == want, conditions
+            assert sorted(o["id"] for o in disk.select(conditions)) == want, conditions
+        assert [o["id"] for o in FakeObjectApi(sharded).list(price="419.99").json()] == ["12"]
+    finally:
+        disk.close()
+
+
+def test_fake_collection_reads_list_get_many_and_page():
+    fake = FakeObjectApi()
+    ids = [fake.post({"name": f"obj {i % 3}", "data": {"price": i}}).json()["id"] for i in range(25)]
+
+    assert len(fake.list().json()) == 25
+    assert {o["data"]["price"] for o in fake.list(name="obj 1", price__lt=10).json()} == {1, 4, 7}
+    assert [o["id"] for o in fake.get_many([ids[3], "missing", ids[0]]).json()] == [ids[3], ids[0]]
+    pages = fake.iter_pages(page_size=10, price__gte=5)
+    assert [len(page.json()) for page in pages] == [10, 10]
+    response = fake.list(price__between=3)
+    assert response.status_code == 400 and "between" in response.json()["error"]
+
+
+def test_live_collection_reads_match_the_fake(standin_server):
+    store = ShardedStore()
+    seed_store(store, DEFAULT_SEED_FILES)
+    fake = FakeObjectApi(store)
+    with ObjectApi(standin_server.base_url, recorder=LatencyRecorder(), live=True) as api:
+        for conditions in ({}, {"price__lt": 500}, {"color": "Cloudy White"}, {"name": "Apple iPad Mini 5th Gen"}):
+            live = api.list(**conditions)
+            assert live.status_code == 200
+            assert sorted(o["id"] for o in live.json()) == sorted(o["id"] for o in fake.list(**conditions).json())
+        assert [o["id"] for o in api.get_many(["3", "5", "10"]).json()] == ["3", "5", "10"]
+        assert api.get_many([]).json() == fake.get_many([]).json() == []
+        assert [len(page.json()) for page in api.iter_pages(page_size=5)] == [5, 5, 3]
+
+
+def test_shared_store_answers_queries(monkeypatch):
+    # serve_store() overwrites the address; monkeypatch puts back the session's own (FAKE_STORE_SHARED=1)
+    monkeypatch.setenv(STORE_ADDRESS_ENV, "")
+    monkeypatch.setenv(STORE_AUTHKEY_ENV, "")
+    manager = serve_store()
+    try:
+        fake = FakeObjectApi(default_store())
+        for price in (10, 20, 30):
+            fake.post({"name": "shared", "data": {"price": price}})
+        assert sorted(o["data"]["price"] for o in FakeObjectApi(default_store()).list(price__gt=15).json()) == [20, 30]
+    finally:
+        manager.shutdown()
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+import requests
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, TokenBucket, parse_retry_after
+from api.server import StandinServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+
+def _live_api(base_url, **options):
+    options.setdefault("backoff_factor", 0.01)
+    return ObjectApi(base_url, recorder=LatencyRecorder(), live=True, **options)
+
+
+def test_token_bucket_spaces_calls_after_the_burst_and_pauses_on_demand():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.slept == [0.1, 0.1]
+
+    unlimited = TokenBucket(clock=clock, sleep=clock.sleep)
+    unlimited.acquire()
+    unlimited.pause(1.5)
+    unlimited.acquire()
+    assert clock.slept[-1] == 1.5
+
+
+def test_breaker_opens_fails_fast_and_closes_after_a_good_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=5, clock=clock)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 5
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 2
+
+    clock.now += 5
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_retry_policy_honours_retry_after_and_jitters_backoff():
+    policy = RetryPolicy(retries=3, backoff_factor=0.5, max_retry_after=10)
+    assert all(0 <= policy.delay(2) <= 2.0 for _ in range(100))
+    assert policy.delay(0, {"Retry-After": "2"}) == 2.0
+    assert policy.delay(0, {"Retry-After": "60"}) is None
+    assert policy.delay(3) is None
+    assert policy.retries_status("GET", 503) and policy.retries_status("POST", 429)
+    assert not policy.retries_status("POST", 503) and not policy.retries_status("GET", 500)
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+
+
+def test_idempotent_calls_are_retried_and_posts_are_not():
+    with StandinServer(error_rate=1.0, error_status=503) as server:
+        with _live_api(server.base_url, retries=3) as api:
+            assert api.get("1").status_code == 503
+            assert server.requests_seen == 4
+            assert api.post({"name": "x"}).status_code == 503
+            assert server.requests_seen == 5
+
+
+def test_retry_after_is_honoured_for_a_throttled_post():
+    with StandinServer(error_rate=1.0, error_status=429, retry_after=0.2) as server:
+        with _live_api(server.base_url, retries=1) as api:
+            start = time.perf_counter()
+            assert api.post({"name": "x"}).status_code == 429
+            assert time.perf_counter() - start >= 0.2
+            assert server.requests_seen == 2
+
+
+def test_outage_trips_the_breaker_and_recovery_closes_it():
+    breaker = CircuitBreaker(failure_threshold=4, reset_timeout=0.2)
+    with StandinServer(error_rate=1.0, error_status=503) as server:
+        with _live_api(server.base_url, retries=5, breaker=breaker) as api:
+            with pytest.raises(CircuitOpenError):
+                api.get("1")
+            assert server.requests_seen == 4
+            start = time.perf_counter()
+            with pytest.raises(CircuitOpenError):
+                api.get("1")
+            assert time.perf_counter() - start < 0.01 and server.requests_seen == 4
+
+            server.error_rate = 0.0
+            time.sleep(0.2)
+            assert api.get("1").status_code == 200
+            assert breaker.state == "closed"
+
+
+def test_hung_endpoint_times_out_within_the_deadline():
+    with StandinServer(latency="fixed:300") as server:
+        with _live_api(server.base_url, retries=5, timeout=0.05, deadline=0.3) as api:
+            start = time.perf_counter()
+            with pytest.raises(requests.Timeout):
+                api.get("1")
+            assert time.perf_counter() - start < 1.0
@@ -0,0 +1,33 @@
+import pytest
+
+from api import response as response_module
+from api.client import FakeObjectApi, ObjectApi
+from api.metrics import LatencyRecorder
+from api.response import ApiResponse
+
+
+def test_body_is_decoded_once_and_errors_are_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(response_module, "_loads", lambda b: calls.append(b) or response_module.json.loads(b))
+
+    ok = ApiResponse(200, b'{"id": "1"}')
+    assert ok.json() is ok.json() and calls == [b'{"id": "1"}']
+    assert bytes(ok.raw()[:4]) == b'{"id'
+
+    broken = ApiResponse(502, b"<html>bad gateway</html>")
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            broken.json()
+    assert len(calls) == 2 and broken.text.startswith("<html>")
+
+
+def test_fake_and_live_responses_share_one_shape(standin_server):
+    fake = ObjectApi("http://unused", recorder=LatencyRecorder(), live=False).post({"name": "x"})
+    with ObjectApi(standin_server.base_url, recorder=LatencyRecorder(), live=True) as api:
+        live = api.post({"name": "x"})
+    for response in (fake, live):
+        assert response.ok and response.json()["name"] == "x"
+        assert response.headers["content-type"] == "application/json"
+        assert response.elapsed > 0
+    assert live.ttfb is not None and fake.ttfb is None
+    assert FakeObjectApi().get("missing").content == b'{"error": "not found"}'
@@ -0,0 +1,50 @@
+import os
+import time
+from datetime import datetime
+
+from utils.results import RecordSpool, ResultRecord, ResultStore, decode_records, encode_records, iter_spooled_records
+
+
+def test_record_is_compact_and_formats_timestamp_lazily():
+    record = ResultRecord("".join(["Scen", "ario"]), "GET", "Status code is 200", 1)
+    assert record.scenario is ResultRecord("Scenario", "GET", "x", True).scenario
+    assert not hasattr(record, "__dict__")
+    assert record.passed is True
+    assert abs(datetime.strptime(record.timestamp, "%Y-%m-%d %H:%M:%S").timestamp() - time.time()) < 2
+
+
+def test_store_forwards_records_to_sinks_and_only_counts_them():
+    store, seen = ResultStore(), []
+    store.add_sink(seen.append)
+    record = ResultRecord("S", "GET", "step", False)
+    store.add(record)
+    assert seen == [record] and len(store) == 1
+    assert not hasattr(store, "_records")
+
+
+def test_records_survive_the_worker_to_controller_encoding():
+    record = ResultRecord("S", "POST", "Status code is 200", True, payload={"name": "x"}, response={"id": "1"})
+    (decoded,) = decode_records(encode_records([record]))
+    assert (decoded.scenario, decoded.action, decoded.step_description, decoded.passed) == ("S", "POST", "Status code is 200", True)
+    assert decoded.payload == {"name": "x"} and decoded.response == {"id": "1"}
+    assert abs(decoded.recorded_at - record.recorded_at) < 1e-6
+
+
+def test_spool_relays_small_tests_inline_and_large_ones_through_a_file():
+    small = RecordSpool(chunk_size=3)
+    small.add(ResultRecord("S", "GET", "step 0", True))
+    name, value = small.handoff()
+    assert name == "recorded_results" and [r.step_description for r in decode_records(value)] == ["step 0"]
+    assert RecordSpool().handoff() is None
+
+    large = RecordSpool(chunk_size=3)
+    for i in range(8):
+        large.add(ResultRecord("S", "GET", f"step {i}", i % 2 == 0, payload={"n": i}))
+    assert len(large._pending) == 2
+    name, path = large.handoff()
+    assert name == "recorded_results_file"
+    records = list(iter_spooled_records(path))
+    assert [(r.step_description, r.passed, r.payload) for r in records] == [
+        (f"step {i}", i % 2 == 0, {"n": i}) for i in range(8)
+    ]
+    assert not os.path.exists(path)
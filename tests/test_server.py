@@ -0,0 +1,44 @@
+import time
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.server import StandinServer, latency_distribution
+
+
+def _live_api(base_url):
+    return ObjectApi(base_url, retries=0, recorder=LatencyRecorder(), live=True)
+
+
+def test_standin_starts_fast_and_serves_seeded_objects():
+    start = time.perf_counter()
+    with StandinServer() as server:
+        assert time.perf_counter() - start < 1.0
+        with _live_api(server.base_url) as api:
+            response = api.get("1")
+            assert response.status_code == 200
+            assert response.json()["name"] == "Google Pixel 6 Pro"
+
+
+def test_live_lifecycle_against_standin(standin_server):
+    with _live_api(standin_server.base_url) as api:
+        created = api.post({"name": "Test Object", "data": {"year": 2024}})
+        assert created.status_code == 200
+        object_id = created.json()["id"]
+        assert api.get(object_id).json()["name"] == "Test Object"
+        assert api.put(object_id, {"name": "Updated"}).json()["name"] == "Updated"
+        assert api.delete(object_id).status_code == 200
+        assert api.get(object_id).status_code == 404
+        assert api.post({}).status_code == 400
+
+
+def test_error_injection_and_latency():
+    with StandinServer(latency="fixed:20", error_rate=1.0, error_status=429, retry_after=1) as server:
+        with _live_api(server.base_url) as api:
+            start = time.perf_counter()
+            response = api.get("1")
+            assert time.perf_counter() - start >= 0.02
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    assert latency_distribution(None) is None
+    assert 0.002 <= latency_distribution("uniform:2-10")() <= 0.010
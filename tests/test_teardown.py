@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from api.async_client import AsyncObjectApi
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from api.response import ApiResponse
+from api.server import StandinServer
+
+
+def _live_api(base_url, **options):
+    return ObjectApi(base_url, recorder=LatencyRecorder(), live=True, backoff_factor=0.01, **options)
+
+
+def test_live_client_deletes_what_it_left_behind(tmp_path):
+    leftovers = str(tmp_path / "leftovers.json")
+    with StandinServer() as server, _live_api(server.base_url) as api:
+        ids = [api.post({"name": f"Left {i}"}).json()["id"] for i in range(5)]
+        assert api.delete(ids[0]).status_code == 200
+        server.store.pop(ids[1])  # deleted behind the client's back
+        assert api.created.ids() == ids[1:]
+
+        cleanup = api.delete_leftovers(leftovers)
+        assert {k: cleanup[k] for k in ("objects", "deleted", "already_gone", "failed", "reclaimed")} == {
+            "objects": 4, "deleted": 3, "already_gone": 1, "failed": [], "reclaimed": 0,
+        }
+        assert len(api.created) == 0 and not any(object_id in server.store for object_id in ids)
+    assert json.load(open(leftovers)) == {}
+    assert ObjectApi("http://unused", live=False).delete_leftovers(leftovers) is None
+
+
+def test_ids_that_cannot_be_deleted_are_reclaimed_by_the_next_run(tmp_path):
+    leftovers = str(tmp_path / "leftovers.json")
+    with StandinServer() as server:
+        with _live_api(server.base_url, retries=0) as first_run:
+            ids = [first_run.post({"name": f"Stuck {i}"}).json()["id"] for i in range(3)]
+            server.error_rate = 1.0  # the backend goes down before the session ends
+            cleanup = first_run.delete_leftovers(leftovers, rounds=1)
+        assert cleanup["failed"] == ids
+        assert json.load(open(leftovers)) == {server.base_url: ids}
+
+        server.error_rate = 0.0
+        with _live_api(server.base_url) as second_run:
+            cleanup = second_run.delete_leftovers(leftovers)
+        assert (cleanup["reclaimed"], cleanup["deleted"], cleanup["failed"]) == (3, 3, [])
+        assert not any(object_id in server.store for object_id in ids)
+    assert json.load(open(leftovers)) == {}
+
+
+def test_async_client_of_its_own_deletes_what_it_left_behind(monkeypatch):
+    monkeypatch.setenv("LIVE_API", "1")
+
+    async def leave_objects(base_url):
+        async with AsyncObjectApi(base_url, concurrency=2, backoff_factor=0.01) as api:
+            created = [await api.post({"name": f"Orphan {i}"}) for i in range(3)]
+            await api.delete(created[0].json()["id"])
+            return [r.json()["id"] for r in created]
+
+    with StandinServer() as server:
+        ids = asyncio.run(leave_objects(server.base_url))
+        assert not any(object_id in server.store for object_id in ids)
+
+
+def test_a_non_json_200_is_returned_and_not_registered(monkeypatch):
+    api = _live_api("http://127.0.0.1:1/unused")
+    monkeypatch.setattr(api, "_call_live", lambda verb, path, payload=None: ApiResponse(200, b"<html>proxy</html>"))
+    response = api.post({"name": "Behind a proxy"})
+    assert response.status_code == 200 and response.content == b"<html>proxy</html>"
+    assert len(api.created) == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.validation import compile_schema, get_validator
+
+ITEM = {
+    "type": "object",
+    "required": ["sku", "price"],
+    "additionalProperties": False,
+    "properties": {
+        "sku": {"type": "string", "pattern": "^SKU-\\d+$"},
+        "price": {"type": "number", "minimum": 0},
+        "tags": {"type": "array", "items": {"enum": ["a", "b"]}, "maxItems": 2},
+    },
+}
+
+
+def test_compiled_validator_reports_every_error_with_its_path():
+    validate = compile_schema({"type": "object", "properties": {"items": {"type": "array", "items": ITEM}}})
+    assert validate({"items": [{"sku": "SKU-1", "price": 1.5, "tags": ["a"]}]}) == []
+    assert validate({"items": [{"sku": "X", "price": -1, "tags": ["c"], "extra": 1}, {"price": True}]}) == [
+        "$.items[0].sku: 'X' does not match '^SKU-\\\\d+$'",
+        "$.items[0].price: -1 outside [0, None]",
+        "$.items[0].tags[0]: 'c' not in ['a', 'b']",
+        "$.items[0]: unexpected field 'extra'",
+        "$.items[1]: missing required field 'sku'",
+        "$.items[1].price: expected number, got bool",
+    ]
+
+
+def test_validators_are_compiled_once_and_reject_unknown_keywords():
+    assert compile_schema(dict(ITEM)) is compile_schema(ITEM)
+    assert get_validator("object") is get_validator("object")
+    assert get_validator("object")({"id": "1", "name": "x", "data": None}) == []
+    with pytest.raises(ValueError, match="oneOf"):
+        compile_schema({"oneOf": []})
@@ -0,0 +1,182 @@
+"""
+Data-driven lifecycle runs: stream object records from JSON array or JSONL
+files (e.g. data/payload_single.json) and run the lifecycle scenario once per
+record. Files are read incrementally, so multi-million-row files never have
+to fit in memory; records run in batches, in parallel on a live backend.
+
+DATA_FILES (comma-separated paths/globs, relative to the project root)
+overrides the files named in the feature.
+"""
+import glob
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from utils.lifecycle import LIFECYCLE_SCENARIO, scenario_steps
+from utils.results import record_result
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+DEFAULT_BATCH_SIZE = 100
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def _iter_json_array(f):
+    """Yield the elements of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def more():
+        nonlocal buffer, pos, eof
+        chunk = f.read(_CHUNK_SIZE)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    def skip(pattern):
+        nonlocal pos
+        while True:
+            pos = pattern.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return
+            more()
+
+    skip(_WHITESPACE)
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError(f"Expected a JSON array in {f.name}")
+    pos += 1
+    while True:
+        skip(_SEPARATORS)
+        if pos == len(buffer):
+            raise ValueError(f"Unterminated JSON array in {f.name}")
+        if buffer[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more()
+            continue
+        if end == len(buffer) and not eof:
+            # a trailing number may continue in the next chunk
+            more()
+            continue
+        yield value
+        pos = end
+
+
+def _iter_file(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def expand_patterns(patterns):
+    """Comma-separated or listed paths/globs -> sorted, de-duplicated file list per pattern."""
+    if isinstance(patterns, str):
+        patterns = patterns.split(",")
+    files = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(PROJECT_ROOT, pattern)
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No data files match: {pattern}")
+        files.extend(m for m in matches if m not in files)
+    return files
+
+
+def iter_records(patterns):
+    """
+    Yield (tag, payload) per record, lazily. tag is "<file>#<n>" (1-based);
+    the record's own id is dropped since the API assigns one on create.
+    """
+    for path in expand_patterns(patterns):
+        source = os.path.basename(path)
+        for n, record in enumerate(_iter_file(path), 1):
+            payload = {k: v for k, v in record.items() if k != "id"}
+            yield f"{source}#{n}", payload
+
+
+# -----------------------------
+# Running
+# -----------------------------
+def run_record(api, steps, payload):
+    """Run the When steps of the lifecycle for one payload; returns (statuses, error)."""
+    context, statuses = {"payload": payload}, []
+    try:
+        for keyword, step in steps:
+            if keyword == "When":
+                step(api, context)
+                statuses.append(context["response"].status_code)
+    except Exception as e:
+        return tuple(statuses), f"{type(e).__name__}: {e}"
+    return tuple(statuses), None
+
+
+def run_records(api, records, batch_size=DEFAULT_BATCH_SIZE, concurrency=None, scenario=LIFECYCLE_SCENARIO):
+    """
+    Yield (tag, payload, statuses, error) for every (tag, payload) record, in
+    input order. Against a live backend `batch_size` records are pulled at a
+    time and run on `concurrency` threads, with one batch in flight while
+    the previous one is consumed (same pipelining as ObjectApi bulk calls).
+    """
+    steps = scenario_steps(scenario)
+    records = iter(records)
+    if not getattr(api, "live", True):
+        for tag, payload in records:
+            yield (tag, payload, *run_record(api, steps, payload))
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency or batch_size, thread_name_prefix="data-driven") as pool:
+        pending = []
+        while True:
+            batch = list(islice(records, batch_size))
+            submitted = [(tag, payload, pool.submit(run_record, api, steps, payload)) for tag, payload in batch]
+            for tag, payload, future in pending:
+                yield (tag, payload, *future.result())
+            if not submitted:
+                return
+            pending = submitted
+
+
+def lifecycle_passed(statuses, error):
+    # imported here: api.async_client pulls in asyncio, which collection doesn't need
+    from api.async_client import LIFECYCLE_EXPECTED
+
+    return error is None and statuses == LIFECYCLE_EXPECTED
+
+
+def record_lifecycles(node, record_results, action="N/A"):
+    """
+    record_result for every (tag, payload, statuses, error) of run_records as
+    it completes, so each reaches the test's result sink (and the report)
+    before the next record runs. Returns (total, failed).
+    """
+    total = failed = 0
+    for tag, payload, statuses, error in record_results:
+        passed = lifecycle_passed(statuses, error)
+        total += 1
+        failed += 0 if passed else 1
+        record_result(
+            node,
+            f"[{tag}] lifecycle returned {statuses}" + (f": {error}" if error else ""),
+            passed,
+            action=action,
+            payload=payload,
+            response={"statuses": list(statuses)},
+        )
+    return total, failed
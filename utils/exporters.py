@@ -0,0 +1,259 @@
+"""
+Machine-readable exports of the recorded results, written next to the HTML
+report (resultN.jsonl / resultN.rcol). Exporters are ResultStore sinks, so
+they stream records as they arrive; enable them with RESULT_EXPORTS=jsonl,columnar.
+
+- jsonl:    one JSON object per assertion, bodies included
+- columnar: row groups of dictionary-encoded columns (no bodies) plus the
+            run's latency histograms, compact and fast to aggregate
+
+    python -m utils.exporters reports/result*.rcol      (pass rates + latency over many runs)
+"""
+import abc
+import argparse
+import json
+import marshal
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from collections import Counter
+
+from api.metrics import LatencyRecorder
+from utils.html_report import REPORT_FOLDER, shareable_mode
+from utils.results import wall_clock
+
+COLUMNAR_MAGIC = b"RCOL1\n"
+ROW_GROUP_SIZE = 65536
+_FRAME = struct.Struct(">I")
+
+
+# -----------------------------
+# Exporters
+# -----------------------------
+class ResultExporter(abc.ABC):
+    """
+    Base sink: add() streams records into a temporary file in `folder`;
+    close(output_base, latency) finishes it as output_base + suffix, discard()
+    drops it.
+    """
+
+    suffix = ""
+    binary = False
+
+    def __init__(self, folder=REPORT_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+        fd, self._temp_file = tempfile.mkstemp(dir=folder, prefix=".export-", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb" if self.binary else "w", **({} if self.binary else {"encoding": "utf-8"}))
+
+    @abc.abstractmethod
+    def add(self, r):
+        """Append one ResultRecord."""
+
+    def _finish(self, latency):
+        pass
+
+    def close(self, output_base, latency=None):
+        self._finish(latency)
+        self._file.close()
+        output_file = output_base + self.suffix
+        os.chmod(self._temp_file, shareable_mode())
+        os.replace(self._temp_file, output_file)
+        return output_file
+
+    def discard(self):
+        self._file.close()
+        os.unlink(self._temp_file)
+
+
+class JsonlExporter(ResultExporter):
+    suffix = ".jsonl"
+
+    def add(self, r):
+        self._file.write(json.dumps({
+            "scenario": r.scenario,
+            "action": r.action,
+            "step": r.step_description,
+            "passed": r.passed,
+            "time": round(wall_clock(r.recorded_at), 6),
+            "payload": r.payload,
+            "response": r.response,
+        }, default=str))
+        self._file.write("\n")
+
+
+class ColumnarExporter(ResultExporter):
+    """
+    File layout: COLUMNAR_MAGIC, then length-prefixed zlib(marshal) frames:
+      ("rows", new_strings, {column: array bytes})   one per row group
+      ("latency", LatencyRecorder.dumps())           once, at the end
+    scenario/action/step are uint32 codes into a string table that grows by
+    `new_strings` per row group; passed is uint8, time is float64 wall clock.
+    """
+
+    suffix = ".rcol"
+    binary = True
+
+    def __init__(self, folder=REPORT_FOLDER, row_group_size=ROW_GROUP_SIZE):
+        super().__init__(folder)
+        self.row_group_size = row_group_size
+        self._codes = {}
+        self._new_strings = []
+        self._reset_columns()
+        self._file.write(COLUMNAR_MAGIC)
+
+    def _reset_columns(self):
+        self._columns = {
+            "scenario": array("I"),
+            "action": array("I"),
+            "step": array("I"),
+            "passed": array("B"),
+            "time": array("d"),
+        }
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._codes)
+            self._new_strings.append(value)
+        return code
+
+    def _write_frame(self, obj):
+        data = zlib.compress(marshal.dumps(obj), 6)
+        self._file.write(_FRAME.pack(len(data)))
+        self._file.write(data)
+
+    def _flush_rows(self):
+        if not len(self._columns["passed"]):
+            return
+        self._write_frame(("rows", self._new_strings, {name: column.tobytes() for name, column in self._columns.items()}))
+        self._new_strings = []
+        self._reset_columns()
+
+    def add(self, r):
+        columns = self._columns
+        columns["scenario"].append(self._code(r.scenario))
+        columns["action"].append(self._code(r.action))
+        columns["step"].append(self._code(r.step_description))
+        columns["passed"].append(1 if r.passed else 0)
+        columns["time"].append(wall_clock(r.recorded_at))
+        if len(columns["passed"]) >= self.row_group_size:
+            self._flush_rows()
+
+    def _finish(self, latency):
+        self._flush_rows()
+        if latency is not None:
+            self._write_frame(("latency", latency.dumps()))
+
+
+EXPORTERS = {
+    "jsonl": JsonlExporter,
+    "columnar": ColumnarExporter,
+}
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def read_columnar(path):
+    """Returns (strings, {column: array}, LatencyRecorder or None)."""
+    strings = []
+    columns = {"scenario": array("I"), "action": array("I"), "step": array("I"), "passed": array("B"), "time": array("d")}
+    latency = None
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"Not a columnar result file: {path}")
+        while True:
+            header = f.read(_FRAME.size)
+            if not header:
+                break
+            kind, *body = marshal.loads(zlib.decompress(f.read(_FRAME.unpack(header)[0])))
+            if kind == "rows":
+                new_strings, group = body
+                strings.extend(new_strings)
+                for name, data in group.items():
+                    columns[name].frombytes(data)
+            elif kind == "latency":
+                latency = LatencyRecorder.loads(body[0])
+    return strings, columns, latency
+
+
+class ResultSummary:
+    """Pass/fail counts per scenario, action and status, plus merged latency, over one or more files."""
+
+    def __init__(self):
+        self.by_scenario = Counter()  # (scenario, passed) -> n
+        self.by_action = Counter()  # (action, passed) -> n
+        self.latency = LatencyRecorder()
+        self.first = self.last = None
+
+    def _times(self, first, last):
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+
+    def add_columnar(self, path):
+        strings, columns, latency = read_columnar(path)
+        # Counter over zipped code columns counts in C; names are resolved once per distinct key
+        for key, counts in (("scenario", self.by_scenario), ("action", self.by_action)):
+            for (code, passed), n in Counter(zip(columns[key], columns["passed"])).items():
+                counts[strings[code], bool(passed)] += n
+        if columns["time"]:
+            self._times(min(columns["time"]), max(columns["time"]))
+        if latency is not None:
+            self.latency.merge(latency)
+
+    def add_jsonl(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                self.by_scenario[row["scenario"], row["passed"]] += 1
+                self.by_action[row["action"], row["passed"]] += 1
+                self._times(row["time"], row["time"])
+
+    def add(self, path):
+        if path.endswith(JsonlExporter.suffix):
+            self.add_jsonl(path)
+        else:
+            self.add_columnar(path)
+
+    @staticmethod
+    def _rates(counts):
+        grouped = {}
+        for (name, passed), n in counts.items():
+            entry = grouped.setdefault(name, {"total": 0, "passed": 0, "failed": 0})
+            entry["total"] += n
+            entry["passed" if passed else "failed"] += n
+        for entry in grouped.values():
+            entry["pass_rate"] = round(entry["passed"] / entry["total"], 4)
+        return dict(sorted(grouped.items()))
+
+    def summary(self):
+        passed = sum(n for (_, ok), n in self.by_scenario.items() if ok)
+        failed = sum(n for (_, ok), n in self.by_scenario.items() if not ok)
+        return {
+            "by_status": {"passed": passed, "failed": failed},
+            "by_scenario": self._rates(self.by_scenario),
+            "by_action": self._rates(self.by_action),
+            "first_time": self.first,
+            "last_time": self.last,
+            "latency": self.latency.summary()["by_verb"],
+        }
+
+
+def summarize(paths):
+    summary = ResultSummary()
+    for path in paths:
+        summary.add(path)
+    return summary.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate exported results (.rcol or .jsonl).")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+    print(json.dumps(summarize(args.paths), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Run-history index for the reports folder (SQLite).
+
+Every report gets its run number from here, so numbering no longer lists
+the reports directory, and per-run summaries (pass counts per scenario and
+latency histograms per scenario/verb) are queryable without reparsing HTML:
+
+    python -m utils.history "Successfully create, retrieve, update and delete an object" --last 500
+"""
+import argparse
+import json
+import marshal
+import os
+import sqlite3
+import time
+
+from api.metrics import LatencyHistogram
+
+HISTORY_FILE = "history.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_number  INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    report_file TEXT,
+    total       INTEGER,
+    passed      INTEGER
+);
+CREATE TABLE IF NOT EXISTS scenario_results (
+    scenario    TEXT NOT NULL,
+    run_number  INTEGER NOT NULL,
+    total       INTEGER NOT NULL,
+    passed      INTEGER NOT NULL,
+    PRIMARY KEY (scenario, run_number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scenario_latency (
+    scenario    TEXT NOT NULL,
+    verb        TEXT NOT NULL,
+    run_number  INTEGER NOT NULL,
+    histogram   BLOB NOT NULL,
+    PRIMARY KEY (scenario, verb, run_number)
+) WITHOUT ROWID;
+"""
+
+
+class RunHistory:
+    """
+    Append-only index of runs. allocate_run() is a single INSERT, so run
+    numbers are O(1) and unique even across concurrent processes.
+    `existing_runs` is called once, when the index is first created, to
+    continue numbering after reports that predate it.
+    """
+
+    def __init__(self, path, existing_runs=None):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        # IMMEDIATE: two processes creating the index at once must not both seed it
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            fresh = not self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'runs'"
+            ).fetchone()
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    self._conn.execute(statement)
+            if fresh and existing_runs is not None:
+                last = existing_runs()
+                if last:
+                    self._conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('runs', ?)", (last,))
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def close(self):
+        self._conn.close()
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+    def allocate_run(self):
+        with self._conn:
+            return self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),)).lastrowid
+
+    def finish_run(self, run_number, report_file, scenarios, latency=None):
+        """
+        scenarios: {scenario: (total, passed)}
+        latency:   LatencyRecorder; its per-scenario total-time histograms are stored
+        """
+        total = sum(t for t, _ in scenarios.values())
+        passed = sum(p for _, p in scenarios.values())
+        with self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, report_file = ?, total = ?, passed = ? WHERE run_number = ?",
+                (time.time(), report_file, total, passed, run_number),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scenario_results VALUES (?, ?, ?, ?)",
+                [(scenario, run_number, t, p) for scenario, (t, p) in scenarios.items()],
+            )
+            if latency is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scenario_latency VALUES (?, ?, ?, ?)",
+                    [
+                        (scenario, verb, run_number, marshal.dumps(histogram.to_state()))
+                        for (scenario, verb), histogram in latency.histograms().items()
+                        if scenario is not None
+                    ],
+                )
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def recent_runs(self, last=20):
+        rows = self._conn.execute(
+            "SELECT run_number, started_at, report_file, total, passed FROM runs "
+            "WHERE finished_at IS NOT NULL ORDER BY run_number DESC LIMIT ?",
+            (last,),
+        ).fetchall()
+        return [
+            {"run_number": n, "started_at": started, "report_file": report, "total": total, "passed": passed}
+            for n, started, report, total, passed in rows
+        ]
+
+    def scenario_trend(self, scenario, last=500):
+        """Pass rate and merged latency percentiles of one scenario over its last `last` runs."""
+        rows = self._conn.execute(
+            "SELECT run_number, total, passed FROM scenario_results "
+            "WHERE scenario = ? ORDER BY run_number DESC LIMIT ?",
+            (scenario, last),
+        ).fetchall()
+        if not rows:
+            return {"scenario": scenario, "runs": 0, "pass_rate": None, "latency": {}}
+
+        total = sum(t for _, t, _ in rows)
+        passed = sum(p for _, _, p in rows)
+        merged = {}
+        for verb, blob in self._conn.execute(
+            "SELECT verb, histogram FROM scenario_latency WHERE scenario = ? AND run_number >= ?",
+            (scenario, rows[-1][0]),
+        ):
+            merged.setdefault(verb, LatencyHistogram()).merge(LatencyHistogram.from_state(marshal.loads(blob)))
+
+        return {
+            "scenario": scenario,
+            "runs": len(rows),
+            "first_run": rows[-1][0],
+            "last_run": rows[0][0],
+            "pass_rate": round(passed / total, 4) if total else None,
+            "latency": {verb: histogram.summary() for verb, histogram in sorted(merged.items())},
+        }
+
+
+def main(argv=None):
+    from utils.html_report import REPORT_FOLDER
+
+    parser = argparse.ArgumentParser(description="Query the report run history.")
+    parser.add_argument("scenario", nargs="?", help="scenario name; omit to list recent runs")
+    parser.add_argument("--last", type=int, default=500)
+    parser.add_argument("--history", default=os.path.join(REPORT_FOLDER, HISTORY_FILE))
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.history)
+    try:
+        if args.scenario:
+            result = history.scenario_trend(args.scenario, args.last)
+        else:
+            result = history.recent_runs(args.last)
+    finally:
+        history.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,34 @@
+import base64
+import hashlib
+import json
+import marshal
 import os
-import webbrowser
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
 from datetime import datetime
-from collections import defaultdict
 
-REPORT_FOLDER = os.path.join(os.path.dirname(__file__), "..", "reports")
-os.makedirs(REPORT_FOLDER, exist_ok=True)
+# Created by StreamingReportWriter.close(), not at import
+REPORT_FOLDER = os.getenv("REPORT_DIR") or os.path.join(os.path.dirname(__file__), "..", "reports")
+
+# Payload/response bodies longer than this (characters of JSON) are cut, with a marker
+MAX_BODY_CHARS = int(os.getenv("REPORT_MAX_BODY_CHARS") or 64 * 1024)
+
+# Distinct bodies remembered for deduplication (least recently used ones are forgotten, so a
+# body that comes back after that many others is stored again); ~150 bytes each
+MAX_DEDUP_BODIES = int(os.getenv("REPORT_DEDUP_BODIES") or 20_000)
+
+# Opening the finished report in a browser is opt-in (REPORT_OPEN_BROWSER=1); never wanted on CI
+OPEN_BROWSER = os.getenv("REPORT_OPEN_BROWSER", "").strip().lower() in {"1", "true", "yes", "y"}
+
+# Longest close() waits for the background renderer to catch up before giving up on the report
+FLUSH_TIMEOUT = float(os.getenv("REPORT_FLUSH_TIMEOUT") or 60)
+
+_STOP = object()
 
 
 # -----------------------------
@@ -27,9 +51,9 @@ def pretty_format(data: dict, indent: int = 0) -> str:
 # -----------------------------
 # Filename Generator
 # -----------------------------
-def get_next_filename():
+def get_next_filename(folder=REPORT_FOLDER):
     existing_files = [
-        f for f in os.listdir(REPORT_FOLDER)
+        f for f in os.listdir(folder)
         if f.startswith("result") and f.endswith(".html")
     ]
 
@@ -44,19 +68,43 @@ def get_next_filename():
     return f"result{next_number}.html"
 
 
-# -----------------------------
-# Generate HTML
-# -----------------------------
-def generate_html(results):
+def shareable_mode():
+    """0o666 less the umask: what a plain open() would have given the file (mkstemp gives 0o600)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _publish(temp_file, folder, next_name):
+    """
+    Give a finished report the name returned by next_name(), e.g.
+    ("result12.html", 12). os.link fails if the name already exists, so
+    concurrent runs can't overwrite each other: the loser just asks for
+    another name. Returns (path, run number).
+    """
+    try:
+        os.chmod(temp_file, shareable_mode())
+        while True:
+            name, run = next_name()
+            output_file = os.path.join(folder, name)
+            try:
+                os.link(temp_file, output_file)
+                return output_file, run
+            except FileExistsError:
+                continue
+    finally:
+        os.unlink(temp_file)
 
-    grouped_results = defaultdict(list)
-    for r in results:
-        grouped_results[r["scenario"]].append(r)
 
-    filename = get_next_filename()
-    output_file = os.path.join(REPORT_FOLDER, filename)
+def _run_number(filename):
+    return int(filename[len("result"):-len(".html")])
 
-    html = f"""
+
+# -----------------------------
+# HTML Fragments
+# -----------------------------
+def _report_head():
+    return f"""
     <html>
     <head>
         <title>Test Report</title>
@@ -190,6 +238,16 @@ def generate_html(results):
             overflow-y:auto;
         }}
 
+        pre.body {{
+            cursor:pointer;
+            color:#1d4ed8;
+        }}
+
+        pre.body.expanded {{
+            cursor:auto;
+            color:inherit;
+        }}
+
         /* ================= MOBILE ================= */
 
         @media screen and (max-width:768px) {{
@@ -240,16 +298,12 @@ def generate_html(results):
         </div>
     """
 
-    # ================= TABLE PER SCENARIO =================
-
-    for scenario, scenario_results in grouped_results.items():
 
-        total = len(scenario_results)
-        passed_count = sum(1 for r in scenario_results if r["passed"])
-        failed_count = total - passed_count
-        success_rate = f"{(passed_count/total*100):.2f}%" if total > 0 else "N/A"
+def _scenario_head(scenario, total, passed_count):
+    failed_count = total - passed_count
+    success_rate = f"{(passed_count/total*100):.2f}%" if total > 0 else "N/A"
 
-        html += f"""
+    return f"""
         <div class="summary">
             <div class="total">Total: {total}</div>
             <div class="passed">Passed: {passed_count}</div>
@@ -283,47 +337,355 @@ def generate_html(results):
             <tbody>
         """
 
-        for r in scenario_results:
 
-            status_class = "passed" if r["passed"] else "failed"
-            step_description = r.get("step_description", "")
-            action = r.get("action", "N/A")
-            timestamp = r.get("timestamp", "N/A")
-            payload = pretty_format(r.get("payload")) if r.get("payload") else "N/A"
-            response = pretty_format(r.get("response")) if r.get("response") else "N/A"
+def _size_label(chars):
+    return f"{chars / 1024:.1f} KB" if chars >= 1024 else f"{chars} B"
+
+
+def _body_cell(ref):
+    """ref: (index into the bodies blob, JSON size) or None for an empty body."""
+    if ref is None:
+        return "<pre>N/A</pre>"
+    index, size = ref
+    return f'<pre class="body" data-body="{index}">Show ({_size_label(size)})</pre>'
 
-            html += f"""
+
+def _result_row(r, payload, response):
+    """payload / response: already rendered cell contents (see _body_cell)."""
+    status_class = "passed" if r.passed else "failed"
+
+    return f"""
             <tr class="{status_class}">
-                <td data-label="Timestamp">{timestamp}</td>
-                <td data-label="Assertion / Step">{step_description}</td>
-                <td data-label="Action">{action}</td>
+                <td data-label="Timestamp">{r.timestamp}</td>
+                <td data-label="Assertion / Step">{r.step_description}</td>
+                <td data-label="Action">{r.action}</td>
                 <td data-label="Status">
                     <span class="status-badge {status_class}">
-                        {'PASSED' if r['passed'] else 'FAILED'}
+                        {'PASSED' if r.passed else 'FAILED'}
                     </span>
                 </td>
-                <td data-label="Payload"><pre>{payload}</pre></td>
-                <td data-label="Response"><pre>{response}</pre></td>
+                <td data-label="Payload">{payload}</td>
+                <td data-label="Response">{response}</td>
             </tr>
             """
 
-        html += """
+
+def _latency_section(latency):
+    """API latency table from LatencyRecorder.summary(): run-wide per verb, then per scenario."""
+    rows = [("All scenarios", verb, phases["total"]) for verb, phases in latency["by_verb"].items()]
+    for scenario, verbs in latency["by_scenario"].items():
+        rows.extend((scenario, verb, phases["total"]) for verb, phases in verbs.items())
+    if not rows:
+        return ""
+
+    body = "".join(f"""
+                <tr>
+                    <td data-label="Scenario">{scenario}</td>
+                    <td data-label="Verb">{verb}</td>
+                    <td data-label="Calls">{stats['count']}</td>
+                    <td data-label="p50 (ms)">{stats['p50_ms']}</td>
+                    <td data-label="p90 (ms)">{stats['p90_ms']}</td>
+                    <td data-label="p99 (ms)">{stats['p99_ms']}</td>
+                    <td data-label="Max (ms)">{stats['max_ms']}</td>
+                </tr>""" for scenario, verb, stats in rows)
+
+    return f"""
+        <h2 style="text-align:center;">API Latency</h2>
+
+        <table>
+            <thead>
+                <tr>
+                    <th>Scenario</th>
+                    <th>Verb</th>
+                    <th>Calls</th>
+                    <th>p50 (ms)</th>
+                    <th>p90 (ms)</th>
+                    <th>p99 (ms)</th>
+                    <th>Max (ms)</th>
+                </tr>
+            </thead>
+
+            <tbody>{body}
+            </tbody>
+        </table>
+        """
+
+
+_SCENARIO_FOOT = """
             </tbody>
         </table>
         """
 
-    html += """
+# Bodies are a base64, zlib-compressed JSON array of [json text, full size] entries,
+# decoded once on the first click and rendered per cell like pretty_format().
+_BODIES_SCRIPT = """
+    <script id="report-bodies" type="application/octet-stream">%s</script>
+    <script>
+    let bodies = null;
+
+    async function loadBodies() {
+        const b64 = document.getElementById("report-bodies").textContent.trim();
+        const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+        return JSON.parse(await new Response(stream).text());
+    }
+
+    function pretty(data, indent) {
+        return Object.entries(data).map(([k, v]) =>
+            (v !== null && typeof v === "object" && !Array.isArray(v))
+                ? "  ".repeat(indent) + k + ":\\n" + pretty(v, indent + 1)
+                : "  ".repeat(indent) + k + ": " + (typeof v === "object" ? JSON.stringify(v) : v)
+        ).join("\\n");
+    }
+
+    function render(text, size) {
+        if (text.length < size) {
+            return text + "\\n... [truncated, " + size + " characters in total]";
+        }
+        const data = JSON.parse(text);
+        return (data !== null && typeof data === "object" && !Array.isArray(data)) ? pretty(data, 0) : text;
+    }
+
+    document.addEventListener("click", async (event) => {
+        const cell = event.target.closest("pre.body:not(.expanded)");
+        if (!cell) return;
+        bodies = bodies || await loadBodies();
+        const [text, size] = bodies[Number(cell.dataset.body)];
+        cell.textContent = render(text, size);
+        cell.classList.add("expanded");
+    });
+    </script>
+"""
+
+_REPORT_FOOT = """
     </body>
     </html>
     """
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(html)
 
-    print(f"\nResponsive HTML report generated: {output_file}")
+# -----------------------------
+# Streaming Writer
+# -----------------------------
+class StreamingReportWriter:
+    """
+    Builds the report incrementally instead of as one big string.
+
+    add() only queues the result: a background thread renders it and appends
+    it to a temporary spool file for its scenario, so rendering stays off the
+    tests' critical path; only per-scenario counters stay in memory.
+    With background=False results are rendered inline instead.
+    Payload and response bodies are not rendered into the rows: each distinct
+    body (by content hash) is stored once, capped at max_body_chars, in a
+    compressed blob that the page expands on click. The blob is spooled to a
+    temp file too, and only the max_dedup_bodies most recently seen digests
+    are remembered, so memory stays flat when every body is unique (the
+    lifecycle's responses carry their own ids); a body that recurs after that
+    many others is stored again.
+    close() waits (at most flush_timeout seconds) for the queue to drain,
+    then writes the header, the optional latency table, every scenario's
+    summary followed by its spooled rows, and renames the result to
+    resultN.html, where N comes from the run-history index
+    (utils/history.py), not a directory listing. The run's per-scenario
+    counts and latency are indexed as well. The time close() took is kept
+    in close_seconds (flush_seconds of it waiting for the renderer).
+    """
+
+    def __init__(self, folder=REPORT_FOLDER, open_browser=OPEN_BROWSER, max_body_chars=MAX_BODY_CHARS,
+                 background=True, flush_timeout=FLUSH_TIMEOUT, max_dedup_bodies=MAX_DEDUP_BODIES):
+        self.folder = folder
+        self.open_browser = open_browser
+        self.max_body_chars = max_body_chars
+        self.max_dedup_bodies = max_dedup_bodies
+        self.background = background
+        self.flush_timeout = flush_timeout
+        self.flush_seconds = self.close_seconds = None
+        self._scenarios = {}  # scenario -> [spool file, total, passed]
+        self._bodies = OrderedDict()  # body digest -> (index, size), least recently used first
+        self._body_count = 0
+        self._compressor = zlib.compressobj(6)
+        self._blob = None  # spool file of the compressed bodies, created with the first body
+        self._queue = queue.SimpleQueue()
+        self._worker = None  # started by the first add(), in the process that reports
+        self._worker_lock = threading.Lock()
+        self._error = None
+        self._closed = False
+
+    def _body_ref(self, data):
+        if not data:
+            return None
+        # marshal is several times cheaper than JSON for hashing; JSON is only built for new bodies
+        try:
+            key, text = marshal.dumps(data), None
+        except ValueError:  # not a plain JSON-like structure
+            text = json.dumps(data, separators=(",", ":"), default=str)
+            key = text.encode()
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        ref = self._bodies.get(digest)
+        if ref is not None:
+            self._bodies.move_to_end(digest)
+            return ref
+        if text is None:
+            text = json.dumps(data, separators=(",", ":"), default=str)
+        ref = self._bodies[digest] = (self._body_count, len(text))
+        if len(self._bodies) > self.max_dedup_bodies:
+            self._bodies.popitem(last=False)
+        entry = json.dumps([text[:self.max_body_chars], len(text)])
+        self._blob_file().write(self._compressor.compress((b"," if self._body_count else b"") + entry.encode()))
+        self._body_count += 1
+        return ref
+
+    def _cell(self, data):
+        return _body_cell(self._body_ref(data))
+
+    def add(self, r):
+        if not self.background:
+            self._render(r)
+            return
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    # daemon: a stuck renderer must never keep the process alive
+                    self._worker = threading.Thread(target=self._run, name="report-writer", daemon=True)
+                    self._worker.start()
+        self._queue.put(r)
+
+    def _run(self):
+        while True:
+            r = self._queue.get()
+            if r is _STOP:
+                return
+            if self._error is None:
+                try:
+                    self._render(r)
+                except Exception as e:  # reported by close(); keep draining so close() isn't stuck
+                    self._error = e
+
+    def _flush(self):
+        """Stop the renderer once it has drained the queue; False if that took longer than flush_timeout."""
+        if self._worker is None:
+            return True
+        self._queue.put(_STOP)
+        self._worker.join(self.flush_timeout)
+        return not self._worker.is_alive()
+
+    def _render(self, r):
+        entry = self._scenarios.get(r.scenario)
+        if entry is None:
+            spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+            entry = self._scenarios[r.scenario] = [spool, 0, 0]
+        entry[0].write(_result_row(r, self._cell(r.payload), self._cell(r.response)))
+        entry[1] += 1
+        entry[2] += 1 if r.passed else 0
+
+    def _blob_file(self):
+        if self._blob is None:
+            self._blob = tempfile.TemporaryFile()
+            self._blob.write(self._compressor.compress(b"["))
+        return self._blob
+
+    def _write_blob(self, f):
+        """Base64 of the compressed bodies array, from the spool a chunk at a time."""
+        self._blob_file().write(self._compressor.compress(b"]") + self._compressor.flush())
+        self._blob.seek(0)
+        while True:
+            chunk = self._blob.read(3 * 65536)  # whole 3-byte groups: the chunks' base64 concatenates
+            if not chunk:
+                break
+            f.write(base64.b64encode(chunk).decode("ascii"))
+        self._blob.close()
+        self._blob = None
+
+    def close(self, latency=None):
+        """latency: optional LatencyRecorder for the run."""
+        if self._closed:
+            return None
+        self._closed = True
+
+        start = time.perf_counter()
+        flushed = self._flush()
+        self.flush_seconds = time.perf_counter() - start
+        if not flushed:
+            print(f"\nHTML report skipped: results still rendering after {self.flush_timeout:g} s")
+            return None
+        if self._error is not None:
+            raise self._error
+
+        os.makedirs(self.folder, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(dir=self.folder, prefix=".result-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_report_head())
+            if latency:
+                f.write(_latency_section(latency.summary()))
+
+            # ================= TABLE PER SCENARIO =================
+            for scenario, (spool, total, passed_count) in self._scenarios.items():
+                f.write(_scenario_head(scenario, total, passed_count))
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+                spool.close()
+                f.write(_SCENARIO_FOOT)
+
+            head, tail = _BODIES_SCRIPT.split("%s")
+            f.write(head)
+            self._write_blob(f)
+            f.write(tail)
+            f.write(_REPORT_FOOT)
+        counts = {scenario: (total, passed_count) for scenario, (_, total, passed_count) in self._scenarios.items()}
+        self._scenarios.clear()
+        self._bodies.clear()
+
+        from utils.history import HISTORY_FILE, RunHistory
+
+        # Reports from before the index existed keep their numbers; it continues after them
+        history = RunHistory(
+            os.path.join(self.folder, HISTORY_FILE),
+            existing_runs=lambda: _run_number(get_next_filename(self.folder)) - 1,
+        )
+        try:
+            def next_name():
+                run = history.allocate_run()
+                return f"result{run}.html", run
+
+            output_file, run = _publish(temp_file, self.folder, next_name)
+            history.finish_run(run, os.path.basename(output_file), counts, latency)
+        finally:
+            history.close()
+
+        self.close_seconds = time.perf_counter() - start
+        print(f"\nResponsive HTML report generated: {output_file} "
+              f"(finalized in {self.close_seconds * 1000:.0f} ms, {self.flush_seconds * 1000:.0f} ms of it flushing)")
+
+        if self.open_browser:
+            _open_in_browser(output_file)
+
+        return output_file
+
+
+def _open_in_browser(output_file):
+    """
+    Open the report from a detached process: webbrowser can block for a long
+    time without a display, and a thread of ours could be cut off by the
+    interpreter exiting right after the run.
+    """
+    import subprocess
+    import sys
 
     try:
-        webbrowser.open(f"file://{os.path.abspath(output_file)}")
-        print("Report opened in browser.")
-    except Exception as e:
-        print(f"Failed to open browser automatically: {e}")
\ No newline at end of file
+        subprocess.Popen(
+            [sys.executable, "-m", "webbrowser", "-t", f"file://{os.path.abspath(output_file)}"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        print(f"Failed to open browser automatically: {e}")
+
+
+# -----------------------------
+# Generate HTML
+# -----------------------------
+def generate_html(results, folder=REPORT_FOLDER, open_browser=OPEN_BROWSER, latency=None):
+    # everything is already collected, so there is nothing to overlap with: render inline
+    writer = StreamingReportWriter(folder, open_browser, background=False)
+    for r in results:
+        writer.add(r)
+    return writer.close(latency)
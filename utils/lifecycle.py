@@ -0,0 +1,140 @@
+"""
+The object lifecycle step vocabulary, shared by the pytest-bdd step module
+and the load generator. Every step takes the same `context` dict; When steps
+also take an ObjectApi (or anything with post/get/put/delete).
+"""
+import os
+import re
+
+FEATURE_FILE = os.path.join(os.path.dirname(__file__), "..", "features", "object_lifecycle.feature")
+LIFECYCLE_SCENARIO = "Successfully create, retrieve, update and delete an object"
+
+
+# ---------------------------
+# HELPER
+# ---------------------------
+def safe_json(response):
+    """
+    JSON body of an ApiResponse (decoded once, cached on the response), or
+    {"raw_text": ...} if the body isn't JSON.
+    """
+    try:
+        return response.json()
+    except ValueError:
+        return {"raw_text": response.text}
+
+
+# ---------------------------
+# GIVEN STEPS
+# ---------------------------
+def valid_object_payload(context):
+    context["payload"] = {
+        "name": "Test Object",
+        "data": {
+            "year": 2024,
+            "price": 1000
+        }
+    }
+
+def invalid_object_payload(context):
+    context["payload"] = {}
+
+def non_existing_object_id(context):
+    context["object_id"] = "999999999"
+
+
+# ---------------------------
+# WHEN STEPS
+# ---------------------------
+def create_object(api, context):
+    context["action"] = "POST request to create the object"
+    response = api.post(context["payload"])
+    context["response"] = response
+    if response.status_code == 200:
+        json_data = safe_json(response)
+        context["object_id"] = json_data["id"]
+        context["created_name"] = json_data["name"]
+
+def get_object(api, context):
+    context["action"] = "GET request using the stored object id"
+    response = api.get(context["object_id"])
+    context["response"] = response
+
+def update_object(api, context):
+    context["action"] = "PUT request to update the object"
+    updated_payload = {"name": "Updated Object Name"}
+    response = api.put(context["object_id"], updated_payload)
+    context["response"] = response
+    context["updated_name"] = updated_payload["name"]
+
+def delete_object(api, context):
+    context["action"] = "DELETE request using the stored object id"
+    response = api.delete(context["object_id"])
+    context["response"] = response
+
+def get_deleted_object(api, context):
+    context["action"] = "GET request using the deleted object id"
+    response = api.get(context["object_id"])
+    context["response"] = response
+
+def get_non_existing_object(api, context):
+    context["action"] = "GET request using non-existing id"
+    response = api.get(context["object_id"])
+    context["response"] = response
+
+
+GIVEN_STEPS = {
+    "I have a valid object payload": valid_object_payload,
+    "I have an invalid object payload": invalid_object_payload,
+    "I have a non-existing object id": non_existing_object_id,
+}
+
+WHEN_STEPS = {
+    "I send a POST request to create the object": create_object,
+    "I send a GET request using the stored object id": get_object,
+    "I update the object with a new name": update_object,
+    "I send a DELETE request using the stored object id": delete_object,
+    "I send a GET request using the deleted object id": get_deleted_object,
+    "I send a GET request using that id": get_non_existing_object,
+}
+
+
+# ---------------------------
+# Feature -> step plan
+# ---------------------------
+_STEP_LINE = re.compile(r"^\s*(Given|When|Then|And|But)\s+(.*?)\s*$")
+
+
+def scenario_steps(scenario=LIFECYCLE_SCENARIO, feature_file=FEATURE_FILE):
+    """
+    The Given/When steps of one scenario as (keyword, function) pairs, in
+    feature order. Then steps are assertions and are skipped. Raises
+    ValueError for an unknown scenario or a step outside the vocabulary.
+    """
+    steps, keyword, found = [], None, False
+    with open(feature_file, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("Scenario:"):
+                if found:
+                    break
+                found = stripped[len("Scenario:"):].strip() == scenario
+                continue
+            match = _STEP_LINE.match(line) if found else None
+            if not match:
+                continue
+            if match.group(1) not in ("And", "But"):
+                keyword = match.group(1)
+            text = match.group(2)
+            if keyword == "Given":
+                if text not in GIVEN_STEPS:
+                    raise ValueError(f"Unsupported Given step: {text}")
+                steps.append(("Given", GIVEN_STEPS[text]))
+            elif keyword == "When":
+                if text not in WHEN_STEPS:
+                    raise ValueError(f"Unsupported When step: {text}")
+                steps.append(("When", WHEN_STEPS[text]))
+
+    if not found:
+        raise ValueError(f"Scenario not found: {scenario}")
+    return steps
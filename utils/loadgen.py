@@ -0,0 +1,215 @@
+"""
+Load mode: replay a scenario from object_lifecycle.feature with the shared
+step vocabulary (utils/lifecycle.py), either open loop at a target request
+rate or closed loop with a fixed number of workers.
+
+    python -m utils.loadgen --base-url http://127.0.0.1:8000/objects --rps 200 --duration 30
+    python -m utils.loadgen --concurrency 16 --duration 10        (fake backend)
+
+In open-loop mode iterations start on a fixed schedule whether or not earlier
+ones have finished, and each request's latency is measured from when it was
+*supposed* to start. A stalled server therefore shows up as tail latency
+instead of silently lowering the offered load (coordinated omission).
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from api.client import ObjectApi
+from api.metrics import LatencyRecorder
+from utils.lifecycle import LIFECYCLE_SCENARIO, scenario_steps
+
+DEFAULT_MAX_IN_FLIGHT = 256
+
+
+def status_class(status):
+    return "error" if status is None else f"{status // 100}xx"
+
+
+# -----------------------------
+# Stats
+# -----------------------------
+class LoadStats:
+    """Thread-safe request counts by status class plus latency per verb."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status_classes = Counter()
+        self.latency = LatencyRecorder()
+        self.iterations = 0
+        self.failed_iterations = 0
+
+    def record(self, verb, status, seconds):
+        self.latency.record(verb, seconds)
+        with self._lock:
+            self.status_classes[status_class(status)] += 1
+
+    def finish_iteration(self, ok):
+        with self._lock:
+            self.iterations += 1
+            self.failed_iterations += 0 if ok else 1
+
+    def summary(self, elapsed):
+        requests = sum(self.status_classes.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+            "iterations": self.iterations,
+            "failed_iterations": self.failed_iterations,
+            "status_classes": {
+                cls: {"count": n, "rate": round(n / requests, 4)}
+                for cls, n in sorted(self.status_classes.items())
+            },
+            "latency": {verb: phases["total"] for verb, phases in self.latency.summary()["by_verb"].items()},
+        }
+
+
+# -----------------------------
+# One iteration
+# -----------------------------
+class _ScheduledCalls:
+    """
+    Wraps the api for one iteration. The first request is timed from the
+    iteration's scheduled start, every later one from the previous completion.
+    """
+
+    def __init__(self, api, stats, scheduled_at):
+        self._api = api
+        self._stats = stats
+        self._start = scheduled_at
+
+    def _call(self, verb, method, *args):
+        status = None
+        try:
+            response = method(*args)
+            status = response.status_code
+            return response
+        finally:
+            end = time.perf_counter()
+            self._stats.record(verb, status, end - self._start)
+            self._start = end
+
+    def post(self, payload):
+        return self._call("POST", self._api.post, payload)
+
+    def get(self, object_id):
+        return self._call("GET", self._api.get, object_id)
+
+    def put(self, object_id, payload):
+        return self._call("PUT", self._api.put, object_id, payload)
+
+    def delete(self, object_id):
+        return self._call("DELETE", self._api.delete, object_id)
+
+
+def run_iteration(api, steps, stats, scheduled_at):
+    calls = _ScheduledCalls(api, stats, scheduled_at)
+    context = {}
+    try:
+        for keyword, step in steps:
+            if keyword == "Given":
+                step(context)
+            else:
+                step(calls, context)
+    except Exception:
+        # transport error, or a later step missing the id of a failed POST
+        stats.finish_iteration(ok=False)
+    else:
+        stats.finish_iteration(ok=True)
+
+
+# -----------------------------
+# Drivers
+# -----------------------------
+def run_load(api, rps=None, concurrency=None, duration=10.0, scenario=LIFECYCLE_SCENARIO,
+             max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    """
+    Drive `scenario` for `duration` seconds and return LoadStats.summary().
+    rps: open loop at this many requests/s. concurrency: closed loop with N workers.
+    """
+    if (rps is None) == (concurrency is None):
+        raise ValueError("Pass exactly one of rps or concurrency")
+
+    steps = scenario_steps(scenario)
+    stats = LoadStats()
+    start = time.perf_counter()
+
+    if rps is not None:
+        requests_per_iteration = max(1, sum(1 for keyword, _ in steps if keyword == "When"))
+        interval = requests_per_iteration / rps
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="loadgen") as pool:
+            i = 0
+            while i * interval < duration:
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(run_iteration, api, steps, stats, scheduled)
+                i += 1
+    else:
+        stop = start + duration
+
+        def worker():
+            while time.perf_counter() < stop:
+                run_iteration(api, steps, stats, time.perf_counter())
+
+        workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+    return stats.summary(time.perf_counter() - start)
+
+
+def format_summary(summary):
+    lines = [
+        f"requests: {summary['requests']}  in {summary['elapsed_s']} s  "
+        f"-> {summary['throughput_rps']} req/s",
+        f"iterations: {summary['iterations']}  (failed: {summary['failed_iterations']})",
+        "status classes: " + ", ".join(
+            f"{cls} {v['count']} ({v['rate']:.2%})" for cls, v in summary["status_classes"].items()
+        ),
+        f"{'verb':<8}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for verb, stats in summary["latency"].items():
+        lines.append(
+            f"{verb:<8}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p90_ms']:>10}"
+            f"{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the object lifecycle under load.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rps", type=float, help="open loop: target requests per second")
+    mode.add_argument("--concurrency", type=int, help="closed loop: number of workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--base-url", help="objects endpoint; defaults to BASE_URL (fake backend unless LIVE_API=1)")
+    parser.add_argument("--scenario", default=LIFECYCLE_SCENARIO)
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    pool_size = args.concurrency or args.max_in_flight
+    # Retries would hide the errors we are trying to count
+    with ObjectApi(args.base_url or os.getenv("BASE_URL"), pool_size=pool_size, retries=0,
+                   recorder=LatencyRecorder(), live=True if args.base_url else None) as api:
+        summary = run_load(api, rps=args.rps, concurrency=args.concurrency, duration=args.duration,
+                           scenario=args.scenario, max_in_flight=args.max_in_flight)
+
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
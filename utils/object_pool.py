@@ -0,0 +1,138 @@
+"""
+Session-wide pool of pre-provisioned objects, so scenarios that only need
+an object to exist don't each POST one first (and DELETE it afterwards).
+
+- checkout() / checkin(): borrow an object for read-only use and give it
+  back; the scenario gets a copy, the pooled object is reused
+- take(): an object of the scenario's own, to update or delete; the pool
+  posts a replacement in the background
+- close(): stop refilling and delete everything the pool created, in bulk
+
+OBJECT_POOL_SIZE (default 10) objects are created up front with
+bulk_create, from the records in OBJECT_POOL_DATA (default data/*.json,
+cycled if there are fewer records than objects).
+"""
+import copy
+import os
+import queue
+import threading
+from itertools import cycle, islice
+
+from utils.datasets import iter_records
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_DATA = "data/*.json"
+DEFAULT_CHECKOUT_TIMEOUT = 30
+_STOP = object()
+
+
+class ObjectPool:
+    def __init__(self, api, payloads, size=DEFAULT_POOL_SIZE, background=True):
+        if size < 1:
+            raise ValueError("The object pool needs at least one object")
+        templates = list(islice(payloads, size))
+        if not templates:
+            raise ValueError("The object pool needs at least one payload")
+        self.api = api
+        self.size = size
+        self.background = background
+        self.stats = {"created": 0, "failed": 0, "checkouts": 0, "taken": 0, "deleted": 0}
+        self._payloads = cycle(templates)
+        self._available = queue.Queue()
+        self._borrowed = {}  # id -> pooled object
+        self._created = []
+        self._lock = threading.Lock()
+        self._refills = queue.SimpleQueue()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, api):
+        size = int(os.getenv("OBJECT_POOL_SIZE") or DEFAULT_POOL_SIZE)
+        records = iter_records(os.getenv("OBJECT_POOL_DATA") or DEFAULT_POOL_DATA)
+        return cls(api, (payload for _, payload in records if payload.get("name")), size)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -----------------------------
+    # Provisioning
+    # -----------------------------
+    def _next_payloads(self, n):
+        with self._lock:
+            return list(islice(self._payloads, n))
+
+    def _add(self, response):
+        with self._lock:
+            if response.status_code != 200:
+                self.stats["failed"] += 1
+                return
+            obj = response.json()
+            self._created.append(obj["id"])
+            self.stats["created"] += 1
+        self._available.put(obj)
+
+    def start(self):
+        """Create the pool's objects (one bulk_create) and start the refill thread."""
+        for response in self.api.bulk_create(self._next_payloads(self.size)):
+            self._add(response)
+        if not self.stats["created"]:
+            raise RuntimeError(f"Could not provision any pooled object ({self.stats['failed']} creates failed)")
+        if self.background:
+            self._thread = threading.Thread(target=self._refill, name="object-pool-refill", daemon=True)
+            self._thread.start()
+        return self
+
+    def _refill(self):
+        while self._refills.get() is not _STOP:
+            try:
+                self._add(self.api.post(self._next_payloads(1)[0]))
+            except Exception:  # a refill that fails leaves the pool one short; take() still works
+                with self._lock:
+                    self.stats["failed"] += 1
+
+    # -----------------------------
+    # Handing out objects
+    # -----------------------------
+    def _get(self, timeout):
+        try:
+            return self._available.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No pooled object became available within {timeout} s") from None
+
+    def checkout(self, timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """Borrow an object for read-only use; return it with checkin()."""
+        obj = self._get(timeout)
+        with self._lock:
+            self._borrowed[obj["id"]] = obj
+            self.stats["checkouts"] += 1
+        return copy.deepcopy(obj)
+
+    def checkin(self, obj):
+        with self._lock:
+            pooled = self._borrowed.pop(obj["id"])
+        self._available.put(pooled)
+
+    def take(self, timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """An object that is the caller's to change or delete; the pool won't hand it out again."""
+        if not self.background and self._available.empty():
+            self._add(self.api.post(self._next_payloads(1)[0]))
+        obj = self._get(timeout)
+        with self._lock:
+            self.stats["taken"] += 1
+        if self.background:
+            self._refills.put(True)
+        return obj
+
+    def close(self):
+        """Stop refilling and bulk-delete every object the pool created (404s for taken ones already deleted)."""
+        if self._thread is not None:
+            self._refills.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            created, self._created = self._created, []
+        self.stats["deleted"] += sum(1 for response in self.api.bulk_delete(created) if response.status_code == 200)
+        return self.stats
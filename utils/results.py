@@ -0,0 +1,175 @@
+import marshal
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Wall-clock anchor for the monotonic clock; timestamps are formatted from it only when rendered
+_WALL_ANCHOR = time.time()
+_CLOCK_ANCHOR = time.perf_counter()
+
+
+def wall_clock(recorded_at: float) -> float:
+    return _WALL_ANCHOR + (recorded_at - _CLOCK_ANCHOR)
+
+
+def format_timestamp(recorded_at: float) -> str:
+    return datetime.fromtimestamp(wall_clock(recorded_at)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# -----------------------------
+# Record
+# -----------------------------
+class ResultRecord:
+    """
+    One recorded assertion. Slotted, with interned scenario/action/step
+    strings (they repeat on every run of a scenario) and a numeric
+    perf_counter timestamp instead of a preformatted string.
+    """
+
+    __slots__ = ("scenario", "action", "step_description", "passed", "payload", "response", "recorded_at")
+
+    def __init__(self, scenario, action, step_description, passed, payload=None, response=None, recorded_at=None):
+        self.scenario = sys.intern(scenario)
+        self.action = sys.intern(action)
+        self.step_description = sys.intern(step_description)
+        self.passed = bool(passed)
+        self.payload = payload
+        self.response = response
+        self.recorded_at = time.perf_counter() if recorded_at is None else recorded_at
+
+    @property
+    def timestamp(self) -> str:
+        return format_timestamp(self.recorded_at)
+
+
+# -----------------------------
+# Store
+# -----------------------------
+class ResultStore:
+    """
+    The run's single collection point for ResultRecords. Every added record
+    is handed to the registered sinks (e.g. the streaming report writer) and
+    only counted here, so memory stays flat however many records a run makes.
+    """
+
+    def __init__(self):
+        self._count = 0
+        self._sinks = []
+
+    def add_sink(self, sink):
+        self._sinks.append(sink)
+
+    def add(self, record):
+        self._count += 1
+        for sink in self._sinks:
+            sink(record)
+
+    def __len__(self):
+        return self._count
+
+
+# -----------------------------
+# Transport between processes (pytest-xdist workers -> controller)
+# -----------------------------
+def encode_records(records) -> bytes:
+    """marshal-encoded tuples; timestamps travel as wall-clock seconds."""
+    offset = _WALL_ANCHOR - _CLOCK_ANCHOR
+    return marshal.dumps([
+        (r.scenario, r.action, r.step_description, r.passed, r.payload, r.response, r.recorded_at + offset)
+        for r in records
+    ])
+
+
+def _decode(rows):
+    offset = _WALL_ANCHOR - _CLOCK_ANCHOR
+    return [
+        ResultRecord(scenario, action, step, passed, payload, response, wall - offset)
+        for scenario, action, step, passed, payload, response, wall in rows
+    ]
+
+
+def decode_records(data: bytes):
+    return _decode(marshal.loads(data))
+
+
+SPOOL_CHUNK_SIZE = 1000
+
+
+class RecordSpool:
+    """
+    The records of one test on an xdist worker, on their way to the
+    controller. Up to `chunk_size` are held in memory; past that they are
+    marshalled to a temp file a chunk at a time, so a test that records a
+    row per data-file record stays flat in memory.
+    """
+
+    def __init__(self, chunk_size=SPOOL_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._pending = []
+        self._file = None
+
+    def add(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(prefix="records-", suffix=".marshal", delete=False)
+        self._file.write(encode_records(self._pending))
+        self._pending = []
+
+    def handoff(self):
+        """
+        The (name, value) user property that carries the records: the
+        encoded records while they fit in one chunk, else the spool file's
+        path (read and deleted by iter_spooled_records). None if there are none.
+        """
+        if self._file is None:
+            return ("recorded_results", encode_records(self._pending)) if self._pending else None
+        if self._pending:
+            self._flush()
+        self._file.close()
+        return ("recorded_results_file", self._file.name)
+
+
+def iter_spooled_records(path):
+    """Records from a RecordSpool file, a chunk at a time; the file is deleted afterwards."""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    rows = marshal.load(f)
+                except EOFError:
+                    return
+                yield from _decode(rows)
+    finally:
+        os.unlink(path)
+
+
+# -----------------------------
+# Step helper
+# -----------------------------
+def _scenario_name(node):
+    scenario_report = getattr(node, "__scenario_report__", None)
+    return scenario_report.scenario.name if scenario_report is not None else node.name
+
+
+def record_result(node, step_description, passed, action="N/A", payload=None, response=None):
+    """
+    Hand an assertion outcome to the running test item's result_sink (set by
+    conftest: the ResultStore, or a RecordSpool on an xdist worker). Without
+    one it is attached to the item, and the pytest_runtest_makereport hook
+    moves it into the ResultStore.
+    """
+    record = ResultRecord(_scenario_name(node), action, step_description, passed, payload, response)
+    sink = getattr(node, "result_sink", None)
+    if sink is not None:
+        sink(record)
+        return record
+    if not hasattr(node, "recorded_results"):
+        node.recorded_results = []
+    node.recorded_results.append(record)
+    return record
@@ -0,0 +1,180 @@
+"""
+Declarative response validation. A JSON Schema (the subset listed in
+_KEYWORDS) is compiled once into nested closures, so validating a response
+is a single walk with no schema interpretation. Named schemas live in
+features/schemas/<name>.json and are referenced from the feature file:
+
+    And the response should match the "object" schema
+"""
+import functools
+import json
+import os
+import re
+
+SCHEMA_FOLDER = os.path.join(os.path.dirname(__file__), "..", "features", "schemas")
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+# Exact types json.loads produces for each schema type; checked first, _TYPES is the fallback
+_EXACT_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+_KEYWORDS = {
+    "type", "properties", "required", "additionalProperties", "items", "enum", "const",
+    "minLength", "maxLength", "pattern", "minimum", "maximum", "minItems", "maxItems",
+    "title", "description", "$schema",
+}
+
+
+# -----------------------------
+# Compiler
+# -----------------------------
+def _format_path(path):
+    """Paths are built as cheap (parent, key) pairs and only formatted for errors."""
+    parts = []
+    while isinstance(path, tuple):
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return path + "".join(reversed(parts))
+
+
+def _compile(schema):
+    """schema -> check(value, path, errors); appends "path: message" strings to errors."""
+    unknown = set(schema) - _KEYWORDS
+    if unknown:
+        raise ValueError(f"Unsupported schema keywords: {sorted(unknown)}")
+    checks = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        exact = frozenset(t for name in names for t in _EXACT_TYPES[name])
+        tests = tuple(_TYPES[name] for name in names)
+        expected = " or ".join(names)
+
+        def check_type(value, path, errors):
+            if type(value) in exact or any(test(value) for test in tests):
+                return True
+            errors.append(f"{_format_path(path)}: expected {expected}, got {type(value).__name__}")
+            return False
+        checks.append(check_type)
+
+    if "enum" in schema or "const" in schema:
+        allowed = schema["enum"] if "enum" in schema else [schema["const"]]
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{_format_path(path)}: {value!r} not in {allowed!r}")
+        checks.append(check_enum)
+
+    if "minLength" in schema or "maxLength" in schema or "pattern" in schema:
+        min_length, max_length = schema.get("minLength", 0), schema.get("maxLength")
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if len(value) < min_length or (max_length is not None and len(value) > max_length):
+                errors.append(f"{_format_path(path)}: length {len(value)} outside [{min_length}, {max_length}]")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"{_format_path(path)}: {value!r} does not match {pattern.pattern!r}")
+        checks.append(check_string)
+
+    if "minimum" in schema or "maximum" in schema:
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value, path, errors):
+            if not _TYPES["number"](value):
+                return
+            if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+                errors.append(f"{_format_path(path)}: {value} outside [{minimum}, {maximum}]")
+        checks.append(check_range)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        properties = [(key, _compile(sub)) for key, sub in schema.get("properties", {}).items()]
+        required = tuple(schema.get("required", ()))
+        additional = schema.get("additionalProperties", True)
+        known = frozenset(schema.get("properties", {}))
+        check_additional = _compile(additional) if isinstance(additional, dict) else None
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"{_format_path(path)}: missing required field {key!r}")
+            for key, check in properties:
+                if key in value:
+                    check(value[key], (path, key), errors)
+            if additional is not True:
+                for key in value.keys() - known:
+                    if check_additional is None:
+                        errors.append(f"{_format_path(path)}: unexpected field {key!r}")
+                    else:
+                        check_additional(value[key], (path, key), errors)
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        check_item = _compile(schema["items"]) if "items" in schema else None
+        min_items, max_items = schema.get("minItems", 0), schema.get("maxItems")
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items or (max_items is not None and len(value) > max_items):
+                errors.append(f"{_format_path(path)}: {len(value)} items outside [{min_items}, {max_items}]")
+            if check_item is not None:
+                for i, item in enumerate(value):
+                    check_item(item, (path, i), errors)
+        checks.append(check_array)
+
+    if len(checks) == 1:
+        return checks[0]
+    type_check, rest = (checks[0], checks[1:]) if "type" in schema else (None, checks)
+
+    def check_all(value, path, errors):
+        # skip the structural checks once the type is already wrong
+        if type_check is not None and not type_check(value, path, errors):
+            return
+        for check in rest:
+            check(value, path, errors)
+    return check_all
+
+
+_compiled = {}
+
+
+def compile_schema(schema):
+    """Compiled validator for `schema`: validator(data) -> list of errors (empty if valid). Cached."""
+    key = json.dumps(schema, sort_keys=True)
+    validator = _compiled.get(key)
+    if validator is None:
+        check = _compile(schema)
+
+        def validator(data):
+            errors = []
+            check(data, "$", errors)
+            return errors
+        validator = _compiled[key] = validator
+    return validator
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(name, folder=SCHEMA_FOLDER):
+    """Validator for features/schemas/<name>.json, loaded and compiled on first use."""
+    with open(os.path.join(folder, f"{name}.json"), encoding="utf-8") as f:
+        return compile_schema(json.load(f))